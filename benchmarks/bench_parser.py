@@ -0,0 +1,73 @@
+"""
+Microbenchmark: dispatcher.parse_message vs LazyMessage on realistic datagrams.
+
+"drop" reads only the routing fields (what happens to a FILE message addressed
+to someone else), "full" reads every field. The last column is what the
+Dispatcher actually uses, parse_datagram, which picks between the two by size.
+
+Run from the project root:
+    python -m benchmarks.bench_parser
+"""
+import base64
+import os
+import timeit
+from core.dispatcher import parse_message, parse_datagram
+from core.lazy_message import LazyMessage
+from utils.message_builder import format_message_dict, generate_message_id
+
+USER = "alice@192.168.1.5"
+TOKEN = f"{USER}|1900000000|broadcast"
+
+PAYLOADS = {
+    "PROFILE": format_message_dict({
+        "TYPE": "PROFILE",
+        "USER_ID": USER,
+        "DISPLAY_NAME": "Alice",
+        "STATUS": "Exploring LSNP!",
+        "AVATAR_TYPE": "image/png",
+        "AVATAR_DATA": base64.b64encode(os.urandom(15 * 1024)).decode(),
+    }),
+    "POST": format_message_dict({
+        "TYPE": "POST",
+        "USER_ID": USER,
+        "CONTENT": "Hello from LSNP! " * 8,
+        "TTL": 3600,
+        "TIMESTAMP": 1728938391,
+        "MESSAGE_ID": generate_message_id(),
+        "TOKEN": TOKEN,
+    }),
+    "FILE_CHUNK": format_message_dict({
+        "TYPE": "FILE_CHUNK",
+        "FROM": USER,
+        "TO": "bob@192.168.1.6",
+        "FILEID": generate_message_id(),
+        "CHUNK_INDEX": 12,
+        "TOTAL_CHUNKS": 400,
+        "CHUNK_SIZE": 1024,
+        "TOKEN": f"{USER}|1900000000|file",
+        "DATA": base64.b64encode(os.urandom(1024)).decode(),
+    }),
+}
+
+
+def bench(number=20000):
+    print(f"{'message':<12}{'bytes':>7} {'access':<8}{'parse_message':>15}{'LazyMessage':>15}{'parse_datagram':>16}")
+    for name, text in PAYLOADS.items():
+        data = text.encode("utf-8")
+
+        for access in ("drop", "full"):
+            if access == "drop":
+                read = lambda msg: msg.get("TO")
+            else:
+                read = lambda msg: list(msg.values())
+            parsers = (
+                lambda: read(parse_message(data.decode("utf-8", errors="ignore"))),
+                lambda: read(LazyMessage(data)),
+                lambda: read(parse_datagram(data)),
+            )
+            times = [min(timeit.repeat(p, number=number, repeat=3)) / number * 1e6 for p in parsers]
+            print(f"{name:<12}{len(data):>7} {access:<8}" + "".join(f"{t:>13.2f} us" for t in times))
+
+
+if __name__ == "__main__":
+    bench()
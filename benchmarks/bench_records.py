@@ -0,0 +1,78 @@
+"""
+Bytes per stored message: the parsed dicts the stores used to keep against
+the Post / DirectMessage / GroupMessage records of models/message.py.
+
+100k messages from 50 users are parsed with parse_message as the handlers
+do, and what the store would retain is kept; tracemalloc reports what is
+still allocated afterwards. Index overhead (dicts, lists) is left out so
+the numbers are the records themselves.
+
+Run from the project root:
+    python -m benchmarks.bench_records
+"""
+import tracemalloc
+from core.dispatcher import parse_message
+from models.message import DirectMessage, GroupMessage, Post
+from utils.message_builder import format_message_dict, generate_message_id
+
+COUNT = 100_000
+USERS = [f"user{i}@192.168.1.{i + 10}" for i in range(50)]
+
+
+def texts(kind: str) -> list:
+    result = []
+    for i in range(COUNT):
+        user = USERS[i % len(USERS)]
+        other = USERS[(i + 1) % len(USERS)]
+        timestamp = 1_750_000_000 + i
+        if kind == "post":
+            msg = {"TYPE": "POST", "USER_ID": user, "CONTENT": f"Post number {i}", "TTL": 3600,
+                   "MESSAGE_ID": generate_message_id(), "TOKEN": f"{user}|{timestamp + 3600}|broadcast",
+                   "TIMESTAMP": timestamp}
+        elif kind == "dm":
+            msg = {"TYPE": "DM", "FROM": user, "TO": other, "CONTENT": f"Hello number {i}",
+                   "TIMESTAMP": timestamp, "MESSAGE_ID": generate_message_id(),
+                   "TOKEN": f"{user}|{timestamp + 600}|chat"}
+        else:
+            msg = {"TYPE": "GROUP_MESSAGE", "FROM": user, "GROUP_ID": "lab", "CONTENT": f"Hi all {i}",
+                   "TIMESTAMP": timestamp, "MESSAGE_ID": generate_message_id(),
+                   "TOKEN": f"{user}|{timestamp + 600}|group"}
+        result.append(format_message_dict(msg))
+    return result
+
+
+def as_record(kind: str, msg: dict, seq: int):
+    if kind == "post":
+        return Post.from_message(msg, int(msg["TOKEN"].split("|")[1]))
+    if kind == "dm":
+        return DirectMessage.from_message(msg)
+    return GroupMessage(seq, msg["FROM"], msg["CONTENT"], msg["TIMESTAMP"])
+
+
+def as_dict(kind: str, msg: dict, seq: int):
+    if kind == "group":
+        # what group_directory used to keep
+        return {"sender": msg["FROM"], "content": msg["CONTENT"], "timestamp": msg["TIMESTAMP"]}
+    return msg
+
+
+def measure(kind: str, keep) -> float:
+    raw = texts(kind)
+    tracemalloc.start()
+    kept = [keep(kind, parse_message(text), seq) for seq, text in enumerate(raw)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / COUNT
+
+
+def bench():
+    print(f"{'message':<10}{'dict':>12}{'record':>12}{'saved':>8}")
+    for kind in ("post", "dm", "group"):
+        before = measure(kind, as_dict)
+        after = measure(kind, as_record)
+        print(f"{kind:<10}{before:>8.0f} B/m{after:>8.0f} B/m{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    bench()
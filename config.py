@@ -3,16 +3,78 @@
 # User Datagram Protocol Constants
 PORT = 50999              # UDP port for LSNP communication
 BROADCAST_INTERVAL = 300  # Seconds between PROFILE broadcasts; 5 MINUTES
-BUFFER_SIZE = 1024        # Max bytes to receive in a UDP packet; 1 KB
+BROADCAST_JITTER = 0.1    # Each PROFILE/PING broadcast moves by up to this fraction of the interval
+BUFFER_SIZE = 65535       # Max bytes to receive in a UDP packet; large enough that nothing is truncated
+FRAGMENT_MTU = 1200       # Outgoing datagrams above this size are split into fragments
+REASSEMBLY_TIMEOUT = 10   # Seconds to wait for the missing fragments of a message
+REASSEMBLY_MAX_BYTES = 4 * 1024 * 1024  # Cap on partially reassembled data held in memory; 4 MB
+LAZY_PARSE_MIN_BYTES = 2048        # Datagrams this large are parsed lazily (LazyMessage)
+BROADCAST_INTERFACE = None          # None for the primary interface, "all", or a name such as "en0"
+INTERFACE_REFRESH_INTERVAL = 60     # Seconds before local interfaces and netmasks are re-read
+TRANSPORT = "thread"      # "thread" for UDPListener, "asyncio" for AsyncUDPTransport
+EXECUTOR_WORKERS = 4      # Threads for blocking handler work under the asyncio transport
+
+# Peer directory
+PEER_ACTIVE_WINDOW = 300   # Seconds since last PROFILE/PING for a peer to count as online
+PEER_EXPIRY = 3600         # Peers silent this long are evicted from the directory
+PEER_SWEEP_INTERVAL = 60   # Seconds between evictions of silent peers
+
+# Receive queue
+DISPATCH_WORKERS = 4                # Dispatcher worker threads; a peer always maps to the same worker
+RECV_QUEUE_SIZE = 1024              # Max datagrams queued across all workers
+RECV_OVERFLOW_POLICY = "drop-oldest"  # "drop-oldest", "drop-newest" or "block"
 
 # Token defaults; 
 TOKEN_TTL_CHAT = 600       # 10 minutes for direct messages
 TOKEN_TTL_BROADCAST = 300  # 5 minutes for posts
 token_ttl_post = 3600 # can be changed
+REVOCATION_CLEANUP_INTERVAL = 30  # Seconds between purges of expired revoked tokens
+
+# Acknowledgements / Retransmission
+RTO_INITIAL = 1.0         # Retransmission timeout before any RTT sample for a peer
+RTO_MIN = 0.2             # Lower bound for the per-peer retransmission timeout
+RTO_MAX = 8.0             # Upper bound, also caps exponential backoff
+MAX_RETRIES = 4           # Retransmissions before a reliable send fails
+FILE_OFFER_TIMEOUT = 120  # Seconds a FILE_OFFER waits for the receiver to accept
+
+# File transfer
+DOWNLOADS_DIR = "downloads"  # Received files, .part/.journal files and the content index
+FILE_WINDOW_INITIAL = 4   # Chunks in flight when a windowed transfer starts
+FILE_WINDOW_MAX = 64      # Upper bound on chunks in flight
+FILE_DUPTHRESH = 3        # A chunk is presumed lost once this many later chunks are acked
+FILE_SACK_EVERY = 8       # Receiver sends a FILE_SACK after this many in-order chunks
+FILE_SACK_BITS = 256      # Chunks covered by one FILE_SACK bitmap
+FILE_MAX_TIMEOUTS = 6     # Consecutive timeouts without progress before a transfer is abandoned
+FILE_JOURNAL_EVERY = 32   # New chunks written between saves of a download's resume journal
+FILE_RATE_LIMIT = 0       # Combined outbound file data cap in bytes/s; 0 = unlimited
+FILE_BINARY_FRAMING = True  # Offer/accept raw binary FILE_CHUNK frames (core/chunk_frame.py)
+GROUP_FILE_RATE = 1000000  # Bytes/s a group file is broadcast at; there is no per-receiver feedback to pace it
+GROUP_FILE_POLL_INTERVAL = 1.0  # Seconds a group file sender waits for FILE_NAKs before polling again
+GROUP_FILE_AUTO_ACCEPT = False  # Accept GROUP_FILE_OFFERs without asking; otherwise they are queued like FILE_OFFERs
+
+# Storage
+STORAGE_BACKEND = "sqlite"     # "sqlite" (profiles/<tag>.db, storage/backend.py) or "memory" to persist nothing
+STORAGE_FLUSH_INTERVAL = 0.5   # Seconds between commits of queued writes
+STORAGE_FLUSH_MAX = 500        # Queued writes that trigger a commit before the interval is up
+STORAGE_CACHE_SIZE = 200       # Newest DMs per conversation kept in memory by a persistent backend
+GROUP_HISTORY_SIZE = 500       # Newest messages per group held in memory (ring buffer); older ones only in the backend
+GROUP_PAGE_SIZE = 20           # Group messages shown per page
+
+# Duplicate suppression (storage/dedup.py)
+DEDUP_MODE = "sets"            # "sets" (exact, rotating generations) or "bloom" (fixed memory, rare false positives)
+DEDUP_WINDOW = 3600            # Minimum seconds a MESSAGE_ID is remembered; stretched to the longest token TTL
+DEDUP_GENERATIONS = 4          # Rotating sets per window in "sets" mode
+DEDUP_BLOOM_CAPACITY = 100000  # IDs per Bloom filter before it is rotated early
+DEDUP_BLOOM_FP_RATE = 1e-5     # False-positive rate each Bloom filter is sized for
 
 # Avatars
 DEFAULT_AVATAR_TYPE = "none"
 MAX_AVATAR_SIZE = 20 * 1024 #20 KB
+AVATAR_CACHE_DIR = "avatar_cache"          # Decoded peer avatars, named by content hash
+AVATAR_CACHE_BYTES = 5 * 1024 * 1024       # Disk budget for AVATAR_CACHE_DIR; least recently viewed are deleted first
+AVATAR_MEMORY_BYTES = 1024 * 1024          # Base64 avatars held in memory until viewed; the oldest are written to disk past this
+PROFILE_INLINE_AVATAR = False  # Also send AVATAR_DATA in every PROFILE, for peers that cannot send AVATAR_REQUEST
+AVATAR_REPLY_INTERVAL = 10     # Seconds before the same peer is sent our avatar again
 
 # Display / Debug
 VERBOSE = True
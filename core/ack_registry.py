@@ -1,18 +1,39 @@
+import threading
 
-pending_acks = {}
+pending_acks = {}  # message_id -> on_ack callback
+_lock = threading.Lock()
 
 def register_ack(message_id: str, on_ack: callable):
     """
     Registers a callback to run when an ACK for the given message ID is received.
+
+    Entries never expire here; the reliable sender cancels them when it gives up.
+
+    Args:
+        message_id (str): MESSAGE_ID (or FILEID) the ACK will reference.
+        on_ack (function): Called with the parsed ACK message.
     """
-    pending_acks[message_id] = on_ack
+    with _lock:
+        pending_acks[message_id] = on_ack
 
-def resolve_ack(message_id: str):
+def resolve_ack(message_id: str, ack_msg=None):
     """
     Executes the callback associated with a message ID if it exists.
+
+    Args:
+        message_id (str): The MESSAGE_ID or FILEID carried by the ACK.
+        ack_msg (Mapping, optional): The parsed ACK, passed on to the callback.
+    """
+    with _lock:
+        on_ack = pending_acks.pop(message_id, None)
+    if on_ack is None:
+        return False
+    on_ack(ack_msg)
+    return True
+
+def cancel_ack(message_id: str):
+    """
+    Drops a pending ACK without running any callback.
     """
-    if message_id in pending_acks:
-        callback = pending_acks.pop(message_id)
-        callback()
-        return True
-    return False
+    with _lock:
+        return pending_acks.pop(message_id, None) is not None
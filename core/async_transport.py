@@ -0,0 +1,172 @@
+import asyncio
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import PORT, EXECUTOR_WORKERS, BROADCAST_INTERFACE
+from core.fragmentation import Reassembler, fragment_message
+from utils.network_utils import interface_resolver
+from utils.printer import verbose_log
+
+
+class LSNPDatagramProtocol(asyncio.DatagramProtocol):
+    """
+    asyncio protocol that hands every received datagram to the transport owner.
+    """
+    def __init__(self, on_datagram):
+        """
+        Args:
+            on_datagram (function): called with (data, addr) for each datagram.
+        """
+        self.on_datagram = on_datagram
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.on_datagram(data, addr)
+
+    def error_received(self, exc):
+        verbose_log("[Error]", f"UDP receive failed: {exc}")
+
+
+class AsyncUDPTransport:
+    """
+    An asyncio-based alternative to UDPListener with the same send API.
+
+    The event loop runs on its own daemon thread so the blocking CLI can keep
+    the main thread. Receiving never waits on a handler: each datagram is
+    scheduled as a task, and synchronous handlers run on a thread pool.
+    """
+    def __init__(self, port=PORT, executor_workers=EXECUTOR_WORKERS, broadcast_interface=BROADCAST_INTERFACE):
+        """
+        Initializes the UDP socket with the same options as UDPListener.
+
+        Args:
+            port (int): The UDP port to listen on. Default is config.PORT.
+            executor_workers (int): Threads available for blocking handler work.
+            broadcast_interface (str, optional): None for the primary interface,
+                "all" for every interface, or an interface name.
+        """
+        self.port = port
+        self.broadcast_interface = broadcast_interface
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1) # Remove for non-MAC users
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.sock.bind(('', port))
+
+        self.executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="lsnp-handler")
+        self.loop = None
+        self.transport = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._tasks = set()
+        self.reassembler = Reassembler()
+
+    def start(self, on_message_callback):
+        """
+        Starts the event loop thread and begins receiving datagrams.
+
+        Args:
+            on_message_callback (function): either a coroutine function such as
+                Dispatcher.handle_async, or a plain function which is then run
+                on the executor so it cannot stall the loop. Either receives the
+                raw datagram bytes.
+        """
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.executor)
+
+        def on_datagram(data, addr):
+            data = self.reassembler.feed(data, addr)
+            if data is None:
+                return
+            if asyncio.iscoroutinefunction(on_message_callback):
+                coro = on_message_callback(data, addr)
+            else:
+                coro = self.run_blocking(on_message_callback, data, addr)
+            task = self.loop.create_task(self._guard(coro))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        async def open_endpoint():
+            self.transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: LSNPDatagramProtocol(on_datagram),
+                sock=self.sock
+            )
+            self._ready.set()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(open_endpoint())
+            self.loop.run_forever()
+            self.loop.close()
+
+        self._thread = threading.Thread(target=run, name="lsnp-asyncio", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    async def run_blocking(self, func, *args):
+        """
+        Runs a blocking function (disk writes, base64 decoding) on the executor.
+        """
+        return await self.loop.run_in_executor(self.executor, func, *args)
+
+    async def _guard(self, coro):
+        try:
+            await coro
+        except Exception as e:
+            verbose_log("[Error]", f"Handler failed: {e}")
+
+    def _sendto(self, data: bytes, addr):
+        for fragment in fragment_message(data):
+            if self.transport is not None and self.loop.is_running():
+                self.loop.call_soon_threadsafe(self.transport.sendto, fragment, addr)
+            else:
+                self.sock.sendto(fragment, addr)
+
+    def send_broadcast(self, message: str):
+        """
+        UDP broadcast to all peers on the local network.
+
+        Args:
+            message (str | bytes): The LSNP-formatted message to send, or an encoded
+                frame such as a binary FILE_CHUNK.
+        """
+        data = message if isinstance(message, (bytes, bytearray)) else message.encode('utf-8')
+        for broadcast_ip in interface_resolver.get_broadcast_addresses(self.broadcast_interface):
+            self._sendto(data, (broadcast_ip, self.port))
+
+    def send_unicast(self, message, ip: str):
+        """
+        Sends a message via UDP unicast directly to a specific peer's IP.
+
+        Args:
+            message (str | bytes): The LSNP-formatted message, or an already
+                encoded frame such as a binary FILE_CHUNK.
+            ip (str): The IP address of the target peer.
+        """
+        data = message if isinstance(message, (bytes, bytearray)) else message.encode('utf-8')
+        self._sendto(data, (ip, self.port))
+
+    def stop(self, timeout=2.0):
+        """
+        Stops receiving, waits for in-flight handlers and closes the socket.
+
+        Args:
+            timeout (float): Seconds to wait for pending handler tasks.
+        """
+        if self.loop is None or not self.loop.is_running():
+            self.sock.close()
+            return
+
+        async def shutdown():
+            if self.transport is not None:
+                self.transport.close()
+            if self._tasks:
+                await asyncio.wait(list(self._tasks), timeout=timeout)
+            self.loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop)
+        self._thread.join(timeout + 1)
+        self.executor.shutdown(wait=False, cancel_futures=True)
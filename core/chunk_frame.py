@@ -0,0 +1,88 @@
+import struct
+
+# Binary FILE_CHUNK frame, used instead of the text form when both peers
+# negotiated FRAMING: BINARY in FILE_OFFER / ACK:
+#
+#   magic     3 bytes  b"\xffLC" (0xFF never starts valid UTF-8, so no text message matches)
+#   version   1 byte
+#   file id  16 bytes  the 32-hex-digit FILEID as raw bytes
+#   index     4 bytes  CHUNK_INDEX
+#   total     4 bytes  TOTAL_CHUNKS
+#   length    2 bytes  CHUNK_SIZE
+#   flags     1 byte   bit 0 = SACK_NOW
+#   payload   raw chunk bytes
+#
+# Integers are big-endian. There is no FROM/TO/TOKEN: the receiver only
+# accepts frames for an offer it accepted, from the IP that offered it.
+CHUNK_FRAME_MAGIC = b"\xffLC"
+CHUNK_FRAME_VERSION = 1
+_HEADER = struct.Struct("!3sB16sIIHB")
+CHUNK_FRAME_HEADER_SIZE = _HEADER.size
+FLAG_SACK_NOW = 0x01
+
+
+def can_frame(file_id: str) -> bool:
+    """
+    Binary frames carry the FILEID as 16 raw bytes, so it must be 32 hex digits.
+    """
+    if len(file_id) != 32:
+        return False
+    try:
+        bytes.fromhex(file_id)
+    except ValueError:
+        return False
+    return True
+
+
+def pack_chunk(file_id: str, index: int, total: int, data: bytes, sack_now: bool = False) -> bytes:
+    """
+    Builds a binary FILE_CHUNK frame.
+
+    Args:
+        file_id (str): FILEID (32 hex digits, see can_frame).
+        index (int): CHUNK_INDEX.
+        total (int): TOTAL_CHUNKS.
+        data (bytes): The raw chunk, at most 65535 bytes.
+        sack_now (bool): Ask the receiver for an immediate FILE_SACK.
+    """
+    flags = FLAG_SACK_NOW if sack_now else 0
+    header = _HEADER.pack(CHUNK_FRAME_MAGIC, CHUNK_FRAME_VERSION, bytes.fromhex(file_id), index, total, len(data), flags)
+    return header + data
+
+
+def is_chunk_frame(data) -> bool:
+    return data[:3] == CHUNK_FRAME_MAGIC
+
+
+def unpack_chunk(data):
+    """
+    Parses a binary FILE_CHUNK frame into the same fields a text FILE_CHUNK
+    has, except that the payload is under PAYLOAD as raw bytes instead of
+    base64 DATA.
+
+    Args:
+        data (bytes): The received datagram.
+
+    Returns:
+        dict | None: None if the frame is truncated or of an unknown version.
+    """
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, file_id, index, total, length, flags = _HEADER.unpack_from(data)
+    if magic != CHUNK_FRAME_MAGIC or version != CHUNK_FRAME_VERSION:
+        return None
+    end = _HEADER.size + length
+    if len(data) < end:
+        return None
+
+    msg = {
+        "TYPE": "FILE_CHUNK",
+        "FILEID": file_id.hex(),
+        "CHUNK_INDEX": str(index),
+        "TOTAL_CHUNKS": str(total),
+        "CHUNK_SIZE": str(length),
+        "PAYLOAD": memoryview(data)[_HEADER.size:end],
+    }
+    if flags & FLAG_SACK_NOW:
+        msg["SACK_NOW"] = "1"
+    return msg
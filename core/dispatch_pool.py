@@ -0,0 +1,142 @@
+import queue
+import threading
+from config import DISPATCH_WORKERS, RECV_QUEUE_SIZE, RECV_OVERFLOW_POLICY
+from utils.printer import verbose_log
+
+# Overflow policies for a full receive queue
+DROP_OLDEST = "drop-oldest"    # discard the oldest queued datagram to make room
+DROP_NEWEST = "drop-newest"    # discard the datagram that just arrived
+BLOCK = "block"                # stall the receive loop until a worker catches up
+
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class DispatchPool:
+    """
+    A bounded receive queue drained by a fixed pool of dispatcher workers.
+
+    Each worker owns its own slice of the queue and a sender address always
+    hashes to the same worker, so messages from one peer are handled in order
+    while a peer flooding file chunks only backs up its own worker.
+    """
+    def __init__(self, handler, workers=DISPATCH_WORKERS, capacity=RECV_QUEUE_SIZE, policy=RECV_OVERFLOW_POLICY):
+        """
+        Args:
+            handler (function): called as handler(data, addr) on a worker thread.
+            workers (int): Number of dispatcher worker threads.
+            capacity (int): Total queued datagrams across all workers.
+            policy (str): One of OVERFLOW_POLICIES.
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+
+        self.handler = handler
+        self.policy = policy
+        self.workers = max(1, workers)
+        per_worker = max(1, capacity // self.workers)
+        self.queues = [queue.Queue(maxsize=per_worker) for _ in range(self.workers)]
+        self.threads = []
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "received": 0,
+            "dispatched": 0,
+            "dropped_oldest": 0,
+            "dropped_newest": 0,
+            "blocked": 0,
+            "errors": 0,
+        }
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def start(self):
+        """
+        Starts one daemon thread per worker queue.
+        """
+        for index, q in enumerate(self.queues):
+            thread = threading.Thread(target=self._worker, args=(q,), name=f"lsnp-dispatch-{index}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, data: bytes, addr):
+        """
+        Queues a received datagram for its sender's worker, applying the overflow policy.
+
+        Args:
+            data (bytes): Raw datagram payload.
+            addr (tuple): (IP, port) of the sender.
+
+        Returns:
+            bool: False if the datagram was dropped.
+        """
+        self._count("received")
+        q = self.queues[hash(addr) % self.workers]
+
+        try:
+            q.put_nowait((data, addr))
+            return True
+        except queue.Full:
+            pass
+
+        if self.policy == DROP_NEWEST:
+            self._count("dropped_newest")
+            return False
+
+        if self.policy == BLOCK:
+            self._count("blocked")
+            q.put((data, addr))
+            return True
+
+        # DROP_OLDEST: make room by discarding from the head of the queue
+        while True:
+            try:
+                q.get_nowait()
+                q.task_done()
+                self._count("dropped_oldest")
+            except queue.Empty:
+                pass
+            try:
+                q.put_nowait((data, addr))
+                return True
+            except queue.Full:
+                continue
+
+    def _worker(self, q: queue.Queue):
+        while True:
+            item = q.get()
+            if item is None:
+                q.task_done()
+                return
+            data, addr = item
+            try:
+                self.handler(data, addr)
+                self._count("dispatched")
+            except Exception as e:
+                self._count("errors")
+                verbose_log("[Error]", f"Dispatch failed for {addr}: {e}")
+            finally:
+                q.task_done()
+
+    def get_stats(self) -> dict:
+        """
+        Returns a snapshot of the queue counters and current queue depths.
+        """
+        with self._lock:
+            snapshot = dict(self.stats)
+        snapshot["queued"] = sum(q.qsize() for q in self.queues)
+        return snapshot
+
+    def stop(self, timeout=2.0):
+        """
+        Signals every worker to exit once its queue is drained.
+
+        Args:
+            timeout (float): Seconds to wait for each worker thread.
+        """
+        for q in self.queues:
+            q.put(None)
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads.clear()
@@ -1,4 +1,10 @@
+import asyncio
+import config
+from core.lazy_message import LazyMessage
+from core.chunk_frame import is_chunk_frame, unpack_chunk
+from core.handler_registry import registry
 from handlers.ack_handler import handle_ack
+from handlers.avatar_handler import handle_avatar, handle_avatar_request
 from handlers.group_handler import handle_group_message, handle_group_create, handle_group_update
 from handlers.ping_handler import handle_ping
 from handlers.file_handler import handle_file
@@ -10,9 +16,27 @@ from handlers.user_followers_handler import handle_follow, handle_unfollow
 from utils.network_utils import verify_sender_ip
 from utils.printer import verbose_log
 
-# Import revoke handler and cleanup
+# Import revoke handler
 from handlers.revoke_handler import handle_revoke
-from core.token_validator import cleanup_revoked_tokens
+
+# Routing table: TYPE(s) -> handler, plus the dispatcher attributes it needs after (msg, addr)
+registry.register("PROFILE", handle_profile, extra_args=("listener", "local_profile"))
+registry.register("AVATAR_REQUEST", handle_avatar_request, extra_args=("listener", "local_profile"))
+registry.register("AVATAR", handle_avatar)
+registry.register("POST", handle_post, extra_args=("local_profile",))
+registry.register("DM", handle_dm)
+registry.register("ACK", handle_ack)
+registry.register("PING", handle_ping)
+registry.register("GROUP_CREATE", handle_group_create)
+registry.register("GROUP_UPDATE", handle_group_update)
+registry.register("GROUP_MESSAGE", handle_group_message, extra_args=("listener", "local_profile"))
+registry.register(("FILE_OFFER", "FILE_CHUNK", "FILE_RECEIVED", "FILE_SACK",
+                   "GROUP_FILE_OFFER", "GROUP_FILE_END", "FILE_NAK"), handle_file, extra_args=("listener", "local_profile"))
+registry.register("LIKE", handle_like)
+registry.register("REVOKE", handle_revoke)
+registry.register("FOLLOW", handle_follow)
+registry.register("UNFOLLOW", handle_unfollow)
+
 
 def parse_message(message: str) -> dict:
     """
@@ -27,60 +51,92 @@ def parse_message(message: str) -> dict:
     return msg_dict
 
 
+def parse_datagram(data):
+    """
+    Parses a received datagram into a dict-compatible message.
+
+    Large datagrams (avatars, file chunks with big payloads) get a LazyMessage
+    view so fields are only decoded when read; below LAZY_PARSE_MIN_BYTES the
+    eager parse_message is cheaper (see benchmarks/bench_parser.py). Binary
+    FILE_CHUNK frames are unpacked by core.chunk_frame.
+
+    Args:
+        data (bytes | str): The datagram as received, or an already decoded string.
+
+    Returns:
+        Mapping | None: None for a malformed binary frame.
+    """
+    if isinstance(data, str):
+        return parse_message(data)
+    if is_chunk_frame(data):
+        return unpack_chunk(data)
+    if len(data) >= config.LAZY_PARSE_MIN_BYTES:
+        return LazyMessage(data)
+    return parse_message(bytes(data).decode('utf-8', errors='ignore'))
+
+
+def _log_received(data):
+    # Decoding the whole datagram just for the log is skipped unless verbose mode is on
+    if not config.VERBOSE:
+        return
+    if isinstance(data, str):
+        verbose_log("RECV <", data)
+    elif is_chunk_frame(data):
+        verbose_log("RECV <", f"binary FILE_CHUNK frame ({len(data)} bytes)")
+    else:
+        verbose_log("RECV <", bytes(data).decode('utf-8', errors='ignore'))
+
+
 class Dispatcher:
     """
     Routes parsed LSNP messages to the correct handler based on TYPE.
     """
 
-    def __init__(self, listener, local_profile):
+    def __init__(self, listener, local_profile, handler_registry=registry):
         self.listener = listener
         self.local_profile = local_profile
+        self.registry = handler_registry
+        self.routes = handler_registry.bind(self)
 
-    def handle(self, raw_message: str, addr):
+    def handle(self, raw_message, addr):
         """
         Main entry point for handling all incoming UDP messages.
+
+        Args:
+            raw_message (bytes | str): The received datagram.
+            addr (tuple): (IP, port) of the sender.
+        """
+        _log_received(raw_message)
+
+        msg = parse_datagram(raw_message)
+        if msg is not None:
+            self.route(msg, addr)
+
+    async def handle_async(self, raw_message, addr):
         """
-        verbose_log("RECV <", raw_message)
+        Awaitable entry point used by AsyncUDPTransport.
 
-        msg = parse_message(raw_message)
-        msg_type = msg.get("TYPE")
+        Parsing is cheap and stays on the event loop; the handler itself may
+        block on disk or base64 work, so it is awaited on the default executor.
+        """
+        _log_received(raw_message)
+
+        msg = parse_datagram(raw_message)
+        if msg is None:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.route, msg, addr)
 
+    def route(self, msg, addr):
+        """
+        Calls the handler registered for the message TYPE.
+        """
         # Optional IP verification (disabled in current version)
         """
         if not verify_sender_ip(msg, addr):
             verbose_log("DROP!", f"IP mismatch: FROM={msg.get('FROM')} actual={addr[0]}")
+            self.registry.record_drop(msg.get("TYPE"))
             return
         """
 
-        # Route based on TYPE
-        if msg_type == "PROFILE":
-            handle_profile(msg, addr)
-        elif msg_type == "POST":
-            handle_post(msg, addr, self.local_profile)
-        elif msg_type == "DM":
-            handle_dm(msg, addr)
-        elif msg_type == "ACK":
-            handle_ack(msg, addr)
-        elif msg_type == "PING":
-            handle_ping(msg, addr)
-        elif msg_type == "GROUP_CREATE":
-            handle_group_create(msg, addr)
-        elif msg_type == "GROUP_UPDATE":
-            handle_group_update(msg, addr)
-        elif msg_type == "GROUP_MESSAGE":
-            handle_group_message(msg, addr)
-        elif msg_type in ("FILE_OFFER", "FILE_CHUNK", "FILE_RECEIVED"):
-            handle_file(msg, addr, self.listener, self.local_profile)
-        elif msg_type == "LIKE":
-            handle_like(msg, addr)
-        elif msg_type == "REVOKE":
-            handle_revoke(msg, addr)
-        elif msg_type == "FOLLOW":
-            handle_follow(msg, addr)
-        elif msg_type == "UNFOLLOW": 
-            handle_unfollow(msg, addr)
-        else:
-            verbose_log("WARN", f"Unknown TYPE: {msg_type}")
-
-        # Clean up expired revoked tokens every time a message is handled
-        cleanup_revoked_tokens()
+        self.registry.dispatch(self.routes, msg, addr)
@@ -0,0 +1,160 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from config import FRAGMENT_MTU, REASSEMBLY_TIMEOUT, REASSEMBLY_MAX_BYTES
+from utils.printer import verbose_log
+
+# Fragments carry a small LSNP-style text header followed by a slice of the original datagram:
+#   TYPE: FRAGMENT
+#   FRAG_ID: <16 hex chars shared by all fragments of one message>
+#   FRAG_INDEX: <0-based index>
+#   FRAG_TOTAL: <number of fragments>
+#   <blank line>
+#   <raw payload bytes>
+FRAGMENT_PREFIX = b"TYPE: FRAGMENT\n"
+HEADER_END = b"\n\n"
+MAX_HEADER_SIZE = 96
+
+
+def build_fragment_header(frag_id: str, index: int, total: int) -> bytes:
+    return (f"TYPE: FRAGMENT\nFRAG_ID: {frag_id}\nFRAG_INDEX: {index}\nFRAG_TOTAL: {total}\n\n").encode("utf-8")
+
+
+def fragment_message(data: bytes, mtu: int = FRAGMENT_MTU) -> list[bytes]:
+    """
+    Splits an encoded LSNP message into datagrams no larger than the MTU.
+
+    Args:
+        data (bytes): The encoded message.
+        mtu (int): Max datagram size to emit.
+
+    Returns:
+        list[bytes]: [data] unchanged if it already fits, otherwise the fragments in order.
+    """
+    if len(data) <= mtu:
+        return [data]
+
+    payload_size = mtu - MAX_HEADER_SIZE
+    frag_id = uuid.uuid4().hex[:16]
+    total = (len(data) + payload_size - 1) // payload_size
+    view = memoryview(data)
+    return [
+        build_fragment_header(frag_id, i, total) + view[i * payload_size:(i + 1) * payload_size]
+        for i in range(total)
+    ]
+
+
+def parse_fragment(data: bytes):
+    """
+    Splits a fragment datagram into its header fields and payload.
+
+    Returns:
+        tuple: (frag_id, index, total, payload), or None if malformed.
+    """
+    end = data.find(HEADER_END)
+    if end == -1:
+        return None
+    fields = {}
+    for line in data[:end].split(b"\n"):
+        if b":" in line:
+            key, value = line.split(b":", 1)
+            fields[key.strip()] = value.strip()
+    try:
+        frag_id = fields[b"FRAG_ID"].decode("ascii")
+        index = int(fields[b"FRAG_INDEX"])
+        total = int(fields[b"FRAG_TOTAL"])
+    except (KeyError, ValueError, UnicodeDecodeError):
+        return None
+    if total < 1 or not 0 <= index < total:
+        return None
+    return frag_id, index, total, data[end + len(HEADER_END):]
+
+
+class Reassembler:
+    """
+    Collects fragments per (sender IP, FRAG_ID) and returns the original datagram once complete.
+
+    Incomplete messages are discarded after a timeout, and the total buffered
+    payload is capped; when the cap is hit the oldest partial messages go first.
+    """
+    def __init__(self, timeout=REASSEMBLY_TIMEOUT, max_bytes=REASSEMBLY_MAX_BYTES):
+        """
+        Args:
+            timeout (float): Seconds a partial message may wait for its missing fragments.
+            max_bytes (int): Cap on payload bytes buffered across all partial messages.
+        """
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.partial = OrderedDict()  # (ip, frag_id) -> {"created", "total", "parts", "size"}
+        self.buffered = 0
+        self.expired = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    def feed(self, data: bytes, addr):
+        """
+        Accepts one received datagram.
+
+        Args:
+            data (bytes): The datagram payload.
+            addr (tuple): (IP, port) of the sender.
+
+        Returns:
+            bytes | None: A complete message (the datagram itself if it was not a
+            fragment), or None while fragments are still missing.
+        """
+        if not data.startswith(FRAGMENT_PREFIX):
+            return data
+
+        parsed = parse_fragment(data)
+        if parsed is None:
+            verbose_log("DROP!", f"Malformed fragment from {addr[0]}")
+            return None
+        frag_id, index, total, payload = parsed
+        key = (addr[0], frag_id)
+        now = time.monotonic()
+
+        with self._lock:
+            self._expire(now)
+
+            entry = self.partial.get(key)
+            if entry is None:
+                entry = {"created": now, "total": total, "parts": {}, "size": 0}
+                self.partial[key] = entry
+            if index in entry["parts"] or entry["total"] != total:
+                return None
+
+            if len(payload) > self.max_bytes:
+                self._discard(key)
+                return None
+            while self.buffered + len(payload) > self.max_bytes:
+                oldest = next(iter(self.partial))
+                self._discard(oldest)
+                self.evicted += 1
+                if oldest == key:
+                    return None
+
+            entry["parts"][index] = payload
+            entry["size"] += len(payload)
+            self.buffered += len(payload)
+
+            if len(entry["parts"]) < total:
+                return None
+
+            self._discard(key)
+            return b"".join(entry["parts"][i] for i in range(total))
+
+    def _discard(self, key):
+        entry = self.partial.pop(key, None)
+        if entry:
+            self.buffered -= entry["size"]
+
+    def _expire(self, now: float):
+        while self.partial:
+            key, entry = next(iter(self.partial.items()))
+            if now - entry["created"] <= self.timeout:
+                break
+            self._discard(key)
+            self.expired += 1
+            verbose_log("DROP!", f"Reassembly timed out for fragment {key[1]} from {key[0]}")
@@ -0,0 +1,160 @@
+import threading
+import time
+from utils.printer import verbose_log
+
+
+class TypeStats:
+    """
+    Counters for one message TYPE.
+    """
+    __slots__ = ("received", "dropped", "errors", "total_time", "max_time")
+
+    def __init__(self):
+        self.received = 0
+        self.dropped = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+            "avg_time": self.total_time / self.received if self.received else 0.0,
+        }
+
+
+class HandlerRegistry:
+    """
+    Maps message TYPE values to handlers and records per-TYPE metrics.
+
+    Every handler is called as handler(msg, addr, *extras), where extras are
+    the dispatcher attributes named in extra_args at registration, e.g.
+    ("local_profile",) or ("listener", "local_profile"). A handler that
+    discards the message (bad token, duplicate, not addressed to us) returns
+    False, and the message is counted as dropped rather than handled.
+    """
+    def __init__(self):
+        self.handlers = {}  # TYPE -> (handler, extra_args)
+        self.stats = {}     # TYPE -> TypeStats
+        self._lock = threading.Lock()
+
+    def register(self, msg_types, handler, extra_args=()):
+        """
+        Registers a handler for one or more message types.
+
+        Args:
+            msg_types (str | Iterable[str]): TYPE value(s) the handler accepts.
+            handler (function): Called as handler(msg, addr, *extras).
+            extra_args (tuple[str]): Dispatcher attributes passed after addr.
+        """
+        if isinstance(msg_types, str):
+            msg_types = (msg_types,)
+        for msg_type in msg_types:
+            self.handlers[msg_type] = (handler, tuple(extra_args))
+
+    def bind(self, context) -> dict:
+        """
+        Resolves extra_args against a dispatcher once, so routing is a single lookup.
+
+        Args:
+            context: Object holding the attributes named in extra_args.
+
+        Returns:
+            dict: { TYPE: callable(msg, addr) }
+        """
+        routes = {}
+        for msg_type, (handler, extra_args) in self.handlers.items():
+            extras = tuple(getattr(context, name) for name in extra_args)
+            if extras:
+                routes[msg_type] = lambda msg, addr, h=handler, e=extras: h(msg, addr, *e)
+            else:
+                routes[msg_type] = handler
+        return routes
+
+    def _stats_for(self, msg_type) -> TypeStats:
+        stats = self.stats.get(msg_type)
+        if stats is None:
+            stats = self.stats.setdefault(msg_type, TypeStats())
+        return stats
+
+    def dispatch(self, routes: dict, msg, addr):
+        """
+        Calls the route for msg's TYPE and records its counters and timing.
+
+        Args:
+            routes (dict): Routes returned by bind().
+            msg (Mapping): The parsed message.
+            addr (tuple): (IP, port) of the sender.
+
+        Returns:
+            bool: False if no handler is registered for the TYPE.
+        """
+        msg_type = msg.get("TYPE")
+        route = routes.get(msg_type)
+
+        if route is None:
+            with self._lock:
+                stats = self._stats_for(msg_type)
+                stats.received += 1
+                stats.dropped += 1
+            verbose_log("WARN", f"Unknown TYPE: {msg_type}")
+            return False
+
+        failed = dropped = False
+        start = time.perf_counter()
+        try:
+            dropped = route(msg, addr) is False
+        except Exception as e:
+            failed = True
+            verbose_log("[Error]", f"{msg_type} handler failed: {e}")
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            stats = self._stats_for(msg_type)
+            stats.received += 1
+            stats.total_time += elapsed
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+            if failed:
+                stats.errors += 1
+            if dropped:
+                stats.dropped += 1
+        return True
+
+    def record_drop(self, msg_type: str):
+        """
+        Counts a message of msg_type that was discarded before reaching its handler.
+        """
+        with self._lock:
+            stats = self._stats_for(msg_type)
+            stats.received += 1
+            stats.dropped += 1
+
+    def get_stats(self) -> dict:
+        """
+        Returns a snapshot of the per-TYPE counters, busiest TYPE first.
+
+        Returns:
+            dict: { TYPE: { received, dropped, errors, total_time, max_time, avg_time } }
+        """
+        with self._lock:
+            snapshot = {msg_type: stats.to_dict() for msg_type, stats in self.stats.items()}
+        return dict(sorted(snapshot.items(), key=lambda item: item[1]["total_time"], reverse=True))
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+
+
+registry = HandlerRegistry()
+
+
+def get_type_stats() -> dict:
+    """
+    Returns the per-TYPE counters of the shared registry.
+    """
+    return registry.get_stats()
@@ -0,0 +1,100 @@
+from collections.abc import Mapping
+
+_WHITESPACE = b" \t\r\x0b\x0c\x1c\x1d\x1e\x1f"  # ASCII bytes str.strip() removes, except "\n"
+
+
+class LazyMessage(Mapping):
+    """
+    A read-only, dict-compatible view of a raw LSNP datagram.
+
+    The constructor makes one pass over the bytes to record where each value
+    starts and ends; nothing is decoded until a field is read, and each field
+    is decoded at most once. Messages dropped after checking TYPE, TO or TOKEN
+    never pay for decoding their CONTENT or DATA.
+
+    Parsing rules match dispatcher.parse_message: one "KEY: value" per line,
+    split on the first colon, whitespace stripped, lines without a colon skipped,
+    later duplicates win. Keys and values are decoded before they are stripped,
+    so Unicode whitespace and invalid UTF-8 end up exactly as parse_message
+    leaves them.
+    """
+    __slots__ = ("_buf", "_offsets", "_cache")
+
+    def __init__(self, data):
+        """
+        Args:
+            data (bytes | bytearray | memoryview): The received datagram.
+        """
+        if isinstance(data, memoryview):
+            data = data.obj if isinstance(data.obj, bytes) and data.nbytes == len(data.obj) else data.tobytes()
+        elif isinstance(data, bytearray):
+            data = bytes(data)
+        self._buf = data
+        self._offsets = self._index(data)
+        self._cache = {}
+
+    @staticmethod
+    def _index(buf: bytes) -> dict:
+        # Values are recorded unstripped as (colon + 1, end of line); stripping
+        # happens on decode so the scan stays a pair of C-level find() calls per line.
+        offsets = {}
+        find = buf.find
+        length = len(buf)
+        pos = 0
+        while pos < length:
+            end = find(b"\n", pos)
+            if end == -1:
+                end = length
+            colon = find(b":", pos, end)
+            if colon != -1:
+                offsets[buf[pos:colon].decode("utf-8", errors="ignore").strip()] = (colon + 1, end)
+            pos = end + 1
+        return offsets
+
+    def _span(self, key: str):
+        start, stop = self._offsets[key]
+        buf = self._buf
+        while start < stop and buf[start] in _WHITESPACE:
+            start += 1
+        while stop > start and buf[stop - 1] in _WHITESPACE:
+            stop -= 1
+        return start, stop
+
+    def __getitem__(self, key: str) -> str:
+        value = self._cache.get(key)
+        if value is None:
+            start, stop = self._span(key)
+            value = self._buf[start:stop].decode("utf-8", errors="ignore").strip()
+            self._cache[key] = value
+        return value
+
+    def get(self, key: str, default=None):
+        if key in self._offsets:
+            return self[key]
+        return default
+
+    def __contains__(self, key) -> bool:
+        return key in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def raw(self, key: str) -> memoryview:
+        """
+        Returns the undecoded bytes of a field without copying, e.g. for base64 DATA.
+        Only ASCII whitespace is stripped here.
+        """
+        start, stop = self._span(key)
+        return memoryview(self._buf)[start:stop]
+
+    def text(self) -> str:
+        """
+        Decodes the whole datagram, for logging.
+        """
+        return self._buf.decode("utf-8", errors="ignore")
+
+    def __repr__(self):
+        return f"LazyMessage({dict(self)!r})"
@@ -0,0 +1,198 @@
+import heapq
+import threading
+import time
+from config import RTO_INITIAL, RTO_MIN, RTO_MAX, MAX_RETRIES
+from core.ack_registry import register_ack, cancel_ack
+from core.task_scheduler import task_scheduler
+from utils.printer import verbose_log
+
+
+class RttEstimator:
+    """
+    Smoothed RTT and retransmission timeout for one peer (RFC 6298).
+    """
+    __slots__ = ("srtt", "rttvar", "rto")
+
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = None
+        self.rto = RTO_INITIAL
+
+    def sample(self, rtt: float):
+        """
+        Feeds one RTT measurement taken from a message that was not retransmitted.
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.rto = min(RTO_MAX, max(RTO_MIN, self.srtt + 4 * self.rttvar))
+
+
+class OutgoingMessage:
+    __slots__ = ("message_id", "udp", "data", "ip", "on_ack", "on_failure",
+                 "max_retries", "give_up_at", "sample_rtt", "first_sent", "last_sent", "retries", "deadline")
+
+    def __init__(self, message_id, udp, data, ip, on_ack, on_failure, max_retries, give_up_at, sample_rtt=True):
+        self.message_id = message_id
+        self.udp = udp
+        self.data = data
+        self.ip = ip
+        self.on_ack = on_ack
+        self.on_failure = on_failure
+        self.max_retries = max_retries
+        self.give_up_at = give_up_at
+        self.sample_rtt = sample_rtt
+        self.first_sent = None
+        self.last_sent = None
+        self.retries = 0
+        self.deadline = None
+
+
+class ReliableSender:
+    """
+    Retransmits unicast messages until they are ACKed, with exponential backoff.
+
+    All retransmission deadlines live in one heap, served by a single
+    "retransmit" task on the shared TaskScheduler that is re-armed for the
+    earliest deadline. Each peer IP has its own RttEstimator fed by ACK
+    timing; retransmitted messages are not sampled (Karn's algorithm), nor
+    are messages whose ACK waits on the user rather than the network. When
+    retries run out the pending ACK is evicted and on_failure fires, so
+    nothing waits forever.
+    """
+    def __init__(self, scheduler=task_scheduler):
+        self.estimators = {}  # ip -> RttEstimator
+        self.pending = {}     # message_id -> OutgoingMessage
+        self._heap = []       # (deadline, message_id)
+        self._lock = threading.Lock()
+        self.scheduler = scheduler
+        self._timer = None
+
+    def get_estimator(self, ip: str) -> RttEstimator:
+        estimator = self.estimators.get(ip)
+        if estimator is None:
+            estimator = self.estimators.setdefault(ip, RttEstimator())
+        return estimator
+
+    def send(self, udp, message: str, ip: str, message_id: str, on_ack=None, on_failure=None,
+             max_retries=MAX_RETRIES, give_up_after=None, sample_rtt=True):
+        """
+        Sends a message by unicast and retransmits it until its ACK arrives.
+
+        Args:
+            udp: The transport used to send.
+            message (str): The LSNP-formatted message.
+            ip (str): The IP address of the target peer.
+            message_id (str): The id the peer's ACK will carry.
+            on_ack (function, optional): Called with the parsed ACK.
+            on_failure (function, optional): Called once if the message is never ACKed.
+            max_retries (int): Retransmissions before giving up.
+            give_up_after (float, optional): After max_retries, keep retransmitting
+                every RTO_MAX until this many seconds after the first send,
+                e.g. for a FILE_OFFER awaiting a human decision.
+            sample_rtt (bool): False if the ACK waits on a user decision, so its
+                delay says nothing about the network and must not feed the RTO.
+        """
+        now = time.monotonic()
+        give_up_at = now + give_up_after if give_up_after is not None else None
+        outgoing = OutgoingMessage(message_id, udp, message, ip, on_ack, on_failure, max_retries, give_up_at, sample_rtt)
+
+        register_ack(message_id, lambda ack_msg: self._acked(message_id, ack_msg))
+        with self._lock:
+            self.pending[message_id] = outgoing
+
+        self._transmit(outgoing, now)
+
+    def _transmit(self, outgoing: OutgoingMessage, now: float):
+        rto = self.get_estimator(outgoing.ip).rto * (2 ** outgoing.retries)
+        with self._lock:
+            if outgoing.message_id not in self.pending:
+                return
+            if outgoing.first_sent is None:
+                outgoing.first_sent = now
+            outgoing.last_sent = now
+            outgoing.deadline = now + min(rto, RTO_MAX)
+            if outgoing.give_up_at is not None and outgoing.retries >= outgoing.max_retries:
+                # Out of retries but still within give_up_after: probe at the slowest rate
+                outgoing.deadline = min(now + RTO_MAX, outgoing.give_up_at)
+            heapq.heappush(self._heap, (outgoing.deadline, outgoing.message_id))
+            self._arm(outgoing.deadline - now)
+        outgoing.udp.send_unicast(outgoing.data, outgoing.ip)
+
+    def _acked(self, message_id: str, ack_msg):
+        with self._lock:
+            outgoing = self.pending.pop(message_id, None)
+        if outgoing is None:
+            return
+        if outgoing.sample_rtt and outgoing.retries == 0:
+            self.get_estimator(outgoing.ip).sample(time.monotonic() - outgoing.last_sent)
+        if outgoing.on_ack:
+            outgoing.on_ack(ack_msg)
+
+    def cancel(self, message_id: str):
+        """
+        Stops retransmitting a message without firing any callback.
+        """
+        with self._lock:
+            self.pending.pop(message_id, None)
+        cancel_ack(message_id)
+
+    def _arm(self, delay: float):
+        # Caller holds _lock; makes the retransmit task due no later than delay from now
+        if self._timer is None:
+            self._timer = self.scheduler.once("retransmit", max(delay, 0.0), self._on_timer)
+        else:
+            self.scheduler.reschedule(self._timer, max(delay, 0.0), earlier_only=True)
+
+    def _on_timer(self):
+        due = []
+        with self._lock:
+            now = time.monotonic()
+            while self._heap:
+                deadline, message_id = self._heap[0]
+                outgoing = self.pending.get(message_id)
+                if outgoing is None or outgoing.deadline != deadline:
+                    heapq.heappop(self._heap)  # acked, cancelled or rescheduled
+                    continue
+                if deadline > now:
+                    self._arm(deadline - now)
+                    break
+                heapq.heappop(self._heap)
+                due.append(outgoing)
+
+        for outgoing in due:
+            self._on_timeout(outgoing, time.monotonic())
+
+    def _on_timeout(self, outgoing: OutgoingMessage, now: float):
+        if outgoing.retries < outgoing.max_retries:
+            outgoing.retries += 1
+            verbose_log("RETRY", f"Retransmitting {outgoing.message_id} to {outgoing.ip} (attempt {outgoing.retries})")
+            self._transmit(outgoing, now)
+            return
+
+        if outgoing.give_up_at is not None and now < outgoing.give_up_at:
+            # Keep probing at the slowest rate until the grace period ends
+            self._transmit(outgoing, now)
+            return
+
+        with self._lock:
+            if self.pending.pop(outgoing.message_id, None) is None:
+                return
+        cancel_ack(outgoing.message_id)
+        verbose_log("DROP!", f"No ACK for {outgoing.message_id} from {outgoing.ip} after {outgoing.retries} retries")
+        if outgoing.on_failure:
+            outgoing.on_failure()
+
+
+reliable_sender = ReliableSender()
+
+
+def send_reliable(udp, message: str, ip: str, message_id: str, on_ack=None, on_failure=None,
+                  max_retries=MAX_RETRIES, give_up_after=None, sample_rtt=True):
+    """
+    Sends a unicast message through the shared ReliableSender.
+    """
+    reliable_sender.send(udp, message, ip, message_id, on_ack, on_failure, max_retries, give_up_after, sample_rtt)
@@ -0,0 +1,185 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from utils.printer import verbose_log
+
+
+class ScheduledTask:
+    __slots__ = ("name", "callback", "interval", "jitter", "next_run", "last_run", "last_duration",
+                 "runs", "errors", "cancelled", "_key")
+
+    def __init__(self, name, callback, interval, jitter):
+        self.name = name
+        self.callback = callback
+        self.interval = interval  # None for a one-shot task
+        self.jitter = jitter
+        self.next_run = None
+        self.last_run = None
+        self.last_duration = None
+        self.runs = 0
+        self.errors = 0
+        self.cancelled = False
+        self._key = None          # (next_run, seq) of its live heap entry
+
+
+class TaskScheduler:
+    """
+    Runs every timer-driven job (broadcasts, sweeps, retransmissions, storage
+    flushes) from one thread, so adding a timer does not add a thread.
+
+    Tasks sit in a min-heap keyed by their next run time. Rescheduling or
+    cancelling a task only changes the task; its old heap entry is skipped
+    when it comes up. Periodic tasks are rescheduled interval seconds after
+    their previous slot, moved by up to +/- jitter * interval so peers
+    started together do not broadcast in lockstep. Callbacks run on the
+    scheduler thread and must not block for long.
+    """
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.tasks = {}  # name -> ScheduledTask
+        self._heap = []  # (next_run, seq, task)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def _push(self, task: ScheduledTask, when: float):
+        # Caller holds _cond
+        task.next_run = when
+        task._key = (when, next(self._seq))
+        heapq.heappush(self._heap, (*task._key, task))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="lsnp-timers", daemon=True)
+            self._thread.start()
+        self._cond.notify()
+
+    def _jittered(self, interval: float, jitter: float) -> float:
+        return interval * (1 + random.uniform(-jitter, jitter)) if jitter else interval
+
+    def every(self, name: str, interval: float, callback, jitter: float = 0.0, delay: float = None) -> ScheduledTask:
+        """
+        Registers a periodic task, replacing any task with the same name.
+
+        Args:
+            name (str): Registry name, e.g. "profile-broadcast".
+            interval (float): Seconds between runs.
+            callback (function): Called with no arguments.
+            jitter (float): Fraction of interval each run may move by, e.g. 0.1.
+            delay (float, optional): Seconds until the first run; defaults to one interval.
+        """
+        task = ScheduledTask(name, callback, interval, jitter)
+        with self._cond:
+            self._replace(task)
+            first = self._jittered(interval, jitter) if delay is None else delay
+            self._push(task, self.clock() + first)
+        return task
+
+    def once(self, name: str, delay: float, callback) -> ScheduledTask:
+        """
+        Registers a task that runs once after delay seconds, replacing any task with the same name.
+        """
+        task = ScheduledTask(name, callback, None, 0.0)
+        with self._cond:
+            self._replace(task)
+            self._push(task, self.clock() + delay)
+        return task
+
+    def _replace(self, task: ScheduledTask):
+        old = self.tasks.get(task.name)
+        if old is not None:
+            old.cancelled = True
+            old._key = None
+        self.tasks[task.name] = task
+
+    def reschedule(self, task: ScheduledTask, delay: float = 0.0, earlier_only: bool = False):
+        """
+        Moves a task's next run to delay seconds from now.
+
+        Args:
+            earlier_only (bool): Leave the task alone if it is already due sooner.
+        """
+        with self._cond:
+            if task.cancelled:
+                return
+            when = self.clock() + delay
+            if earlier_only and task._key is not None and task.next_run <= when:
+                return
+            self.tasks[task.name] = task  # a one-shot task leaves the registry after it runs
+            self._push(task, when)
+
+    def cancel(self, task: ScheduledTask):
+        with self._cond:
+            task.cancelled = True
+            task._key = None
+            if self.tasks.get(task.name) is task:
+                del self.tasks[task.name]
+
+    def _next_due(self):
+        # Caller holds _cond. Pops the next live task that is due, or returns the seconds to wait
+        while self._heap:
+            when, seq, task = self._heap[0]
+            if task.cancelled or task._key != (when, seq):
+                heapq.heappop(self._heap)  # cancelled or rescheduled
+                continue
+            now = self.clock()
+            if when > now:
+                return None, when - now
+            heapq.heappop(self._heap)
+            task._key = None
+            return task, 0.0
+        return None, None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                task, wait = self._next_due()
+                if task is None:
+                    # Waiting without releasing _cond in between, so a task pushed
+                    # meanwhile cannot notify before we are listening
+                    self._cond.wait(wait)
+                    continue
+
+            started = self.clock()
+            try:
+                task.callback()
+            except Exception as e:
+                task.errors += 1
+                verbose_log("[Error]", f"Scheduled task {task.name} failed: {e}")
+            finished = self.clock()
+            task.runs += 1
+            task.last_run = started
+            task.last_duration = finished - started
+
+            with self._cond:
+                if task.cancelled:
+                    continue
+                if task.interval is not None and task._key is None:
+                    # The next slot follows the previous one, so a slow callback does not cause drift
+                    when = max(task.next_run + self._jittered(task.interval, task.jitter), finished)
+                    self._push(task, when)
+                elif task.interval is None and task._key is None and self.tasks.get(task.name) is task:
+                    del self.tasks[task.name]
+
+    def get_tasks(self) -> list:
+        """
+        Returns one dict per registered task, soonest first.
+        """
+        now = self.clock()
+        with self._cond:
+            tasks = list(self.tasks.values())
+        rows = [
+            {
+                "name": task.name,
+                "interval": task.interval,
+                "next_in": None if task._key is None else task.next_run - now,
+                "last_duration": task.last_duration,
+                "runs": task.runs,
+                "errors": task.errors,
+            }
+            for task in tasks
+        ]
+        return sorted(rows, key=lambda row: float("inf") if row["next_in"] is None else row["next_in"])
+
+
+task_scheduler = TaskScheduler()
@@ -1,10 +1,11 @@
 import time
+from config import REVOCATION_CLEANUP_INTERVAL
+from core.task_scheduler import task_scheduler
+from storage.revocation_list import RevocationList
 from utils.printer import verbose_log
 
-# Stores revoked tokens with their expiry time
-# Key: token string
-# Value: expiry UNIX timestamp
-revoked_tokens = {}
+# Stores revoked tokens until their expiry time
+revoked_tokens = RevocationList()
 
 
 def parse_token(token: str):
@@ -75,15 +76,27 @@ def revoke_token(token):
     """
     _, expiry, _ = parse_token(token)
     if expiry:
-        revoked_tokens[token] = expiry
+        revoked_tokens.add(token, expiry)
 
 
 def cleanup_revoked_tokens():
     """
     Removes expired tokens from the revocation list.
-    Should be called periodically in the main loop.
+    Only tokens that have actually expired are touched.
+
+    Returns:
+        int: Number of tokens removed.
     """
-    now = int(time.time())
-    for t, exp in list(revoked_tokens.items()):
-        if exp < now:
-            del revoked_tokens[t]
\ No newline at end of file
+    return revoked_tokens.purge_expired()
+
+
+def start_revocation_cleanup(interval=REVOCATION_CLEANUP_INTERVAL):
+    """
+    Schedules a purge of expired revoked tokens every interval seconds.
+    """
+    def cleanup():
+        removed = cleanup_revoked_tokens()
+        if removed:
+            verbose_log("INFO", f"Purged {removed} expired revoked token(s)")
+
+    return task_scheduler.every("revocation-cleanup", interval, cleanup)
\ No newline at end of file
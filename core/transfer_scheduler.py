@@ -0,0 +1,126 @@
+import threading
+import time
+from config import FILE_RATE_LIMIT
+from utils.printer import verbose_log
+
+
+class TransferScheduler:
+    """
+    Sends the chunks of every outgoing file transfer from one worker thread.
+
+    Active transfers take turns round-robin; each turn a transfer may send up
+    to its weight in chunks. A token bucket caps the combined outbound rate at
+    rate_limit bytes per second (0 = unlimited). Callers such as ACK callbacks
+    only register a transfer and return, so no receive thread ever sends file
+    data.
+
+    A transfer provides:
+        next_chunk(now) -> (index, hint) | None: claim the next chunk to send;
+            hint is handed back to transmit_chunk (SACK_NOW, or a repair target)
+        wait_time(now) -> float: seconds until next_chunk might return something
+        transmit_chunk(index, hint) -> int: read and send it, returning payload bytes
+        finished -> bool, finish(): called once when finished turns true
+        weight -> int
+    """
+    def __init__(self, rate_limit=FILE_RATE_LIMIT):
+        self.rate_limit = rate_limit
+        self.transfers = []
+        self._cursor = 0
+        self._tokens = 0.0
+        self._refilled = time.monotonic()
+        self._wakeups = 0  # bumped by add()/wake() so a notify just before wait() is not lost
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def add(self, transfer):
+        with self._cond:
+            self.transfers.append(transfer)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="lsnp-transfers", daemon=True)
+                self._thread.start()
+            self._wakeups += 1
+            self._cond.notify()
+
+    def wake(self):
+        """
+        Tells the worker a transfer may have become sendable, e.g. after a FILE_SACK.
+        """
+        with self._cond:
+            self._wakeups += 1
+            self._cond.notify()
+
+    def set_rate_limit(self, bytes_per_second: int):
+        with self._cond:
+            self.rate_limit = bytes_per_second
+            self._cond.notify()
+
+    def _bucket_wait(self, now: float) -> float:
+        # Seconds until the bucket is out of debt; 0 if a chunk may go now
+        if not self.rate_limit:
+            return 0.0
+        capacity = max(self.rate_limit / 10, 4096)
+        self._tokens = min(capacity, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate_limit
+
+    def _next_turn(self, now: float):
+        # Picks the next transfer with a chunk ready, starting after the last one served
+        with self._cond:
+            wakeups = self._wakeups
+            for transfer in [t for t in self.transfers if t.finished]:
+                self.transfers.remove(transfer)
+                transfer.finish()
+            count = len(self.transfers)
+            wait = None
+            for step in range(count):
+                position = (self._cursor + step) % count
+                transfer = self.transfers[position]
+                claimed = []
+                while len(claimed) < transfer.weight:
+                    chunk = transfer.next_chunk(now)
+                    if chunk is None:
+                        break
+                    claimed.append(chunk)
+                if claimed:
+                    self._cursor = position + 1
+                    return transfer, claimed, 0.0, wakeups
+                transfer_wait = transfer.wait_time(now)
+                wait = transfer_wait if wait is None else min(wait, transfer_wait)
+            return None, None, wait, wakeups
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            with self._cond:
+                bucket_wait = self._bucket_wait(now)
+                if bucket_wait:
+                    self._cond.wait(bucket_wait)
+                    continue
+
+            transfer, claimed, wait, wakeups = self._next_turn(now)
+            if transfer is None:
+                with self._cond:
+                    if self._wakeups == wakeups:
+                        self._cond.wait(wait)
+                continue
+
+            for index, hint in claimed:
+                try:
+                    sent = transfer.transmit_chunk(index, hint)
+                except Exception as e:
+                    verbose_log("[Error]", f"Sending chunk {index} failed: {e}")
+                    continue
+                if self.rate_limit:
+                    with self._cond:
+                        self._tokens -= sent
+
+    def get_progress(self) -> list:
+        """
+        Returns one progress dict per active transfer (see FileTransfer.progress).
+        """
+        with self._cond:
+            transfers = list(self.transfers)
+        return [transfer.progress() for transfer in transfers]
+
+
+transfer_scheduler = TransferScheduler()
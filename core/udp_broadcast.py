@@ -1,26 +1,35 @@
 import socket
 import threading
-from config import BUFFER_SIZE
-from utils.network_utils import get_broadcast_ip, get_local_ip
+from config import BUFFER_SIZE, BROADCAST_INTERFACE
+from core.dispatch_pool import DispatchPool
+from core.fragmentation import Reassembler, fragment_message
+from utils.network_utils import interface_resolver
 from utils.printer import verbose_log
 
 class UDPListener:
     """
         A UDP communication wrapper for LSNP peers.
     """
-    def __init__(self, port=50999):
+    def __init__(self, port=50999, broadcast_interface=BROADCAST_INTERFACE):
         """
            Initializes the UDP socket based on the senders and reuse settings on all network interfaces' ports.
 
            Args:
                port (int): The UDP port to listen on. Default is 50999.
+               broadcast_interface (str, optional): None for the primary interface,
+                   "all" for every interface, or an interface name.
         """
         self.port = port
+        self.broadcast_interface = broadcast_interface
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1) # Remove for non-MAC users
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
         self.sock.bind(('', port))
+        self._running = False
+        self._thread = None
+        self.pool = None
+        self.reassembler = Reassembler()
 
     def start(self, on_message_callback):
         """
@@ -30,35 +39,70 @@ class UDPListener:
             on_message_callback (function): function that processes the received message.
 
         Notes:
-            Runs in a separate daemon thread whatever that is
+            The receive thread only drains the socket into a bounded DispatchPool;
+            the callback gets the raw datagram bytes on one of the pool's worker threads.
         """
+        self.pool = DispatchPool(on_message_callback)
+        self.pool.start()
+
         def listener():
-            while True:
+            while self._running:
                     try:
                         data, addr = self.sock.recvfrom(BUFFER_SIZE)
-                        message = data.decode('utf-8'  , errors='ignore')
-                        on_message_callback(message, addr)
+                        if not self._running:
+                            break
+                        data = self.reassembler.feed(data, addr)
+                        if data is not None:
+                            self.pool.submit(data, addr)
                     except Exception as e:
-                        verbose_log(f"[Error] UDP receive failed: {e}")
-        thread = threading.Thread(target=listener)
-        thread.start()
+                        if self._running:
+                            verbose_log(f"[Error] UDP receive failed: {e}")
+        self._running = True
+        self._thread = threading.Thread(target=listener)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the listener thread by closing the socket under the blocking recvfrom.
+        """
+        self._running = False
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self.pool is not None:
+            self.pool.stop()
 
     def send_broadcast(self, message: str):
         """
         UDP senders to all peers on the local network.
 
         Args:
-            message (str): The LSNP-formatted message to send; TODO change to actual receiver
+            message (str | bytes): The LSNP-formatted message to send, or an encoded
+                frame such as a binary FILE_CHUNK; TODO change to actual receiver
         """
-        broadcast_ip = get_broadcast_ip()
-        self.sock.sendto(message.encode('utf-8'), (broadcast_ip, self.port))
+        data = message if isinstance(message, (bytes, bytearray)) else message.encode('utf-8')
+        for broadcast_ip in interface_resolver.get_broadcast_addresses(self.broadcast_interface):
+            self._sendto(data, (broadcast_ip, self.port))
 
     def send_unicast(self, message, ip: str):
         """
         Sends a message via UDP unicast directly to a specific peer's IP.
 
         Args:
-            message (str): The LSNP-formatted message to send.
+            message (str | bytes): The LSNP-formatted message, or an already
+                encoded frame such as a binary FILE_CHUNK.
             ip (str): The IP address of the target peer; TODO change to actual receiver
         """
-        self.sock.sendto(message.encode('utf-8'), (ip, self.port))
\ No newline at end of file
+        data = message if isinstance(message, (bytes, bytearray)) else message.encode('utf-8')
+        self._sendto(data, (ip, self.port))
+
+    def _sendto(self, data: bytes, addr):
+        """
+        Sends a datagram, splitting it into fragments if it exceeds FRAGMENT_MTU.
+        """
+        for fragment in fragment_message(data):
+            self.sock.sendto(fragment, addr)
\ No newline at end of file
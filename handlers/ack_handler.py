@@ -15,11 +15,11 @@ def handle_ack(msg: dict, addr: tuple):
 
     if not message_id or not status:
         verbose_log("ACK", "Malformed ACK message received.")
-        return
+        return False
 
     verbose_log("ACK", f"Received ACK for {message_id} with status {status} from {addr[0]}")
 
-    if resolve_ack(message_id) or resolve_ack(file_id):
+    if resolve_ack(message_id, msg) or resolve_ack(file_id, msg):
         verbose_log("ACK", f"ACK resolved and callback executed for {message_id if message_id else file_id}")
     else:
         verbose_log("ACK", f"No pending ACK for {message_id}")
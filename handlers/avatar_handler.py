@@ -0,0 +1,28 @@
+from senders.avatar_unicast import send_avatar
+from storage.avatar_cache import avatar_cache
+from utils.printer import verbose_log
+
+def handle_avatar_request(msg, addr, listener, local_profile):
+    """
+    Handles an AVATAR_REQUEST: replies by unicast if it asks for our current avatar.
+    """
+    if msg.get("TO") != local_profile.user_id:
+        return False
+    if not local_profile.avatar_hash or msg.get("AVATAR_HASH") != local_profile.avatar_hash:
+        verbose_log("DROP!", f"AVATAR_REQUEST from {msg.get('FROM')} for an avatar we do not have")
+        return False
+    send_avatar(listener, local_profile, addr[0])
+
+def handle_avatar(msg, addr):
+    """
+    Handles an AVATAR reply. The bytes are kept only if they match the digest
+    the sender advertised.
+    """
+    user_id = msg.get("USER_ID")
+    avatar_hash = msg.get("AVATAR_HASH")
+    if not avatar_hash or not msg.get("AVATAR_DATA"):
+        return False
+    if not avatar_cache.store(msg.get("AVATAR_TYPE"), msg.get("AVATAR_DATA"), avatar_hash):
+        verbose_log("DROP!", f"AVATAR from {user_id} does not match its AVATAR_HASH")
+        return False
+    verbose_log("AVATAR", f"Received avatar {avatar_hash[:12]} of {user_id}")
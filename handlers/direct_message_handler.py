@@ -20,13 +20,13 @@ def handle_dm(msg, addr):
     if not validate_token(token, "chat"):
         verbose_log("DROP!", f"Expired/Rejected DM sent by {from_user}: {content} - {current_unix_time()}")
         notif_log(f"Expired/Rejected DM sent by {from_user}: {content}")
-        return
+        return False
     
     token_user,_,_ = parse_token(token)
     if token_user != from_user:
         verbose_log("DROP!", f"Token user '{token_user}' != DM sender '{from_user}' - {current_unix_time()}")
         notif_log(f"Token and DM sender mismatch")
-        return
+        return False
     
     # _, declared_ip = parse_user_id_ip(from_user)
     # if declared_ip and declared_ip != addr[0]:
@@ -44,4 +44,6 @@ def handle_dm(msg, addr):
 
     udp = get_udp_listener()
     ack_str = build_ack_for(message_id, to_user)
-    udp.send_unicast(ack_str, addr[0])
\ No newline at end of file
+    udp.send_unicast(ack_str, addr[0])
+    if not status:
+        return False  # ACKed again, but not stored twice
\ No newline at end of file
@@ -1,9 +1,19 @@
 import os
 import base64
-from models.file_transfer import FileTransferResponder
+import threading
+from config import FILE_SACK_EVERY, FILE_SACK_BITS, FILE_JOURNAL_EVERY, DOWNLOADS_DIR, GROUP_FILE_AUTO_ACCEPT
+from core.token_validator import validate_token
+from models.file_transfer import FileTransferResponder, GroupFileTransfer, accepted_offers, outgoing_transfers
+from models.send_window import encode_sack_bitmap
+from storage.content_index import content_index
+from storage.group_directory import get_group_members, get_group_name
+from storage.partial_file import PartialFile
+from storage.transfer_journal import find_journal, offer_resume, take_resume, open_journal, save_journal, remove_journal
 from ui.cli import flush_pending_logs, pending_file_offers, pending_logs  # import both queues
-from utils.printer import NOTIFICATIONS
+from utils.printer import NOTIFICATIONS, verbose_log
 file_buffer = {}
+declined_offers = set()  # FILEIDs the user declined, so retransmitted offers are not asked again
+_offers_lock = threading.Lock()  # serializes creating file_buffer entries
 
 def handle_file(msg: dict, addr: tuple, listener, local_profile):
     """
@@ -17,54 +27,290 @@ def handle_file(msg: dict, addr: tuple, listener, local_profile):
 
     responder = FileTransferResponder(listener)
 
+    if "PAYLOAD" in msg:
+        # Binary frames carry no FROM/TO; only take them from the peer whose offer we accepted
+        entry = file_buffer.get(file_id)
+        if entry is None or entry["sender_ip"] != ip or file_id not in accepted_offers:
+            return False
+        from_user, to_user = entry["from_user"], entry["to_user"]
+
     if to_user != local_profile.user_id:
-        return None
+        return False
     
-    if msg_type == "FILE_OFFER":
-        pending_file_offers.put((msg, addr))
-        file_buffer[file_id] = {
-            "filename": "received_" + msg["FILENAME"],
-            "chunks": {},
-            "total_chunks": 0,
-            "from_user": from_user,
-            "to_user": to_user,
-            "sender_ip": ip,
-            "original_message_id": msg["FILEID"]
-        }
+    if msg_type in ("FILE_OFFER", "GROUP_FILE_OFFER"):
+        # Group offers are ACKed per member by MESSAGE_ID, and accepted without asking
+        # only if GROUP_FILE_AUTO_ACCEPT is set
+        group = msg_type == "GROUP_FILE_OFFER"
+        if group and not group_offer_allowed(msg, local_profile):
+            return False
+        message_id = msg.get("MESSAGE_ID") if group else None
+
+        # Handlers run concurrently, so a retransmitted offer may arrive while the first is handled
+        with _offers_lock:
+            # The sender retransmits the offer until it is ACKed
+            if file_id in declined_offers:
+                if group:
+                    responder.decline_file_offer(ip, message_id)
+                return False
+            if file_id in file_buffer:
+                if file_id in accepted_offers:
+                    entry = file_buffer[file_id]
+                    responder.accept_file_offer(ip, file_id, sack=entry["sack"], binary=entry["binary"],
+                                                dedup=entry["dedup"], message_id=message_id)
+                return
+
+            filesize = int(msg.get("FILESIZE", 0))
+            filehash = msg.get("FILEHASH")
+            path = download_path("received_" + msg["FILENAME"])
+
+            # Content we already downloaded: complete it locally, no chunks needed
+            existing = content_index.lookup(filehash, filesize) if filehash else None
+            if existing is not None:
+                complete_from_index(file_id, msg, ip, existing, path, responder, message_id)
+                return
+
+            # Same content as an unfinished download: the accept ACK will carry its bitmap
+            journal = find_journal(os.path.dirname(path), filehash, filesize)
+            if journal is not None:
+                offer_resume(file_id, journal)
+                path = journal["path"]
+
+            file_buffer[file_id] = {
+                "filename": os.path.basename(path),
+                "path": path,
+                "filesize": filesize,
+                "filehash": filehash,
+                "file": None,           # PartialFile, opened on the first chunk
+                "lock": threading.Lock(),  # guards file, next_missing and the counters below
+                "total_chunks": 0,
+                "next_missing": 0,      # every chunk below this has arrived
+                "since_sack": 0,
+                "since_journal": 0,
+                "sack": msg.get("TRANSFER_MODE") == "WINDOW",
+                "binary": group or msg.get("FRAMING") == "BINARY",
+                "dedup": False,
+                "complete": False,
+                "from_user": from_user,
+                "to_user": to_user,
+                "sender_ip": ip,
+                "original_message_id": msg["FILEID"]
+            }
+            if group and GROUP_FILE_AUTO_ACCEPT:
+                responder.accept_file_offer(ip, file_id, message_id=message_id)
+                NOTIFICATIONS.append(f"📥 {from_user} is sharing {msg.get('FILENAME')} with {get_group_name(msg.get('GROUP_ID'))}")
+            else:
+                pending_file_offers.put((msg, addr))
 
     elif msg_type == "FILE_CHUNK":
-        if file_id not in file_buffer:
+        entry = file_buffer.get(file_id)
+        if entry is None:
             NOTIFICATIONS.append("⚠️ Received chunk for unknown file")
-            return
+            return False
+        if file_id not in accepted_offers:
+            verbose_log("WARN", f"Dropped chunk for {file_id}: offer not accepted")
+            return False
+
+        # Chunks of one file may be handled concurrently; the first one opens the .part file
+        with entry["lock"]:
+            if entry["complete"]:
+                partial = None
+            elif entry["file"] is None:
+                partial = entry["file"] = open_download(file_id, entry, msg)
+            else:
+                partial = entry["file"]
+            chunk_num = int(msg["CHUNK_INDEX"])
+            if not 0 <= chunk_num < entry["total_chunks"]:
+                return
+
+            # Each chunk goes straight to disk; nothing accumulates in memory
+            payload = msg["PAYLOAD"] if "PAYLOAD" in msg else base64.b64decode(msg["DATA"])
+            duplicate = partial is None or not partial.write_chunk(chunk_num, payload)
+            in_order = chunk_num == entry["next_missing"]
+            if partial is not None:
+                entry["next_missing"] = partial.received.first_missing(entry["next_missing"])
+            complete = entry["next_missing"] == entry["total_chunks"]
+
+            if not duplicate and entry["filehash"] and not complete:
+                entry["since_journal"] += 1
+                if entry["since_journal"] >= FILE_JOURNAL_EVERY:
+                    entry["since_journal"] = 0
+                    save_journal(partial, file_id, entry["filehash"], entry["from_user"])
 
-        file_buffer[file_id]["total_chunks"] = int(msg["TOTAL_CHUNKS"])
-        chunk_num = int(msg["CHUNK_INDEX"])
-        data = base64.b64decode(msg["DATA"])
-        file_buffer[file_id]["chunks"][chunk_num] = data
+            if complete and not entry["complete"]:
+                entry["complete"] = True
+                if not save_chunks(file_id, entry, listener):
+                    return  # discarded; the sender was told FAILED rather than sent a final SACK
 
-        if len(file_buffer[file_id]["chunks"]) == file_buffer[file_id]["total_chunks"]:
-            save_chunks(file_id, file_buffer[file_id], listener)
+            if entry["sack"]:
+                entry["since_sack"] += 1
+                if (duplicate or complete or not in_order or msg.get("SACK_NOW")
+                        or entry["since_sack"] >= FILE_SACK_EVERY):
+                    send_file_sack(file_id, entry, responder)
+
+    elif msg_type == "FILE_SACK":
+        transfer = outgoing_transfers.get(file_id)
+        if transfer is not None:
+            transfer.on_sack(msg)
+
+    elif msg_type == "GROUP_FILE_END":
+        # Poll from a group file sender: report what is still missing
+        entry = file_buffer.get(file_id)
+        if entry is None or entry["sender_ip"] != ip:
+            return False
+        with entry["lock"]:
+            if entry["complete"]:
+                responder.confirm_file_received(to_ip=ip, from_user=to_user, to_user=from_user, file_id=file_id)
+            else:
+                send_file_sack(file_id, entry, responder, msg_type="FILE_NAK")
+
+    elif msg_type == "FILE_NAK":
+        transfer = outgoing_transfers.get(file_id)
+        if isinstance(transfer, GroupFileTransfer):
+            transfer.on_nak(from_user, msg)
 
     elif msg_type == "FILE_RECEIVED":
+        transfer = outgoing_transfers.get(file_id)
+        if msg.get("STATUS") == "FAILED":
+            if transfer is not None:
+                transfer.on_failed(from_user)
+            else:
+                NOTIFICATIONS.append(f"❌ {from_user} discarded file {file_id}: it did not match its FILEHASH")
+            return
+        if isinstance(transfer, GroupFileTransfer):
+            transfer.on_received(from_user)
+            return
         NOTIFICATIONS.append(f"✅ Peer confirmed file {msg.get('FILEID')} was saved (STATUS: {msg.get('STATUS')}).")
 
     elif msg_type == "ACK":
         NOTIFICATIONS.append(f"📨 ACK from {from_user}: {msg['STATUS']} for {msg['MESSAGE_ID']}")
 
+def group_offer_allowed(msg, local_profile):
+    """
+    A GROUP_FILE_OFFER is taken only with a valid group token, from a member
+    of a group we belong to.
+    """
+    if not validate_token(msg.get("TOKEN"), "group"):
+        verbose_log("DROP!", "Invalid token for GROUP_FILE_OFFER")
+        return False
+    members = get_group_members(msg.get("GROUP_ID"))
+    return local_profile.user_id in members and msg.get("FROM") in members
+
+def send_file_sack(file_id, entry, responder, msg_type="FILE_SACK"):
+    """
+    Reports the first missing chunk and a bitmap of what arrived after it.
+    A FILE_NAK (answer to GROUP_FILE_END) covers every chunk up to the end.
+    """
+    entry["since_sack"] = 0
+    cumulative = entry["next_missing"]
+    received = entry["file"].received if entry["file"] is not None else ()
+    bits = entry["total_chunks"] - cumulative if msg_type == "FILE_NAK" else FILE_SACK_BITS
+    responder.send_sack(
+        to_ip=entry["sender_ip"],
+        from_user=entry["to_user"],
+        to_user=entry["from_user"],
+        file_id=file_id,
+        cumulative=cumulative,
+        bitmap=encode_sack_bitmap(received, cumulative, entry["total_chunks"], bits),
+        msg_type=msg_type
+    )
+
+def discard_offer(file_id):
+    """
+    Forgets a file offer the user declined, so later chunks for it are dropped
+    and its retransmissions are not queued again.
+    """
+    with _offers_lock:
+        if file_id not in accepted_offers:
+            file_buffer.pop(file_id, None)
+            declined_offers.add(file_id)
+
+def download_path(filename):
+    return os.path.join(os.getcwd(), DOWNLOADS_DIR, filename)
+
+def complete_from_index(file_id, msg, ip, existing, path, responder, message_id=None):
+    """
+    Answers an offer for content already in downloads/ by linking the known
+    file under the offered name and ACKing with DEDUP, so nothing is sent.
+    """
+    filename = content_index.materialize(existing, path)
+    file_buffer[file_id] = {
+        "filename": os.path.basename(filename),
+        "file": None,
+        "lock": threading.Lock(),
+        "total_chunks": 0,
+        "next_missing": 0,
+        "sack": False,
+        "binary": False,
+        "dedup": True,
+        "complete": True,
+        "from_user": msg.get("FROM"),
+        "to_user": msg.get("TO"),
+        "sender_ip": ip,
+        "original_message_id": file_id
+    }
+    responder.accept_file_offer(ip, file_id, dedup=True, message_id=message_id)
+    responder.confirm_file_received(to_ip=ip, from_user=msg.get("TO"), to_user=msg.get("FROM"), file_id=file_id)
+    NOTIFICATIONS.append(f"✅ {msg.get('FROM')} offered {msg.get('FILENAME')}, which you already have; saved as {filename}")
+    flush_pending_logs()
+
+def open_download(file_id, entry, msg):
+    """
+    Opens the .part file for an accepted offer on its first chunk, resuming
+    the journaled one when the chunk layout still matches.
+    """
+    entry["total_chunks"] = int(msg["TOTAL_CHUNKS"])
+    journal = take_resume(file_id)
+    partial = None
+    if journal is not None:
+        last = int(msg["CHUNK_INDEX"]) == entry["total_chunks"] - 1
+        if last or not journal["chunk_size"] or int(msg.get("CHUNK_SIZE", 0)) == journal["chunk_size"]:
+            partial = open_journal(journal, entry["total_chunks"])
+    if partial is None:
+        partial = PartialFile(entry["path"], entry["filesize"], entry["total_chunks"])
+    else:
+        entry["next_missing"] = partial.received.first_missing()
+        NOTIFICATIONS.append(f"↩️ Resuming {entry['filename']} ({partial.received.count}/{entry['total_chunks']} chunks on disk)")
+    if entry["filehash"]:
+        save_journal(partial, file_id, entry["filehash"], entry["from_user"])
+    return partial
+
 def save_chunks(file_id, buffer, listener):
-    downloads_dir = os.path.join(os.getcwd(), "downloads")
-    os.makedirs(downloads_dir, exist_ok=True)
+    """
+    Moves a completed download into place and confirms it to the sender.
 
-    filename = os.path.join(downloads_dir, buffer["filename"])
-    with open(filename, "wb") as f:
-        for i in sorted(buffer["chunks"]):
-            f.write(buffer["chunks"][i])
+    Returns:
+        bool: False if it did not match its FILEHASH; it is then discarded,
+            forgotten, and the sender gets FILE_RECEIVED with STATUS: FAILED.
+    """
+    partial = buffer["file"]
+    responder = FileTransferResponder(listener)
+    if buffer["filehash"] and partial.sha256() != buffer["filehash"]:
+        partial.discard()
+        remove_journal(partial.path)
+        buffer["complete"] = False
+        buffer["file"] = None
+        file_buffer.pop(file_id, None)
+        accepted_offers.discard(file_id)
+        responder.confirm_file_received(
+            to_ip=buffer["sender_ip"],
+            from_user=buffer["to_user"],
+            to_user=buffer["from_user"],
+            file_id=file_id,
+            status="FAILED"
+        )
+        NOTIFICATIONS.append(f"❌ {buffer['filename']} did not match its FILEHASH and was discarded")
+        flush_pending_logs()
+        return False
+
+    # Chunks are already on disk; move the finished temp file into place
+    filename = partial.finalize()
+    remove_journal(filename)
+    content_index.add(filename, buffer["filehash"])
 
     # Add to log queue
     NOTIFICATIONS.append(f"✅ File transfer of {filename} is complete")
 
     # Send FILE_RECEIVED confirmation
-    responder = FileTransferResponder(listener)
     responder.confirm_file_received(
         to_ip=buffer["sender_ip"],
         from_user=buffer["to_user"],
@@ -73,4 +319,5 @@ def save_chunks(file_id, buffer, listener):
     )
 
     # Immediately flush so user sees it now
-    flush_pending_logs()
\ No newline at end of file
+    flush_pending_logs()
+    return True
\ No newline at end of file
@@ -7,6 +7,8 @@ from storage.group_directory import (
     store_group_message,  # NEW: to log group messages centrally
 )
 from core.token_validator import validate_token
+from storage.dedup import content_key
+from utils.message_builder import build_ack_for
 from utils.printer import NOTIFICATIONS, verbose_log
 
 def handle_group_create(msg, addr):
@@ -16,7 +18,7 @@ def handle_group_create(msg, addr):
     """
     if not validate_token(msg.get("TOKEN"), "group"):
         verbose_log("DROP!", "Invalid token for GROUP_CREATE")
-        return
+        return False
 
     group_id = msg.get("GROUP_ID")
     group_name = msg.get("GROUP_NAME")
@@ -38,7 +40,7 @@ def handle_group_update(msg, addr):
     """
     if not validate_token(msg.get("TOKEN"), "group"):
         verbose_log("DROP!", "Invalid token for GROUP_UPDATE")
-        return
+        return False
 
     group_id = msg.get("GROUP_ID")
     add = msg.get("ADD", "").split(",") if msg.get("ADD") else None
@@ -48,22 +50,31 @@ def handle_group_update(msg, addr):
     NOTIFICATIONS.append(f'The group "{get_group_name(group_id)}" member list was updated.')
 
 
-def handle_group_message(msg, addr):
+def handle_group_message(msg, addr, listener, local_profile):
     """
     Handles a GROUP_MESSAGE message.
     Validates token, stores message in group directory, and prints to console.
+    Messages carrying a MESSAGE_ID are ACKed so the sender stops retransmitting.
     """
     if not validate_token(msg.get("TOKEN"), "group"):
         verbose_log("DROP!", "Invalid token for GROUP_MESSAGE")
-        return
+        return False
 
     group_id = msg.get("GROUP_ID")
     sender = msg.get("FROM")
     content = msg.get("CONTENT")
     timestamp = msg.get("TIMESTAMP")
+    message_id = msg.get("MESSAGE_ID")
 
-    # Store in group_directory for later retrieval by CLI
-    store_group_message(group_id, sender, content, timestamp)
+    if message_id:
+        listener.send_unicast(build_ack_for(message_id, local_profile.user_id), addr[0])
+
+    # Store in group_directory for later retrieval by CLI; messages from peers that
+    # send no MESSAGE_ID are deduplicated on their content instead
+    dedup_id = message_id or content_key(group_id, sender, timestamp, content)
+    if not store_group_message(group_id, sender, content, timestamp, dedup_id):
+        verbose_log("DROP!", f"Duplicated/seen GROUP_MESSAGE {message_id} from {sender} (ignored)")
+        return False
 
     # Live print for active session
     NOTIFICATIONS.append(f"[{get_group_name(group_id)}] {sender}: {content}")
@@ -14,18 +14,18 @@ def handle_like(msg, addr):
     if not validate_token(token, "broadcast"):
         verbose_log("DROP!", f"Expired like token, invalid from {from_user} to post {post_ts} by {to_user} - {current_unix_time}")
         notif_log(f"Expired liked token from {from_user}")
-        return
+        return False
 
     token_user, _, _ = parse_token(token)
     if token_user != from_user:
         verbose_log("DROP!", f"Like token user '{token_user}' != From user '{from_user}' - {current_unix_time()}")
         notif_log("Token and from user mismatch")
-        return
+        return False
 
     if action not in ("LIKE", "UNLIKE"):
         verbose_log("DROP!", f"Like unknown action: '{action}' from {from_user} - {current_unix_time()}")
         notif_log(f"Like unknown action: '{action}' from {from_user}")
-        return
+        return False
     
     post_ts_i = int(post_ts)
     # if not has_post(to_user, post_ts_i):
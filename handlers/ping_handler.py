@@ -7,6 +7,6 @@ def handle_ping(msg: dict, addr):
     token = msg.get("TOKEN")
     if not validate_token(token, expected_scope="ping"):
         verbose_log("DROP", f"Invalid ping from {user_id}")
-        return
+        return False
     update_peer_last_seen(user_id)
     verbose_log("PING", f"Ping received from {user_id} ({addr[0]})")
\ No newline at end of file
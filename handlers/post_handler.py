@@ -17,13 +17,13 @@ def handle_post(msg, addr, local_user):
     if not validate_token(token, "broadcast"):
         verbose_log("DROP!", f"Expired/Rejected post uploaded by {poster_id}: {content} - {current_unix_time()}")
         notif_log(f"Expired/Rejected post uploaded by {poster_id}: {content}")
-        return
+        return False
     
     token_user,_,_ = parse_token(token)
     if token_user != poster_id:
         verbose_log("DROP!", f"Token user '{token_user}' != message user '{poster_id}' - {current_unix_time()}")
         notif_log("Token and message user mismatch")
-        return
+        return False
     
     # _, declared_ip = parse_user_id_ip(poster_id)
     # if declared_ip and declared_ip != addr[0]:
@@ -34,7 +34,7 @@ def handle_post(msg, addr, local_user):
     if not is_following(poster_id) and poster_id != local_user.user_id:
         verbose_log("DROP!", f"Expired/Rejected post uploaded by {poster_id} (Not a Follower): {content} - {current_unix_time()}")
         notif_log(f"Receiver is not a follower of Sender")
-        return
+        return False
     
     status = save_post(msg)
 
@@ -45,4 +45,4 @@ def handle_post(msg, addr, local_user):
     else:
         verbose_log("DROP!", f"Duplicated/seen post uploaded by {poster_id} (ignored): {content} - {current_unix_time()}")
         notif_log(f"Post duplicated/seen from {poster_id}: {content}")
-        return
+        return False
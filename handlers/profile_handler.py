@@ -1,24 +1,45 @@
 from models.peer import Profile
-from storage.peer_directory import update_peer
+from senders.avatar_unicast import request_avatar
+from storage.avatar_cache import avatar_cache
+from storage.peer_directory import get_peer, update_peer, update_peer_last_seen
 from utils.printer import verbose_log
-from utils.base64_utils import decode_base64_to_image
-import os
 
-def handle_profile(msg: dict, addr):
+def handle_profile(msg: dict, addr, listener, local_profile):
     """
     Handles a PROFILE message broadcasted by another peer.
 
+    A PROFILE whose PROFILE_VERSION matches the one already stored only
+    refreshes the peer's last-seen time. An advertised AVATAR_HASH we do not
+    have is fetched with an AVATAR_REQUEST; older peers that still send
+    AVATAR_DATA inline are cached directly.
+
     Args:
         msg (dict): A parsed LSNP message containing peer profile info.
         addr (tuple): The sender's network address (IP, port).
+        listener: Transport used to send the AVATAR_REQUEST.
+        local_profile (Profile): This peer's profile.
 
     Note: AI-generated
     """
+    user_id = msg.get("USER_ID")
+    version = msg.get("PROFILE_VERSION")
+    known = get_peer(user_id)
 
-    profile = Profile.from_message(msg, addr)
-    update_peer(profile.user_id, profile)
-
-    if profile.avatar_type and profile.avatar_data:
-        decode_base64_to_image(profile.avatar_data, f"{profile.user_id}_avatar.{profile.avatar_type}")
+    if version and known and known.version == version and known.ip == addr[0]:
+        update_peer_last_seen(user_id)
+        profile = known
+    else:
+        profile = Profile.from_message(msg, addr)
+        update_peer(profile.user_id, profile)
+        verbose_log("INFO", f"Updated peer profile: {profile.user_id} from {addr}")
 
-    verbose_log("INFO", f"Updated peer profile: {profile.user_id} from {addr}")
+    if not profile.avatar_type or not profile.avatar_hash:
+        return
+    avatar_cache.remember(profile.user_id, profile.avatar_hash)
+    if avatar_cache.has(profile.avatar_hash):
+        return
+    # Legacy PROFILEs carry the avatar inline; otherwise ask its owner for it
+    if msg.get("AVATAR_DATA") and avatar_cache.store(profile.avatar_type, msg.get("AVATAR_DATA"), profile.avatar_hash):
+        return
+    if user_id != local_profile.user_id:
+        request_avatar(listener, local_profile, user_id, profile.avatar_hash, addr[0])
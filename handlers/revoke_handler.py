@@ -1,4 +1,5 @@
 from core.token_validator import revoke_token
+from models.file_transfer import cancel_offer
 from utils.printer import verbose_log
 
 
@@ -13,6 +14,8 @@ def handle_revoke(msg, addr):
     token = msg.get("TOKEN")
     if token:
         revoke_token(token)
+        cancel_offer(token, from_ip=addr[0])  # a declined FILE_OFFER is revoked by its receiver
         verbose_log("RECV <", f"REVOKE from {addr[0]}: TOKEN: {token}")
     else:
         verbose_log("DROP!", f"REVOKE from {addr[0]} missing TOKEN field")
+        return False
@@ -29,7 +29,7 @@ def common_checks(msg: dict, expected_type: str):
 def handle_follow(msg, addr):
     ok, from_user, to_user = common_checks(msg, "FOLLOW")
     if not ok:
-        return
+        return False
 
     add_follower(from_user)
 
@@ -39,7 +39,7 @@ def handle_follow(msg, addr):
 def handle_unfollow(msg: dict, addr: tuple):
     ok, from_user, to_user = common_checks(msg, "UNFOLLOW")
     if not ok:
-        return
+        return False
 
     remove_follower(from_user)
 
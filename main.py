@@ -2,7 +2,12 @@ import os
 import questionary
 import config
 from core.udp_broadcast import UDPListener
+from core.async_transport import AsyncUDPTransport
 from core.dispatcher import Dispatcher
+from core.token_validator import start_revocation_cleanup
+from storage.backend import start_storage
+from storage.content_index import start_content_index
+from storage.peer_directory import start_peer_sweeper
 from senders.profile_broadcast import start_broadcast as start_profile_broadcast
 from senders.ping_broadcast import start_broadcast as start_ping_broadcast
 from ui.cli import launch_cli, launch_main_menu
@@ -28,10 +33,16 @@ def main():
         local_profile = launch_cli()
         save_profile_to_file(local_profile, filename)
 
+    # Reload posts, groups, likes and follows saved by earlier runs of this profile
+    start_storage(f"profiles/{profile_tag}.db")
+
     clear_screen()
 
     # Network Core
-    listener = UDPListener()
+    if config.TRANSPORT == "asyncio":
+        listener = AsyncUDPTransport()
+    else:
+        listener = UDPListener()
     dispatcher = Dispatcher(listener, local_profile)
 
     # Start PROFILE senders loop
@@ -40,14 +51,28 @@ def main():
     # Start PING senders loop (keep-alive)
     start_ping_broadcast(local_profile.user_id, listener)
     
+    # Purge expired revoked tokens on a timer rather than per message
+    start_revocation_cleanup()
+
+    # Forget peers that have been silent past PEER_EXPIRY
+    start_peer_sweeper()
+
+    # Index downloads by content hash so repeated offers complete locally
+    start_content_index()
+
     # Start UDP listener
-    listener.start(dispatcher.handle)
+    if config.TRANSPORT == "asyncio":
+        listener.start(dispatcher.handle_async)
+    else:
+        listener.start(dispatcher.handle)
 
     # CLI main menu
     try:
         launch_main_menu(local_profile, listener)
     except KeyboardInterrupt:
         print("Exiting LSNP Peer...")
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,12 +4,29 @@ import base64
 import time
 import mimetypes
 import math
-from utils.printer import verbose_log
+import threading
+from collections import deque
+from config import FILE_OFFER_TIMEOUT, FILE_MAX_TIMEOUTS, FILE_BINARY_FRAMING, GROUP_FILE_POLL_INTERVAL, GROUP_FILE_RATE
+from core.chunk_frame import can_frame, pack_chunk
+from models.send_window import SendWindow, decode_sack_bitmap
+from storage.content_index import sha256_file
+from storage.transfer_journal import get_resume_fields
+from utils.printer import verbose_log, notif_log
 from utils.time_utils import current_unix_time
 from utils.token_utils import generate_token
-from core.ack_registry import register_ack
+from core.reliable_delivery import send_reliable, reliable_sender
+from core.transfer_scheduler import transfer_scheduler
 from datetime import datetime
 
+# FILEIDs this peer has accepted, so a retransmitted FILE_OFFER is re-ACKed instead of re-queued
+accepted_offers = set()
+
+# Windowed transfers in progress, by FILEID, so FILE_SACKs can reach them
+outgoing_transfers = {}
+
+# Offers awaiting the receiver's decision, by their TOKEN, so a REVOKE can withdraw them
+offered_transfers = {}
+
 def format_verbose(direction, ip, msg_type, message_dict):
     """
     RFC-compliant verbose format:
@@ -21,8 +38,32 @@ def format_verbose(direction, ip, msg_type, message_dict):
     body = "\n".join(f"{k}: {v}" for k, v in message_dict.items())
     return f"{header}\n{body}\n"
 
+def cancel_offer(token, from_ip=None):
+    """
+    Withdraws an unanswered FILE_OFFER whose TOKEN was revoked, either by the
+    receiver declining it or by us, and stops retransmitting it.
+
+    Args:
+        token (str): The revoked TOKEN.
+        from_ip (str, optional): IP the REVOKE came from; only the offer's
+            receiver may decline it. None for our own revocation.
+
+    Returns:
+        bool: True if an offer was waiting on that token.
+    """
+    transfer = offered_transfers.get(token)
+    if transfer is None or (from_ip is not None and from_ip != transfer.to_profile.ip):
+        return False
+    offered_transfers.pop(token, None)
+    reliable_sender.cancel(transfer.file_id)
+    transfer.state = "declined"
+    notif_log(f"File offer {transfer.file_id} to {transfer.to_profile.user_id} was declined")
+    return True
+
 class FileTransfer:
-    def __init__(self, from_profile, to_profile, file_location, description, listener, filename=""):
+    PACED_INTERVAL = 0.05  # Seconds between chunks for peers without FILE_SACK support
+
+    def __init__(self, from_profile, to_profile, file_location, description, listener, filename="", weight=1):
         self.from_profile = from_profile
         self.to_profile = to_profile
         self.file_location = file_location
@@ -31,6 +72,19 @@ class FileTransfer:
         self.listener = listener
         self.file_id = uuid.uuid4().hex
         self.chunk_size = 1024
+        self.window = None       # SendWindow for windowed transfers
+        self.unsent = None       # deque of chunk indexes for paced transfers
+        self.next_send_at = 0.0
+        self.binary = False
+        self.weight = weight
+        self.total_chunks = 0
+        self.file = None
+        self.state = "offered"
+        self.offer_token = None
+        self.started_at = None
+        self.bytes_sent = 0
+        self.chunks_sent = 0
+        self._cond = threading.Condition()
 
     def file_offer(self):
         file_size = os.path.getsize(self.file_location)
@@ -47,71 +101,511 @@ class FileTransfer:
             "FILESIZE": str(file_size),
             "FILETYPE": filetype,
             "FILEID": self.file_id,
+            "FILEHASH": self.file_hash(),
             "DESCRIPTION": self.description,
             "TIMESTAMP": str(int(time.time())),
+            "TRANSFER_MODE": "WINDOW",
             "TOKEN": generate_token(self.from_profile.user_id, 600, "file")
         }
+        self.offer_token = offer["TOKEN"]
+        offered_transfers[self.offer_token] = self
+        if FILE_BINARY_FRAMING and can_frame(self.file_id):
+            offer["FRAMING"] = "BINARY"
 
         msg = "\n".join(f"{k}: {v}" for k, v in offer.items()) + "\n\n"
-        self.listener.send_unicast(msg, self.to_profile.ip)
+
+        # Retransmitted until ACKed; then wait up to FILE_OFFER_TIMEOUT for the receiver to decide.
+        # The ACK comes when a person accepts, so its delay is not an RTT sample
+        send_reliable(
+            self.listener, msg, self.to_profile.ip, self.file_id,
+            on_ack=self.file_transmit,
+            on_failure=self.offer_expired,
+            give_up_after=FILE_OFFER_TIMEOUT,
+            sample_rtt=False
+        )
 
         # RFC Verbose log for outgoing
         verbose_log("SEND >", format_verbose("SEND >", self.to_profile.ip, offer["TYPE"], offer))
 
-        register_ack(self.file_id, self.file_transmit)
+    def file_hash(self) -> str:
+        """
+        SHA-256 of the file, which lets a receiver match this offer to an
+        unfinished download of the same content.
+        """
+        return sha256_file(self.file_location)
+
+    def resume_chunks(self, ack_msg, total_chunks):
+        """
+        Chunk indexes the receiver already has, from the RESUME bitmap in its
+        accept ACK. Ignored unless it was written with our chunk size.
+        """
+        if ack_msg is None or not ack_msg.get("RESUME") or ack_msg.get("CHUNK_SIZE") != str(self.chunk_size):
+            return set()
+        bitmap = decode_sack_bitmap(ack_msg.get("RESUME"))
+        return {i for i in range(min(total_chunks, len(bitmap) * 8)) if bitmap[i >> 3] & (1 << (i & 7))}
+
+    def offer_expired(self):
+        offered_transfers.pop(self.offer_token, None)
+        notif_log(f"File offer {self.file_id} to {self.to_profile.user_id} was not accepted")
+
+    def build_chunk(self, chunk_index, total_chunks, chunk, sack_now=False):
+        chunk_msg = {
+            "TYPE": "FILE_CHUNK",
+            "FROM": self.from_profile.user_id,
+            "TO": self.to_profile.user_id,
+            "FILEID": self.file_id,
+            "CHUNK_INDEX": str(chunk_index),
+            "TOTAL_CHUNKS": str(total_chunks),
+            "CHUNK_SIZE": str(len(chunk)),
+            "TOKEN": generate_token(self.from_profile.user_id, 600, "file"),
+            "DATA": base64.b64encode(chunk).decode("utf-8")
+        }
+        if sack_now:
+            chunk_msg["SACK_NOW"] = "1"
+        return chunk_msg
+
+    def send_chunk(self, chunk_index, total_chunks, chunk, sack_now=False):
+        """
+        Sends one chunk as a binary frame if the receiver accepted FRAMING: BINARY,
+        otherwise as a text FILE_CHUNK with base64 DATA.
+        """
+        if self.binary:
+            self.listener.send_unicast(pack_chunk(self.file_id, chunk_index, total_chunks, chunk, sack_now), self.to_profile.ip)
+            verbose_log("SEND >", f"binary FILE_CHUNK {self.file_id} {chunk_index + 1}/{total_chunks} ({len(chunk)} bytes)")
+            return
+
+        chunk_msg = self.build_chunk(chunk_index, total_chunks, chunk, sack_now)
+        msg = "\n".join(f"{k}: {v}" for k, v in chunk_msg.items()) + "\n\n"
+        self.listener.send_unicast(msg, self.to_profile.ip)
+
+        # RFC Verbose log for outgoing
+        verbose_log("SEND >", format_verbose("SEND >", self.to_profile.ip, chunk_msg["TYPE"], chunk_msg))
+
+    def file_transmit(self, ack_msg=None):
+        """
+        Starts sending once the receiver ACCEPTs. Receivers that advertise
+        SACK get the windowed transfer; older peers get the paced stream.
+        The chunks themselves are sent by transfer_scheduler, so this returns
+        at once even when called from a receive thread.
+        """
+        offered_transfers.pop(self.offer_token, None)
+        if ack_msg is not None and ack_msg.get("DEDUP") == "1":
+            # Nothing to send: finished, like a transfer whose last chunk was acknowledged
+            self.state = "delivered"
+            outgoing_transfers.pop(self.file_id, None)
+            notif_log(f"{self.to_profile.user_id} already had file {self.file_id}; nothing to send")
+            return
+
+        file_size = os.path.getsize(self.file_location)
+        self.total_chunks = math.ceil(file_size / self.chunk_size)
+        skip = self.resume_chunks(ack_msg, self.total_chunks)
+        self.binary = ack_msg is not None and ack_msg.get("FRAMING") == "BINARY" and can_frame(self.file_id)
+        if skip:
+            notif_log(f"Resuming file {self.file_id}: receiver already has {len(skip)}/{self.total_chunks} chunks")
+
+        if ack_msg is not None and ack_msg.get("SACK") == "1":
+            # Congestion window driven by FILE_SACKs; only reported-missing chunks are resent
+            self.window = SendWindow(self.total_chunks, already_received=skip)
+            outgoing_transfers[self.file_id] = self
+        else:
+            self.unsent = deque(i for i in range(self.total_chunks) if i not in skip)
+
+        self.file = open(self.file_location, "rb")
+        self.started_at = time.monotonic()
+        self.state = "sending"
+        transfer_scheduler.add(self)
+
+    def next_chunk(self, now):
+        """
+        Claims the next chunk for the scheduler to send.
+
+        Returns:
+            tuple | None: (index, sack_now), or None if nothing may be sent yet.
+        """
+        with self._cond:
+            if self.window is None:
+                if not self.unsent or now < self.next_send_at:
+                    return None
+                self.next_send_at = now + self.PACED_INTERVAL
+                return self.unsent.popleft(), False
+
+            window = self.window
+            if window.done or self.state == "failed":
+                return None
+            if window.check_timeout(now, reliable_sender.get_estimator(self.to_profile.ip).rto):
+                verbose_log("RETRY", f"File {self.file_id}: timeout, window reset ({window.timeouts})")
+                if window.timeouts > FILE_MAX_TIMEOUTS:
+                    self.state = "failed"
+                    return None
+            index = window.next_chunk()
+            if index is None:
+                return None
+            window.on_sent(index, now)
+            # Ask for a FILE_SACK once the window is full or nothing is left to send
+            return index, not window.can_send() or not window.has_unsent()
+
+    def wait_time(self, now) -> float:
+        with self._cond:
+            if self.window is None:
+                return max(0.0, self.next_send_at - now)
+            return self.window.time_to_timeout(now, reliable_sender.get_estimator(self.to_profile.ip).rto)
+
+    @property
+    def finished(self) -> bool:
+        if self.state == "failed":
+            return True
+        if self.window is None:
+            return not self.unsent
+        return self.window.done
+
+    def transmit_chunk(self, index, sack_now=False) -> int:
+        self.file.seek(index * self.chunk_size)
+        chunk = self.file.read(self.chunk_size)
+        self.send_chunk(index, self.total_chunks, chunk, sack_now)
+        self.bytes_sent += len(chunk)
+        self.chunks_sent += 1
+        return len(chunk)
+
+    def finish(self):
+        """
+        Called by the scheduler once, when the transfer is finished or failed.
+        """
+        self.file.close()
+        outgoing_transfers.pop(self.file_id, None)
+        if self.state == "failed":
+            notif_log(f"File transfer {self.file_id} to {self.to_profile.user_id} stalled; giving up")
+        elif self.window is not None:
+            self.state = "delivered"
+            notif_log(f"File {self.file_id} delivered to {self.to_profile.user_id}")
+        else:
+            self.state = "sent"
+
+    def progress(self) -> dict:
+        """
+        Returns:
+            dict: { file_id, to, filename, state, done_chunks, total_chunks,
+                    percent, bytes_sent, elapsed, throughput (bytes/s), window }
+        """
+        with self._cond:
+            if self.window is not None:
+                done = self.window.acked_count
+                window = int(self.window.cwnd)
+            else:
+                done = self.total_chunks - len(self.unsent)
+                window = None
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "file_id": self.file_id,
+            "to": self.to_profile.user_id,
+            "filename": self.filename or os.path.basename(self.file_location),
+            "state": self.state,
+            "done_chunks": done,
+            "total_chunks": self.total_chunks,
+            "percent": 100.0 * done / self.total_chunks if self.total_chunks else 100.0,
+            "bytes_sent": self.bytes_sent,
+            "elapsed": elapsed,
+            "throughput": self.bytes_sent / elapsed if elapsed else 0.0,
+            "window": window,
+        }
+
+    def on_sack(self, msg):
+        """
+        Applies a FILE_SACK from the receiver and wakes the scheduler.
+        """
+        try:
+            cumulative = int(msg.get("CUMULATIVE", 0))
+        except ValueError:
+            return
+        bitmap = decode_sack_bitmap(msg.get("BITMAP"))
+        with self._cond:
+            rtt = self.window.on_sack(cumulative, bitmap, time.monotonic())
+        if rtt is not None:
+            reliable_sender.get_estimator(self.to_profile.ip).sample(rtt)
+        transfer_scheduler.wake()
 
-    def file_transmit(self):
+    def on_failed(self, user_id):
+        """
+        The receiver discarded the file (FILE_RECEIVED with STATUS: FAILED); stop sending.
+        """
+        with self._cond:
+            if self.state in ("offered", "sending"):
+                self.state = "failed"
+        notif_log(f"{user_id} discarded file {self.file_id}: it did not match its FILEHASH")
+        transfer_scheduler.wake()
+
+
+class GroupFileTransfer(FileTransfer):
+    """
+    Sends one file to every member of a group: chunks are broadcast once,
+    then each member is polled (GROUP_FILE_END) and answers with a FILE_NAK
+    listing what it is missing, or FILE_RECEIVED. Repairs go by unicast to the
+    one member that asked, or are broadcast again if several members need
+    the same chunk. Chunks always use the binary frame, since only peers that
+    understand GROUP_FILE_OFFER take part.
+    """
+    POLL = -1  # pseudo chunk index: send GROUP_FILE_END to the members still incomplete
+
+    def __init__(self, from_profile, group_id, members, file_location, description, listener, filename="",
+                 poll_interval=GROUP_FILE_POLL_INTERVAL, rate=GROUP_FILE_RATE):
+        """
+        Args:
+            from_profile (Profile): The sender.
+            group_id (str): GROUP_ID the file is shared with.
+            members (list[Profile]): Online members to deliver to (not including the sender).
+            file_location (str): Path of the file to send.
+            description (str): DESCRIPTION for the offer.
+            listener: The transport used to send.
+            filename (str, optional): Name to offer instead of the file's own.
+            poll_interval (float): Seconds to wait for NAKs before polling again.
+            rate (int): Bytes/s chunks are paced at.
+        """
+        super().__init__(from_profile, None, file_location, description, listener, filename)
+        self.group_id = group_id
+        self.members = {member.user_id: member for member in members}
+        self.awaiting_offer = set(self.members)
+        self.incomplete = set()
+        self.discarded = set()   # members whose copy did not match the FILEHASH
+        self.queue = deque()  # (chunk index, member or None for broadcast)
+        self.repairs = {}     # chunk index -> members that reported it missing
+        self.poll_interval = poll_interval
+        self.chunk_gap = self.chunk_size / rate
+        self.next_poll_at = 0.0
+        self.polls = 0        # polls since the last NAK or FILE_RECEIVED
+
+    def file_offer(self):
         file_size = os.path.getsize(self.file_location)
-        total_chunks = math.ceil(file_size / self.chunk_size)
-        
-        with open(self.file_location, "rb") as f:
-            for chunk_index in range(total_chunks):
-                chunk = f.read(self.chunk_size)
-                encoded_data = base64.b64encode(chunk).decode("utf-8")
-
-                chunk_msg = {
-                    "TYPE": "FILE_CHUNK",
-                    "FROM": self.from_profile.user_id,
-                    "TO": self.to_profile.user_id,
-                    "FILEID": self.file_id,
-                    "CHUNK_INDEX": str(chunk_index),
-                    "TOTAL_CHUNKS": str(total_chunks),
-                    "CHUNK_SIZE": str(len(chunk)),
-                    "TOKEN": generate_token(self.from_profile.user_id, 600, "file"),
-                    "DATA": encoded_data
-                }
-
-                msg = "\n".join(f"{k}: {v}" for k, v in chunk_msg.items()) + "\n\n"
-                self.listener.send_unicast(msg, self.to_profile.ip)
-
-                # RFC Verbose log for outgoing
-                verbose_log("SEND >", format_verbose("SEND >", self.to_profile.ip, chunk_msg["TYPE"], chunk_msg))
-
-                time.sleep(0.05)
+        self.total_chunks = math.ceil(file_size / self.chunk_size)
+        filetype, _ = mimetypes.guess_type(self.file_location)
+        offer = {
+            "TYPE": "GROUP_FILE_OFFER",
+            "FROM": self.from_profile.user_id,
+            "TO": None,
+            "GROUP_ID": self.group_id,
+            "FILENAME": self.filename or os.path.basename(self.file_location),
+            "FILESIZE": str(file_size),
+            "FILETYPE": filetype or "application/octet-stream",
+            "FILEID": self.file_id,
+            "FILEHASH": self.file_hash(),
+            "TOTAL_CHUNKS": str(self.total_chunks),
+            "DESCRIPTION": self.description,
+            "TIMESTAMP": str(int(time.time())),
+            "MESSAGE_ID": None,
+            "TOKEN": generate_token(self.from_profile.user_id, 600, "group")
+        }
+
+        outgoing_transfers[self.file_id] = self
+        self.state = "offered"
+        for user_id, member in self.members.items():
+            # Every member ACKs its own MESSAGE_ID; the FILEID is shared by all
+            offer["TO"] = user_id
+            offer["MESSAGE_ID"] = uuid.uuid4().hex
+            msg = "\n".join(f"{k}: {v}" for k, v in offer.items()) + "\n\n"
+            # Members may be asked first, so wait as long as for a FILE_OFFER
+            send_reliable(
+                self.listener, msg, member.ip, offer["MESSAGE_ID"],
+                on_ack=lambda ack_msg, m=user_id: self.offer_answered(m, ack_msg),
+                on_failure=lambda m=user_id: self.offer_answered(m, None),
+                give_up_after=FILE_OFFER_TIMEOUT,
+                sample_rtt=False
+            )
+            verbose_log("SEND >", format_verbose("SEND >", member.ip, offer["TYPE"], offer))
+
+    def offer_answered(self, user_id, ack_msg):
+        """
+        Starts broadcasting once every member has ACKed the offer or failed to.
+        """
+        with self._cond:
+            self.awaiting_offer.discard(user_id)
+            if ack_msg is not None and ack_msg.get("DEDUP") != "1" and ack_msg.get("STATUS") != "DECLINED":
+                self.incomplete.add(user_id)
+            if self.awaiting_offer:
+                return
+            if not self.incomplete:
+                self.state = "delivered"
+                outgoing_transfers.pop(self.file_id, None)
+                notif_log(f"Group file {self.file_id}: no member needs it")
+                return
+            self.queue.extend((index, None) for index in range(self.total_chunks))
+
+        self.file = open(self.file_location, "rb")
+        self.started_at = time.monotonic()
+        self.state = "sending"
+        transfer_scheduler.add(self)
+
+    def on_nak(self, user_id, msg):
+        """
+        Queues the chunks a member reported missing in its FILE_NAK.
+        """
+        try:
+            cumulative = int(msg.get("CUMULATIVE", 0))
+        except ValueError:
+            return
+        bitmap = decode_sack_bitmap(msg.get("BITMAP"))
+        with self._cond:
+            if user_id not in self.incomplete:
+                return
+            self.polls = 0
+            for index in range(max(0, cumulative), self.total_chunks):
+                offset = index - cumulative
+                byte = offset >> 3
+                if byte < len(bitmap) and bitmap[byte] & (1 << (offset & 7)):
+                    continue
+                self.repairs.setdefault(index, set()).add(user_id)
+        transfer_scheduler.wake()
+
+    def on_received(self, user_id):
+        with self._cond:
+            if user_id in self.incomplete:
+                self.incomplete.discard(user_id)
+                self.polls = 0
+                notif_log(f"Group file {self.file_id}: {user_id} has it ({len(self.members) - len(self.incomplete)}/{len(self.members)})")
+        transfer_scheduler.wake()
+
+    def on_failed(self, user_id):
+        """
+        A member discarded its copy; it is not polled again.
+        """
+        with self._cond:
+            if user_id not in self.incomplete:
+                return
+            self.incomplete.discard(user_id)
+            self.discarded.add(user_id)
+            self.polls = 0
+        notif_log(f"Group file {self.file_id}: {user_id} discarded it (FILEHASH mismatch)")
+        transfer_scheduler.wake()
+
+    def next_chunk(self, now):
+        with self._cond:
+            if not self.queue and self.repairs:
+                for index in sorted(self.repairs):
+                    targets = self.repairs[index] & self.incomplete
+                    if len(targets) == 1:
+                        self.queue.append((index, next(iter(targets))))
+                    elif targets:
+                        self.queue.append((index, None))
+                self.repairs.clear()
+                self.next_poll_at = 0.0  # poll again right after the repairs
+            if self.queue:
+                if now < self.next_send_at:
+                    return None
+                self.next_send_at = max(self.next_send_at + self.chunk_gap, now - self.chunk_gap)
+                return self.queue.popleft()
+            if not self.incomplete or now < self.next_poll_at:
+                return None
+            self.polls += 1
+            if self.polls > FILE_MAX_TIMEOUTS:
+                self.state = "failed"
+                return None
+            self.next_poll_at = now + self.poll_interval
+            return self.POLL, sorted(self.incomplete)
+
+    def wait_time(self, now) -> float:
+        with self._cond:
+            if self.queue or self.repairs:
+                return max(0.0, self.next_send_at - now)
+            return max(0.0, self.next_poll_at - now)
+
+    @property
+    def finished(self) -> bool:
+        return self.state == "failed" or (self.state == "sending" and not self.incomplete)
+
+    def transmit_chunk(self, index, target=None) -> int:
+        if index == self.POLL:
+            self.send_poll(target)
+            return 0
+        self.file.seek(index * self.chunk_size)
+        chunk = self.file.read(self.chunk_size)
+        frame = pack_chunk(self.file_id, index, self.total_chunks, chunk)
+        if target is None:
+            self.listener.send_broadcast(frame)
+        else:
+            self.listener.send_unicast(frame, self.members[target].ip)
+        self.bytes_sent += len(chunk)
+        self.chunks_sent += 1
+        return len(chunk)
+
+    def send_poll(self, user_ids):
+        for user_id in user_ids:
+            poll = {
+                "TYPE": "GROUP_FILE_END",
+                "FROM": self.from_profile.user_id,
+                "TO": user_id,
+                "GROUP_ID": self.group_id,
+                "FILEID": self.file_id,
+                "TOTAL_CHUNKS": str(self.total_chunks),
+            }
+            msg = "\n".join(f"{k}: {v}" for k, v in poll.items()) + "\n\n"
+            self.listener.send_unicast(msg, self.members[user_id].ip)
+            verbose_log("SEND >", format_verbose("SEND >", self.members[user_id].ip, poll["TYPE"], poll))
+
+    def finish(self):
+        self.file.close()
+        outgoing_transfers.pop(self.file_id, None)
+        if self.state == "failed":
+            notif_log(f"Group file {self.file_id}: no answer from {', '.join(sorted(self.incomplete))}; giving up")
+        elif self.discarded:
+            self.state = "delivered"
+            notif_log(f"Group file {self.file_id} delivered to {len(self.members) - len(self.discarded)}/{len(self.members)} members; "
+                      f"discarded by {', '.join(sorted(self.discarded))}")
+        else:
+            self.state = "delivered"
+            notif_log(f"Group file {self.file_id} delivered to all {len(self.members)} members")
+
+    def progress(self) -> dict:
+        with self._cond:
+            done = len(self.members) - len(self.incomplete) - len(self.awaiting_offer)
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "file_id": self.file_id,
+            "to": f"{self.group_id} ({done}/{len(self.members)})",
+            "filename": self.filename or os.path.basename(self.file_location),
+            "state": self.state,
+            "done_chunks": min(self.chunks_sent, self.total_chunks),
+            "total_chunks": self.total_chunks,
+            "percent": 100.0 * done / len(self.members) if self.members else 100.0,
+            "bytes_sent": self.bytes_sent,
+            "elapsed": elapsed,
+            "throughput": self.bytes_sent / elapsed if elapsed else 0.0,
+            "window": None,
+        }
 
 
 class FileTransferResponder:
     def __init__(self, listener):
         self.listener = listener
 
-    def send_ack(self, to_ip, message_id, status):
+    def send_ack(self, to_ip, message_id, status, extra=None):
         ack = {
             "TYPE": "ACK",
             "MESSAGE_ID": message_id,
             "STATUS": status,
         }
+        if extra:
+            ack.update(extra)
         msg = "\n".join(f"{k}: {v}" for k, v in ack.items()) + "\n\n"
         self.listener.send_unicast(msg, to_ip)
 
         verbose_log("SEND >", format_verbose("SEND >", to_ip, ack["TYPE"], ack))
 
-    def confirm_file_received(self, to_ip, from_user, to_user, file_id):
+    def decline_file_offer(self, to_ip, message_id):
+        """
+        ACKs a GROUP_FILE_OFFER with STATUS: DECLINED, so the sender stops
+        retransmitting it and leaves this member out. One-to-one offers are
+        declined with a REVOKE of their TOKEN instead.
+        """
+        self.send_ack(to_ip=to_ip, message_id=message_id, status="DECLINED")
+
+    def confirm_file_received(self, to_ip, from_user, to_user, file_id, status="COMPLETE"):
+        """
+        Sends FILE_RECEIVED; status "FAILED" tells the sender the file was
+        discarded (it did not match its FILEHASH).
+        """
         confirm = {
             "TYPE": "FILE_RECEIVED",
             "FROM": from_user,
             "TO": to_user,
             "FILEID": file_id,
-            "STATUS": "COMPLETE",
+            "STATUS": status,
             "TIMESTAMP": str(int(time.time()))
         }
         msg = "\n".join(f"{k}: {v}" for k, v in confirm.items()) + "\n\n"
@@ -119,5 +613,35 @@ class FileTransferResponder:
 
         verbose_log("SEND >", format_verbose("SEND >", to_ip, confirm["TYPE"], confirm))
 
-    def accept_file_offer(self, to_ip, file_id):
-        self.send_ack(to_ip=to_ip, message_id=file_id, status="ACCEPTED")
+    def send_sack(self, to_ip, from_user, to_user, file_id, cumulative, bitmap, msg_type="FILE_SACK"):
+        sack = {
+            "TYPE": msg_type,
+            "FROM": from_user,
+            "TO": to_user,
+            "FILEID": file_id,
+            "CUMULATIVE": str(cumulative),
+            "BITMAP": bitmap
+        }
+        msg = "\n".join(f"{k}: {v}" for k, v in sack.items()) + "\n\n"
+        self.listener.send_unicast(msg, to_ip)
+
+        verbose_log("SEND >", format_verbose("SEND >", to_ip, sack["TYPE"], sack))
+
+    def accept_file_offer(self, to_ip, file_id, sack=False, binary=False, dedup=False, message_id=None):
+        """
+        ACKs a FILE_OFFER. sack=True tells a windowed sender we will send FILE_SACKs;
+        binary=True (the offer had FRAMING: BINARY) asks for binary chunk frames;
+        dedup=True says we already have the content and no chunks are needed.
+        message_id is set for a GROUP_FILE_OFFER, whose ACK is per member.
+        """
+        accepted_offers.add(file_id)
+        message_id = message_id or file_id
+        if dedup:
+            self.send_ack(to_ip=to_ip, message_id=message_id, status="ACCEPTED", extra={"DEDUP": "1"})
+            return
+        extra = get_resume_fields(file_id)
+        if sack:
+            extra["SACK"] = "1"
+        if binary and FILE_BINARY_FRAMING:
+            extra["FRAMING"] = "BINARY"
+        self.send_ack(to_ip=to_ip, message_id=message_id, status="ACCEPTED", extra=extra)
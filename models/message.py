@@ -0,0 +1,105 @@
+import sys
+
+
+def _int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _user(user_id):
+    # One shared string per user id instead of one per stored message
+    return sys.intern(user_id) if isinstance(user_id, str) else user_id
+
+
+class Post:
+    """
+    A received or sent POST, as kept by storage.post_store.
+
+    Only what the feed needs is kept; the token is validated before a post
+    is stored and dropped afterwards. Its expiry is kept, which together with
+    the author is enough to rebuild the broadcast token for revocation checks.
+    """
+    __slots__ = ("message_id", "user_id", "timestamp", "expiry", "content")
+
+    def __init__(self, message_id, user_id, timestamp, expiry, content):
+        self.message_id = message_id
+        self.user_id = _user(user_id)
+        self.timestamp = _int(timestamp)
+        self.expiry = expiry
+        self.content = content
+
+    @staticmethod
+    def from_message(msg, expiry=None) -> "Post":
+        """
+        Args:
+            msg (Mapping): A parsed POST message.
+            expiry (int, optional): Expiry of its broadcast token, if it has a valid one.
+        """
+        return Post(msg.get("MESSAGE_ID"), msg.get("USER_ID"), msg.get("TIMESTAMP"), expiry, msg.get("CONTENT") or "")
+
+    @property
+    def token(self):
+        """
+        The broadcast token the post was sent with, or None if it had none.
+        """
+        return f"{self.user_id}|{self.expiry}|broadcast" if self.expiry else None
+
+    def to_dict(self) -> dict:
+        return {
+            "MESSAGE_ID": self.message_id,
+            "USER_ID": self.user_id,
+            "TIMESTAMP": self.timestamp,
+            "EXPIRY": self.expiry,
+            "CONTENT": self.content,
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> "Post":
+        return Post(data.get("MESSAGE_ID"), data.get("USER_ID"), data.get("TIMESTAMP"), data.get("EXPIRY"), data.get("CONTENT"))
+
+
+class DirectMessage:
+    """
+    A received or sent DM, as kept by storage.dm_store.
+    """
+    __slots__ = ("message_id", "from_user", "to_user", "timestamp", "content")
+
+    def __init__(self, message_id, from_user, to_user, timestamp, content):
+        self.message_id = message_id
+        self.from_user = _user(from_user)
+        self.to_user = _user(to_user)
+        self.timestamp = _int(timestamp)
+        self.content = content
+
+    @staticmethod
+    def from_message(msg) -> "DirectMessage":
+        return DirectMessage(msg.get("MESSAGE_ID"), msg.get("FROM"), msg.get("TO"), msg.get("TIMESTAMP"), msg.get("CONTENT") or "")
+
+    def to_dict(self) -> dict:
+        return {
+            "MESSAGE_ID": self.message_id,
+            "FROM": self.from_user,
+            "TO": self.to_user,
+            "TIMESTAMP": self.timestamp,
+            "CONTENT": self.content,
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> "DirectMessage":
+        return DirectMessage.from_message(data)
+
+
+class GroupMessage:
+    """
+    One entry of a group's history in storage.group_directory; seq is its
+    position in that history.
+    """
+    __slots__ = ("seq", "sender", "content", "timestamp")
+
+    def __init__(self, seq, sender, content, timestamp):
+        self.seq = seq
+        self.sender = _user(sender)
+        self.content = content
+        self.timestamp = _int(timestamp)
@@ -1,9 +1,14 @@
+import sys
 from config import DEFAULT_AVATAR_TYPE
+from utils.base64_utils import avatar_digest
 class Profile:
     """
     a peer in the LSNP network.
     """
-    def __init__(self, user_id, ip, display_name=None, status=None, avatar_type=None, avatar_data=None):
+    __slots__ = ("user_id", "ip", "display_name", "status", "avatar_type", "avatar_data", "avatar_hash", "version", "group_ack")
+
+    def __init__(self, user_id, ip, display_name=None, status=None, avatar_type=None, avatar_data=None,
+                 avatar_hash=None, version=None, group_ack=False):
         """
         Initializes a Profile object with user details.
 
@@ -14,13 +19,21 @@ class Profile:
             status (str, optional): Current status message (e.g., "Online", "Busy").
             avatar_type (str, optional): Type of avatar used
             avatar_data (str, optional): Encoded avatar image or emoji.
+            avatar_hash (str, optional): Digest of the avatar; computed from avatar_data if not given.
+            version (str, optional): PROFILE_VERSION the peer advertised.
+            group_ack (bool, optional): The peer ACKs GROUP_MESSAGEs (advertised as GROUP_ACK: 1).
         """
-        self.user_id = user_id
+        self.user_id = sys.intern(user_id) if isinstance(user_id, str) else user_id
         self.ip = ip
         self.display_name = display_name or user_id
         self.status = status or ""
         self.avatar_type = avatar_type
         self.avatar_data = avatar_data or DEFAULT_AVATAR_TYPE
+        if avatar_hash is None and avatar_type and avatar_data:
+            avatar_hash = avatar_digest(avatar_data)
+        self.avatar_hash = avatar_hash
+        self.version = version
+        self.group_ack = group_ack
 
     def to_dict(self):
         """
@@ -56,7 +69,10 @@ class Profile:
             display_name = msg.get("DISPLAY_NAME"),
             status=msg.get("STATUS"),
             avatar_type=msg.get("AVATAR_TYPE"),
-            avatar_data=msg.get("AVATAR_DATA")
+            avatar_data=msg.get("AVATAR_DATA"),
+            avatar_hash=msg.get("AVATAR_HASH"),
+            version=msg.get("PROFILE_VERSION"),
+            group_ack=msg.get("GROUP_ACK") == "1"
         )
 
     def __str__(self):
@@ -0,0 +1,209 @@
+import time
+from collections import deque
+from config import FILE_WINDOW_INITIAL, FILE_WINDOW_MAX, FILE_DUPTHRESH
+
+
+def encode_sack_bitmap(received, base: int, total: int, bits: int) -> str:
+    """
+    Encodes which chunks from base onward were received as a hex bitmap.
+
+    Bit i (LSB first within each byte) stands for chunk base + i.
+
+    Args:
+        received: Sequence where received[i] is truthy if chunk i arrived.
+        base (int): First chunk covered, normally the first missing one.
+        total (int): Total chunks in the file.
+        bits (int): Max chunks to cover.
+
+    Returns:
+        str: Hex string, empty if nothing past base is covered.
+    """
+    end = min(total, base + bits)
+    bitmap = bytearray((end - base + 7) // 8)
+    for i in range(base, end):
+        if received[i]:
+            offset = i - base
+            bitmap[offset >> 3] |= 1 << (offset & 7)
+    return bitmap.hex()
+
+
+def decode_sack_bitmap(hex_bitmap: str) -> bytes:
+    try:
+        return bytes.fromhex(hex_bitmap or "")
+    except ValueError:
+        return b""
+
+
+class SendWindow:
+    """
+    Sender-side state of a windowed file transfer: which chunks are acked,
+    in flight or lost, and how many may be outstanding.
+
+    The window grows by one chunk per acked chunk until ssthresh (slow start),
+    then by one chunk per window (congestion avoidance). A chunk is presumed
+    lost once FILE_DUPTHRESH chunks sent after it have been selectively acked;
+    that halves the window once per round trip. A timeout collapses it to one.
+    The class does no I/O; the caller sends what next_chunk() returns.
+    """
+    def __init__(self, total_chunks: int, initial=FILE_WINDOW_INITIAL, max_window=FILE_WINDOW_MAX, already_received=()):
+        """
+        Args:
+            total_chunks (int): Number of chunks in the file.
+            initial (int): Starting window in chunks.
+            max_window (int): Upper bound on the window.
+            already_received (Iterable[int]): Chunks the receiver already has (resume).
+        """
+        self.total = total_chunks
+        self.acked = bytearray(total_chunks)
+        self.acked_count = 0
+        for index in already_received:
+            if 0 <= index < total_chunks and not self.acked[index]:
+                self.acked[index] = 1
+                self.acked_count += 1
+
+        self.next_new = 0
+        self.cumulative = 0
+        self.in_flight = {}   # chunk index -> (send sequence, sent_at, retransmitted)
+        self.lost = deque()
+        self.seq = 0
+        self.cwnd = float(initial)
+        self.max_window = max_window
+        self.ssthresh = float(max_window)
+        self.recovery_seq = -1
+        self.last_progress = time.monotonic()
+        self.timeouts = 0
+        self.retransmissions = 0
+
+    @property
+    def done(self) -> bool:
+        return self.acked_count >= self.total
+
+    def can_send(self) -> bool:
+        return len(self.in_flight) < int(self.cwnd)
+
+    def has_unsent(self) -> bool:
+        """
+        True while some chunk is queued for (re)transmission.
+        """
+        return bool(self.lost) or self.next_new < self.total
+
+    def next_chunk(self):
+        """
+        Picks the next chunk to send if the window has room: lost chunks first,
+        then chunks never sent.
+
+        Returns:
+            int | None: Chunk index, or None if the window is full or nothing is pending.
+        """
+        if not self.can_send():
+            return None
+        while self.lost:
+            index = self.lost.popleft()
+            if not self.acked[index] and index not in self.in_flight:
+                return index
+        while self.next_new < self.total:
+            index = self.next_new
+            self.next_new += 1
+            if not self.acked[index]:
+                return index
+        return None
+
+    def on_sent(self, index: int, now: float):
+        retransmitted = index < self.next_new - 1 or index in self.in_flight
+        if retransmitted:
+            self.retransmissions += 1
+        self.seq += 1
+        self.in_flight[index] = (self.seq, now, retransmitted)
+
+    def on_sack(self, cumulative: int, bitmap: bytes, now: float):
+        """
+        Applies a selective acknowledgement from the receiver.
+
+        Args:
+            cumulative (int): Every chunk below this index was received.
+            bitmap (bytes): Chunks received from cumulative onward (see encode_sack_bitmap).
+            now (float): time.monotonic() at arrival.
+
+        Returns:
+            float | None: An RTT sample from a newly acked, never-retransmitted chunk.
+        """
+        def received(index):
+            offset = index - cumulative
+            if offset < 0:
+                return True
+            byte = offset >> 3
+            return byte < len(bitmap) and bitmap[byte] & (1 << (offset & 7))
+
+        def mark(index):
+            if self.acked[index]:
+                return 0
+            self.acked[index] = 1
+            self.acked_count += 1
+            return 1
+
+        newly_acked = 0
+        highest_seq = -1
+        rtt = None
+
+        for index in list(self.in_flight):
+            if not received(index):
+                continue
+            seq, sent_at, retransmitted = self.in_flight.pop(index)
+            newly_acked += mark(index)
+            if seq > highest_seq:
+                highest_seq = seq
+                rtt = None if retransmitted else now - sent_at
+
+        # Chunks that arrived after being presumed lost, or below the cumulative point
+        for index in self.lost:
+            if received(index):
+                newly_acked += mark(index)
+        for index in range(self.cumulative, min(cumulative, self.total)):
+            newly_acked += mark(index)
+        self.cumulative = max(self.cumulative, cumulative)
+
+        if newly_acked:
+            self.last_progress = now
+            self.timeouts = 0
+
+        lost = [index for index, (seq, _, _) in self.in_flight.items() if highest_seq - seq >= FILE_DUPTHRESH]
+        if lost:
+            for index in sorted(lost):
+                del self.in_flight[index]
+                self.lost.append(index)
+            if highest_seq > self.recovery_seq:
+                self.ssthresh = max(2.0, self.cwnd / 2)
+                self.cwnd = self.ssthresh
+                self.recovery_seq = self.seq
+        elif newly_acked:
+            if self.cwnd < self.ssthresh:
+                self.cwnd += newly_acked
+            else:
+                self.cwnd += newly_acked / self.cwnd
+            self.cwnd = min(self.cwnd, float(self.max_window))
+        return rtt
+
+    def check_timeout(self, now: float, rto: float) -> bool:
+        """
+        Treats everything in flight as lost if no progress was made for rto
+        (doubled per consecutive timeout).
+
+        Returns:
+            bool: True if a timeout fired.
+        """
+        if not self.in_flight or now - self.last_progress < rto * (2 ** self.timeouts):
+            return False
+        for index in sorted(self.in_flight):
+            self.lost.append(index)
+        self.in_flight.clear()
+        self.ssthresh = max(2.0, self.cwnd / 2)
+        self.cwnd = 1.0
+        self.recovery_seq = self.seq
+        self.timeouts += 1
+        self.last_progress = now
+        return True
+
+    def time_to_timeout(self, now: float, rto: float) -> float:
+        if not self.in_flight:
+            return rto
+        return max(0.0, self.last_progress + rto * (2 ** self.timeouts) - now)
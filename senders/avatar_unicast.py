@@ -0,0 +1,45 @@
+import time
+from config import AVATAR_REPLY_INTERVAL
+from utils.message_builder import format_message_dict
+from utils.printer import verbose_log
+
+# Peer IP -> when it was last sent our avatar, so repeated requests cannot make us resend 20 KB each time
+_last_reply = {}
+
+def request_avatar(udp, local_profile, peer_user_id: str, avatar_hash: str, ip: str):
+    """
+    Asks a peer for the avatar it advertised as avatar_hash.
+    """
+    msg = {
+        "TYPE": "AVATAR_REQUEST",
+        "FROM": local_profile.user_id,
+        "TO": peer_user_id,
+        "AVATAR_HASH": avatar_hash,
+    }
+    udp.send_unicast(format_message_dict(msg), ip)
+    verbose_log("AVATAR >", f"Requested avatar {avatar_hash[:12]} from {peer_user_id}")
+
+def send_avatar(udp, local_profile, ip: str) -> bool:
+    """
+    Sends our avatar to one peer, unless it was sent to that peer within AVATAR_REPLY_INTERVAL.
+
+    Returns:
+        bool: Whether it was sent.
+    """
+    now = time.monotonic()
+    if now - _last_reply.get(ip, float("-inf")) < AVATAR_REPLY_INTERVAL:
+        return False
+    if len(_last_reply) > 1024:
+        _last_reply.clear()
+    _last_reply[ip] = now
+
+    msg = {
+        "TYPE": "AVATAR",
+        "USER_ID": local_profile.user_id,
+        "AVATAR_TYPE": local_profile.avatar_type,
+        "AVATAR_HASH": local_profile.avatar_hash,
+        "AVATAR_DATA": local_profile.avatar_data,
+    }
+    udp.send_unicast(format_message_dict(msg), ip)
+    verbose_log("AVATAR >", f"Sent avatar to {ip}")
+    return True
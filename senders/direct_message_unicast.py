@@ -2,7 +2,7 @@ import config
 from utils.message_builder import generate_message_id, format_message_dict
 from utils.token_utils import generate_token
 from utils.time_utils import current_unix_time
-from core.ack_registry import register_ack
+from core.reliable_delivery import send_reliable
 from utils.printer import verbose_log, notif_log
 from storage.dm_store import save_dm
 
@@ -21,14 +21,15 @@ def send_dm(profile, peer, content: str, udp):
         "TOKEN": token
     }
 
+    def on_ack(ack_msg):
+        notif_log(f"{profile.user_id} delivered DM to {peer.user_id}")
+
+    def on_failure():
+        notif_log(f"DM to {peer.user_id} was not acknowledged: {content}")
+
     dm_dict = format_message_dict(dm)
-    udp.send_unicast(dm_dict, peer.ip)
+    send_reliable(udp, dm_dict, peer.ip, message_id, on_ack=on_ack, on_failure=on_failure)
     save_dm(dm)
 
     notif_log(f"{profile.user_id} sent DM to {peer.user_id}")
-    verbose_log("DM", f"{profile.user_id} sent DM: '{content}' to {peer.user_id} - {current_unix_time()}")
-
-    def on_ack():
-        notif_log(f"{profile.user_id} delivered DM to {peer.user_id}")
-
-    register_ack(message_id, on_ack)
\ No newline at end of file
+    verbose_log("DM", f"{profile.user_id} sent DM: '{content}' to {peer.user_id} - {current_unix_time()}")
\ No newline at end of file
@@ -4,6 +4,9 @@ from storage.group_directory import get_group_members
 from utils.token_utils import generate_token
 from utils.printer import verbose_log
 from storage.group_directory import store_group_message  # add this import
+from core.reliable_delivery import send_reliable
+from utils.message_builder import generate_message_id
+from models.file_transfer import GroupFileTransfer
 
 
 def build_group_create(profile, group_id, group_name, members):
@@ -39,17 +42,22 @@ def build_group_update(profile, group_id, add=None, remove=None):
     return "\n".join(lines)
 
 
-def build_group_message(profile, group_id, content):
+def build_group_message(profile, group_id, content, message_id=None):
     ttl = int(time.time()) + 600  # Fixed 600s TTL
-    return "\n".join([
+    lines = [
         "TYPE: GROUP_MESSAGE",
         f"FROM: {profile.user_id}",
         f"GROUP_ID: {group_id}",
         f"CONTENT: {content}",
         f"TIMESTAMP: {int(time.time())}",
+    ]
+    if message_id:
+        lines.append(f"MESSAGE_ID: {message_id}")
+    lines.extend([
         f"TOKEN: {generate_token(profile.user_id, ttl, scope='group')}",
         ""
     ])
+    return "\n".join(lines)
 
 
 def send_group_create(profile, group_id, group_name, members, udp_listener):
@@ -88,6 +96,8 @@ def send_group_message(profile, group_id, content, udp_listener):
     """
     Sends GROUP_MESSAGE to all members except the sender.
     Stores the message locally so the sender can see it too.
+    Each member gets its own MESSAGE_ID. Members whose PROFILE advertised GROUP_ACK
+    get it retransmitted until they ACK; older peers never ACK, so they get it once.
     """
     members = get_group_members(group_id)
     if not members:
@@ -95,7 +105,6 @@ def send_group_message(profile, group_id, content, udp_listener):
         return False
 
     timestamp = int(time.time())
-    message = build_group_message(profile, group_id, content)
 
     # Store locally for the sender
     store_group_message(group_id, profile.user_id, content, timestamp)
@@ -105,8 +114,43 @@ def send_group_message(profile, group_id, content, udp_listener):
             continue  # skip self
         peer = get_peer(member_id)
         if peer:
-            udp_listener.send_unicast(message, peer.ip)
+            message_id = generate_message_id()
+            message = build_group_message(profile, group_id, content, message_id)
+            if peer.group_ack:
+                send_reliable(
+                    udp_listener, message, peer.ip, message_id,
+                    on_failure=lambda m=member_id: verbose_log("WARN", f"GROUP_MESSAGE to {m} was not acknowledged")
+                )
+            else:
+                udp_listener.send_unicast(message, peer.ip)
             verbose_log("INFO", f"GROUP_MESSAGE sent to {member_id}")
         else:
             verbose_log("WARN", f"Member {member_id} is offline; skipping send.")
     return True
+
+
+def send_group_file(profile, group_id, file_location, description, udp_listener, filename=""):
+    """
+    Shares a file with every online group member: chunks are broadcast once
+    and members fetch what they missed by FILE_NAK (see GroupFileTransfer).
+
+    Returns:
+        GroupFileTransfer | None: None if no other member is online.
+    """
+    members = []
+    for member_id in get_group_members(group_id):
+        if member_id == profile.user_id:
+            continue  # skip self
+        peer = get_peer(member_id)
+        if peer:
+            members.append(peer)
+        else:
+            verbose_log("WARN", f"Member {member_id} is offline; skipping send.")
+    if not members:
+        verbose_log(f"⚠️ [ERROR] Group {group_id} has no online members.")
+        return None
+
+    transfer = GroupFileTransfer(profile, group_id, members, file_location, description, udp_listener, filename)
+    transfer.file_offer()
+    verbose_log("INFO", f"GROUP_FILE_OFFER sent to {len(members)} members of {group_id}")
+    return transfer
@@ -16,9 +16,9 @@ def build_like(from_user_id: str, to_user_id: str, post_ts: int, action: str):
         "TOKEN": generate_token(from_user_id, config.TOKEN_TTL_BROADCAST, "broadcast"),
     }
 
-def send_like(profile, post: dict, udp, action: str = "LIKE"):
-    to_user = post.get("USER_ID")
-    post_ts = post.get("TIMESTAMP")
+def send_like(profile, post, udp, action: str = "LIKE"):
+    to_user = post.user_id
+    post_ts = post.timestamp
 
     msg = build_like(profile.user_id, to_user, post_ts, action)
     msg_str = format_message_dict(msg)
@@ -1,6 +1,5 @@
-import threading
-import time
-from config import BROADCAST_INTERVAL
+from config import BROADCAST_INTERVAL, BROADCAST_JITTER
+from core.task_scheduler import task_scheduler
 from utils.token_utils import generate_token
 from utils.printer import verbose_log
 
@@ -13,15 +12,12 @@ def build_ping_message(user_id: str) -> str:
 
 def start_broadcast(user_id: str, udp_sender):
     """
-    Starts periodic PING broadcasts.
+    Schedules periodic PING broadcasts, the first one now.
     """
-    def loop():
-        while True:
-            msg = build_ping_message(user_id)
-            udp_sender.send_broadcast(msg)
-            verbose_log("BROADCAST", "Sent PING senders")
-            time.sleep(BROADCAST_INTERVAL)
+    def broadcast():
+        msg = build_ping_message(user_id)
+        udp_sender.send_broadcast(msg)
+        verbose_log("BROADCAST", "Sent PING senders")
 
-    thread = threading.Thread(target=loop, daemon=True)
-    thread.start()
+    return task_scheduler.every("ping-broadcast", BROADCAST_INTERVAL, broadcast, jitter=BROADCAST_JITTER, delay=0)
 
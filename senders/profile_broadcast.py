@@ -1,27 +1,32 @@
-import threading
-import time
+import hashlib
 from models.peer import Profile
+from core.task_scheduler import task_scheduler
 from core.udp_broadcast import UDPListener
 from utils.printer import verbose_log
-from config import BROADCAST_INTERVAL
+from config import BROADCAST_INTERVAL, BROADCAST_JITTER, PROFILE_INLINE_AVATAR
 
 def start_broadcast(local_profile: Profile, udp_sender: UDPListener):
     """
-    Starts a background thread that periodically (based on BROADCAST_INTERVAL) senders messages to the network.
+    Schedules a PROFILE broadcast now and then every BROADCAST_INTERVAL (with jitter).
 
     Args:
         local_profile (Profile): the local peer's profile data.
         udp_sender (UDPListener): the UDPListener object used for broadcasting.
     """
-    def loop():
-        while True:
-            msg = build_profile_message(local_profile)
-            udp_sender.send_broadcast(msg)
-            verbose_log("BROADCAST", "Sent PROFILE senders")
-            time.sleep(BROADCAST_INTERVAL)
+    def broadcast():
+        msg = build_profile_message(local_profile)
+        udp_sender.send_broadcast(msg)
+        verbose_log("BROADCAST", "Sent PROFILE senders")
 
-    thread = threading.Thread(target=loop, daemon=True)
-    thread.start()
+    return task_scheduler.every("profile-broadcast", BROADCAST_INTERVAL, broadcast, jitter=BROADCAST_JITTER, delay=0)
+
+def profile_version(profile: Profile) -> str:
+    """
+    A digest of everything a PROFILE describes, so receivers can tell that
+    nothing changed without comparing fields.
+    """
+    fields = (profile.display_name, profile.status, profile.avatar_type or "", profile.avatar_hash or "")
+    return hashlib.sha256("\n".join(fields).encode("utf-8")).hexdigest()[:16]
 
 def build_profile_message(profile: Profile) -> str:
     """
@@ -33,8 +38,11 @@ def build_profile_message(profile: Profile) -> str:
         STATUS
 
     Optional fields:
+        PROFILE_VERSION: see profile_version
+        GROUP_ACK: 1, we ACK GROUP_MESSAGEs so they may be sent to us reliably
         AVATAR_TYPE
-        AVATAR_DATA
+        AVATAR_HASH: digest of the avatar; peers that lack it send an AVATAR_REQUEST
+        AVATAR_DATA: only with PROFILE_INLINE_AVATAR
 
     Args:
         profile (Profile): The local peer's Profile instance.
@@ -46,11 +54,14 @@ def build_profile_message(profile: Profile) -> str:
         "TYPE: PROFILE",
         f"USER_ID: {profile.user_id}",
         f"DISPLAY_NAME: {profile.display_name}",
-        f"STATUS: {profile.status}"
+        f"STATUS: {profile.status}",
+        f"PROFILE_VERSION: {profile_version(profile)}",
+        "GROUP_ACK: 1"
     ]
-    if profile.avatar_type:
+    if profile.avatar_type and profile.avatar_hash:
         lines.append(f"AVATAR_TYPE: {profile.avatar_type}")
-    if profile.avatar_data:
-        lines.append(f"AVATAR_DATA: {profile.avatar_data}")
+        lines.append(f"AVATAR_HASH: {profile.avatar_hash}")
+        if PROFILE_INLINE_AVATAR:
+            lines.append(f"AVATAR_DATA: {profile.avatar_data}")
 
     return "\n".join(lines) + "\n\n"
\ No newline at end of file
@@ -1,4 +1,5 @@
 from core.token_validator import parse_token, revoke_token
+from models.file_transfer import cancel_offer
 from utils.printer import verbose_log
 
 
@@ -23,6 +24,7 @@ def send_revoke(udp_listener, from_profile, token, target_ip=None):
     }
     msg_str = "\n".join(f"{k}: {v}" for k, v in revoke_msg.items()) + "\n\n"
 
+    cancel_offer(token)  # stop offering a file under a token we revoked
     verbose_log("SEND >", msg_str)
     if target_ip:
         udp_listener.send_unicast(msg_str, target_ip)
@@ -0,0 +1,184 @@
+import base64
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from config import AVATAR_CACHE_BYTES, AVATAR_CACHE_DIR, AVATAR_MEMORY_BYTES
+from storage.peer_directory import peer_index
+from utils.base64_utils import avatar_digest
+from utils.printer import verbose_log
+
+
+class AvatarCache:
+    """
+    Peer avatars keyed by content hash (utils.base64_utils.avatar_digest).
+
+    A PROFILE only records which digest a peer currently uses; an avatar seen
+    before costs nothing more. The bytes arrive either inline in a PROFILE or
+    in an AVATAR reply to our AVATAR_REQUEST. Image files are written to the cache
+    directory when a UI asks for one (path_for), named by digest, or once
+    more than memory_budget bytes of unviewed avatars are held, oldest
+    first. The least recently used files are deleted once the directory
+    grows past budget bytes. File mtimes record use, so the LRU order
+    survives restarts. Peers evicted from the peer directory are forgotten.
+    """
+    def __init__(self, directory=AVATAR_CACHE_DIR, budget=AVATAR_CACHE_BYTES, memory_budget=AVATAR_MEMORY_BYTES):
+        self.directory = directory
+        self.budget = budget
+        self.memory_budget = memory_budget
+        self.by_user = {}         # user_id -> digest
+        self._encoded = OrderedDict()  # digest -> (mime_type, base64 text) not yet written to disk, oldest first
+        self._encoded_bytes = 0
+        self._files = None        # digest -> (filename, size) on disk, least recently used first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+    def _load_files(self):
+        # Picks up files left by earlier runs, oldest use first
+        self._files = OrderedDict()
+        self._disk_bytes = 0
+        if not os.path.isdir(self.directory):
+            return
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name.split(".", 1)[0]] = (name, size)
+            self._disk_bytes += size
+
+    def remember(self, user_id: str, digest: str):
+        """
+        Records which avatar a peer advertised in a PROFILE.
+        """
+        with self._lock:
+            previous = self.by_user.get(user_id)
+            if previous == digest:
+                return
+            self.by_user[user_id] = digest
+            if previous is not None and previous not in self.by_user.values():
+                self._drop_encoded(previous)  # replaced before anyone looked at it
+
+    def forget(self, user_ids):
+        """
+        Drops evicted peers, and their avatars if nobody was looking at them.
+        """
+        with self._lock:
+            for user_id in user_ids:
+                digest = self.by_user.pop(user_id, None)
+                if digest is not None and digest not in self.by_user.values():
+                    self._drop_encoded(digest)
+
+    def _drop_encoded(self, digest: str):
+        # Caller holds _lock
+        encoded = self._encoded.pop(digest, None)
+        if encoded is not None:
+            self._encoded_bytes -= len(encoded[1])
+
+    def store(self, mime_type: str, avatar_data: str, digest: str = None) -> bool:
+        """
+        Keeps avatar bytes (still base64) until a UI asks for them.
+
+        Args:
+            digest (str, optional): The digest they were advertised under; they are
+                rejected if it does not match.
+
+        Returns:
+            bool: False if the data does not match digest.
+        """
+        actual = avatar_digest(avatar_data)
+        if digest and actual != digest:
+            return False
+        with self._lock:
+            if self._files is None:
+                self._load_files()
+            if actual not in self._files and actual not in self._encoded:
+                self._encoded[actual] = (mime_type, avatar_data)
+                self._encoded_bytes += len(avatar_data)
+                # Past the memory budget the oldest unviewed avatars go to disk
+                while self._encoded_bytes > self.memory_budget and len(self._encoded) > 1:
+                    digest, (mime, data) = self._encoded.popitem(last=False)
+                    self._encoded_bytes -= len(data)
+                    self._write(digest, mime, data)
+        return True
+
+    def has(self, digest: str) -> bool:
+        with self._lock:
+            if self._files is None:
+                self._load_files()
+            return digest in self._files or digest in self._encoded
+
+    def path_for(self, user_id: str):
+        """
+        Writes the peer's avatar to the cache directory if it is not there yet.
+
+        Returns:
+            str | None: Path of the image file, or None if the peer has no avatar.
+        """
+        with self._lock:
+            if self._files is None:
+                self._load_files()
+            digest = self.by_user.get(user_id)
+            if digest is None:
+                return None
+            entry = self._files.get(digest)
+            if entry is not None:
+                self._files.move_to_end(digest)
+                path = os.path.join(self.directory, entry[0])
+                try:
+                    os.utime(path)
+                    return path
+                except OSError:
+                    # Deleted behind our back; fall through and write it again if we still can
+                    del self._files[digest]
+                    self._disk_bytes -= entry[1]
+            encoded = self._encoded.get(digest)
+            if encoded is None:
+                return None
+            self._drop_encoded(digest)
+            return self._write(digest, *encoded)
+
+    def _write(self, digest: str, mime_type: str, avatar_data: str):
+        # Caller holds _lock. Avatars are at most MAX_AVATAR_SIZE, so writing one is quick.
+        try:
+            data = base64.b64decode(avatar_data)
+        except ValueError as e:
+            verbose_log("[Error]", f"Failed to decode avatar {digest}: {e}")
+            return None
+        name = digest + (mimetypes.guess_extension(mime_type or "") or ".img")
+        path = os.path.join(self.directory, name)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            verbose_log("[Error]", f"Failed to write avatar {name}: {e}")
+            return None
+
+        self._files[digest] = (name, len(data))
+        self._disk_bytes += len(data)
+        self._evict(keep=digest)
+        return path
+
+    def _evict(self, keep: str):
+        while self._disk_bytes > self.budget and len(self._files) > 1:
+            digest, (name, size) = next(iter(self._files.items()))
+            if digest == keep:
+                break
+            del self._files[digest]
+            self._disk_bytes -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            verbose_log("INFO", f"Evicted cached avatar {name}")
+
+
+avatar_cache = AvatarCache()
+peer_index.evict_listeners.append(avatar_cache.forget)
@@ -0,0 +1,364 @@
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from config import STORAGE_BACKEND, STORAGE_FLUSH_INTERVAL, STORAGE_FLUSH_MAX
+from core.task_scheduler import task_scheduler
+from models.message import DirectMessage, GroupMessage, Post
+from utils.printer import verbose_log
+
+
+class StorageBackend:
+    """
+    Where the stores in storage/ keep what must outlive the process.
+
+    The stores hold their working set in memory and write every change
+    through to the backend; on startup they reload from it, and reads that
+    reach past what is kept in memory are answered by it. This base class is
+    the memory-only backend: every write is dropped and every load is empty,
+    so nothing is persisted and the stores keep their full history in memory.
+    """
+    persistent = False
+
+    # Posts
+    def save_post(self, post: Post):
+        pass
+
+    def delete_expired_posts(self, now: int):
+        pass
+
+    def load_posts(self, now: int) -> list:
+        return []
+
+    # Direct messages
+    def save_dm(self, dm: DirectMessage):
+        pass
+
+    def load_thread(self, user_a: str, user_b: str, limit: int) -> list:
+        return []
+
+    def load_recent_dms(self, limit: int) -> list:
+        return []
+
+    # Groups
+    def save_group(self, group_id: str, name: str, members):
+        pass
+
+    def save_group_members(self, group_id: str, add=None, remove=None):
+        pass
+
+    def save_group_message(self, group_id: str, message: GroupMessage, message_id: str = None):
+        pass
+
+    def load_groups(self) -> list:
+        return []
+
+    def load_group_messages(self, group_id: str, start: int, end: int) -> list:
+        return []
+
+    def next_group_seq(self, group_id: str) -> int:
+        return 0
+
+    # Likes and follows
+    def save_like(self, poster_user_id: str, post_ts: int, liker_user_id: str):
+        pass
+
+    def delete_like(self, poster_user_id: str, post_ts: int, liker_user_id: str):
+        pass
+
+    def load_likes(self) -> list:
+        return []
+
+    def save_follow(self, kind: str, user_id: str):
+        pass
+
+    def delete_follow(self, kind: str, user_id: str):
+        pass
+
+    def load_follows(self) -> list:
+        return []
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    message_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    timestamp INTEGER,
+    expiry INTEGER,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS posts_expiry ON posts (expiry);
+
+CREATE TABLE IF NOT EXISTS dms (
+    message_id TEXT PRIMARY KEY,
+    user_a TEXT,
+    user_b TEXT,
+    timestamp INTEGER,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS dms_conversation ON dms (user_a, user_b, timestamp);
+CREATE INDEX IF NOT EXISTS dms_timestamp ON dms (timestamp);
+
+CREATE TABLE IF NOT EXISTS groups (
+    group_id TEXT PRIMARY KEY,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS group_members (
+    group_id TEXT,
+    user_id TEXT,
+    PRIMARY KEY (group_id, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS group_messages (
+    group_id TEXT,
+    seq INTEGER,
+    message_id TEXT,
+    sender TEXT,
+    content TEXT,
+    timestamp INTEGER,
+    PRIMARY KEY (group_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS likes (
+    poster_user_id TEXT,
+    post_ts INTEGER,
+    liker_user_id TEXT,
+    PRIMARY KEY (poster_user_id, post_ts, liker_user_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS follows (
+    kind TEXT,
+    user_id TEXT,
+    PRIMARY KEY (kind, user_id)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Persists the stores to an SQLite database in WAL mode.
+
+    Writes are queued and committed together in one transaction every
+    STORAGE_FLUSH_INTERVAL seconds (sooner once STORAGE_FLUSH_MAX are
+    pending), so a burst of messages costs one commit rather than one per
+    message. The "storage-flush" scheduler task only signals the
+    "lsnp-storage" writer thread, which does the commit; a slow fsync or WAL
+    checkpoint therefore never holds up broadcasts or retransmissions. Reads
+    flush the queue first, so they always see earlier writes. path
+    ":memory:" gives a database that is never written to disk.
+    """
+    persistent = True
+
+    def __init__(self, path: str, flush_interval=STORAGE_FLUSH_INTERVAL, flush_max=STORAGE_FLUSH_MAX):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_max = flush_max
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()      # serializes use of the connection
+        self._pending = []                    # (sql, params) not yet committed
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._flush_due = threading.Event()
+        self._writer = threading.Thread(target=self._flush_loop, name="lsnp-storage", daemon=True)
+        self._writer.start()
+        self._flush_task = task_scheduler.every("storage-flush", flush_interval, self._flush_due.set)
+
+    def _write(self, sql: str, params: tuple):
+        with self._pending_lock:
+            self._pending.append((sql, params))
+            full = len(self._pending) >= self.flush_max
+        if full:
+            self._flush_due.set()
+
+    def _flush_loop(self):
+        while True:
+            self._flush_due.wait()
+            self._flush_due.clear()
+            if self._closed:
+                return
+            self.flush()
+
+    def flush(self):
+        """
+        Commits every queued write in a single transaction.
+        """
+        with self._db_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            if not pending or self._conn is None:
+                return
+            try:
+                self._conn.execute("BEGIN")
+                for sql, params in pending:
+                    self._conn.execute(sql, params)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                verbose_log("[Error]", f"Storage flush of {len(pending)} writes failed: {e}")
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        task_scheduler.cancel(self._flush_task)
+        self._flush_due.set()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+            self._conn = None
+
+    # Posts
+    def save_post(self, post: Post):
+        self._write(
+            "INSERT OR IGNORE INTO posts VALUES (?, ?, ?, ?, ?)",
+            (post.message_id, post.user_id, post.timestamp, post.expiry, json.dumps(post.to_dict())),
+        )
+
+    def delete_expired_posts(self, now: int):
+        self._write("DELETE FROM posts WHERE expiry < ?", (now,))
+
+    def load_posts(self, now: int) -> list:
+        rows = self._query("SELECT data FROM posts WHERE expiry >= ? ORDER BY timestamp, rowid", (now,))
+        return [Post.from_dict(json.loads(data)) for (data,) in rows]
+
+    # Direct messages
+    def save_dm(self, dm: DirectMessage):
+        user_a, user_b = sorted((dm.from_user or "", dm.to_user or ""))
+        self._write(
+            "INSERT OR IGNORE INTO dms VALUES (?, ?, ?, ?, ?)",
+            (dm.message_id, user_a, user_b, dm.timestamp, json.dumps(dm.to_dict())),
+        )
+
+    def load_thread(self, user_a: str, user_b: str, limit: int) -> list:
+        user_a, user_b = sorted((user_a or "", user_b or ""))
+        rows = self._query(
+            "SELECT data FROM dms WHERE user_a = ? AND user_b = ? "
+            "ORDER BY timestamp DESC, rowid DESC LIMIT ?",
+            (user_a, user_b, limit),
+        )
+        return [DirectMessage.from_dict(json.loads(data)) for (data,) in reversed(rows)]
+
+    def load_recent_dms(self, limit: int) -> list:
+        rows = self._query("SELECT data FROM dms ORDER BY timestamp DESC, rowid DESC LIMIT ?", (limit,))
+        return [DirectMessage.from_dict(json.loads(data)) for (data,) in rows]
+
+    # Groups
+    def save_group(self, group_id: str, name: str, members):
+        self._write("INSERT OR REPLACE INTO groups VALUES (?, ?)", (group_id, name))
+        self._write("DELETE FROM group_members WHERE group_id = ?", (group_id,))
+        self.save_group_members(group_id, add=members)
+
+    def save_group_members(self, group_id: str, add=None, remove=None):
+        for user_id in add or ():
+            self._write("INSERT OR IGNORE INTO group_members VALUES (?, ?)", (group_id, user_id))
+        for user_id in remove or ():
+            self._write("DELETE FROM group_members WHERE group_id = ? AND user_id = ?", (group_id, user_id))
+
+    def save_group_message(self, group_id: str, message: GroupMessage, message_id: str = None):
+        self._write(
+            "INSERT OR IGNORE INTO group_messages VALUES (?, ?, ?, ?, ?, ?)",
+            (group_id, message.seq, message_id, message.sender, message.content, message.timestamp),
+        )
+
+    def load_groups(self) -> list:
+        """
+        Returns:
+            list: (group_id, name, members) for every group.
+        """
+        members = {}
+        for group_id, user_id in self._query("SELECT group_id, user_id FROM group_members"):
+            members.setdefault(group_id, set()).add(user_id)
+        return [
+            (group_id, name, members.get(group_id, set()))
+            for group_id, name in self._query("SELECT group_id, name FROM groups")
+        ]
+
+    def load_group_messages(self, group_id: str, start: int, end: int) -> list:
+        """
+        Returns:
+            list: The group's messages with start <= seq < end, oldest first.
+        """
+        rows = self._query(
+            "SELECT seq, sender, content, timestamp FROM group_messages "
+            "WHERE group_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+            (group_id, start, end),
+        )
+        return [GroupMessage(seq, sender, content, timestamp) for seq, sender, content, timestamp in rows]
+
+    def next_group_seq(self, group_id: str) -> int:
+        (last,) = self._query("SELECT MAX(seq) FROM group_messages WHERE group_id = ?", (group_id,))[0]
+        return 0 if last is None else last + 1
+
+    # Likes and follows
+    def save_like(self, poster_user_id: str, post_ts: int, liker_user_id: str):
+        self._write("INSERT OR IGNORE INTO likes VALUES (?, ?, ?)", (poster_user_id, post_ts, liker_user_id))
+
+    def delete_like(self, poster_user_id: str, post_ts: int, liker_user_id: str):
+        self._write(
+            "DELETE FROM likes WHERE poster_user_id = ? AND post_ts = ? AND liker_user_id = ?",
+            (poster_user_id, post_ts, liker_user_id),
+        )
+
+    def load_likes(self) -> list:
+        return self._query("SELECT poster_user_id, post_ts, liker_user_id FROM likes")
+
+    def save_follow(self, kind: str, user_id: str):
+        self._write("INSERT OR IGNORE INTO follows VALUES (?, ?)", (kind, user_id))
+
+    def delete_follow(self, kind: str, user_id: str):
+        self._write("DELETE FROM follows WHERE kind = ? AND user_id = ?", (kind, user_id))
+
+    def load_follows(self) -> list:
+        return self._query("SELECT kind, user_id FROM follows")
+
+
+_backend = StorageBackend()
+
+
+def get_backend() -> StorageBackend:
+    return _backend
+
+
+def open_backend(kind: str = STORAGE_BACKEND, path: str = ":memory:") -> StorageBackend:
+    """
+    Replaces the current backend.
+
+    Args:
+        kind (str): "sqlite" or "memory".
+        path (str): The SQLite database file; ignored for "memory".
+    """
+    global _backend
+    _backend.close()
+    _backend = SQLiteBackend(path) if kind == "sqlite" else StorageBackend()
+    return _backend
+
+
+def start_storage(path: str, kind: str = STORAGE_BACKEND):
+    """
+    Opens the backend and reloads every store from it. DMs and older group
+    messages are not loaded; they are read from the backend when asked for.
+    """
+    from storage import group_directory, likes_store, post_store, user_followers
+
+    started = time.monotonic()
+    backend = open_backend(kind, path)
+    atexit.register(backend.close)
+    posts = post_store.load_posts()
+    group_directory.load_groups()
+    likes_store.load_likes()
+    user_followers.load_follows()
+    verbose_log("STORAGE", f"{kind} storage at {path}: {posts} posts reloaded in {time.monotonic() - started:.2f}s")
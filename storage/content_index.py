@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from config import DOWNLOADS_DIR
+from utils.printer import verbose_log
+
+INDEX_FILENAME = ".content_index.json"
+_SKIP_SUFFIXES = (".part", ".journal", ".tmp")
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ContentIndex:
+    """
+    SHA-256 -> file for everything in the downloads directory, so an offer
+    for content we already have can be completed locally.
+
+    The index is persisted next to the files. On rebuild, a file whose size
+    and mtime match its saved entry keeps its hash; only new or changed files
+    are hashed again.
+    """
+    def __init__(self, directory: str = DOWNLOADS_DIR):
+        self.directory = directory
+        self.entries = {}  # filename -> {"sha256", "size", "mtime_ns"}
+        self.by_hash = {}  # sha256 -> filename
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILENAME)
+
+    def load(self):
+        """
+        Reads the saved index without touching the files themselves.
+        """
+        try:
+            with open(self.index_path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        with self._lock:
+            self.entries = entries
+            self.by_hash = {entry["sha256"]: name for name, entry in entries.items()}
+
+    def rebuild(self) -> int:
+        """
+        Brings the index in line with the directory: hashes new or modified
+        files and forgets deleted ones.
+
+        Returns:
+            int: Number of files that had to be hashed.
+        """
+        self.load()
+        if not os.path.isdir(self.directory):
+            return 0
+
+        with self._lock:
+            known = dict(self.entries)
+        entries = {}
+        hashed = 0
+        for name in os.listdir(self.directory):
+            if name.startswith(".") or name.endswith(_SKIP_SUFFIXES):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if not os.path.isfile(path):
+                continue
+            entry = known.get(name)
+            if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                entry = {"sha256": sha256_file(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                hashed += 1
+            entries[name] = entry
+
+        with self._lock:
+            self.entries = entries
+            self.by_hash = {entry["sha256"]: name for name, entry in entries.items()}
+        self.save()
+        verbose_log("INDEX", f"{len(entries)} downloads indexed, {hashed} hashed")
+        return hashed
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.entries)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.index_path + ".tmp", "w") as f:
+            f.write(data)
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def add(self, path: str, sha256: str = None):
+        """
+        Indexes a file that was just saved to the downloads directory.
+
+        Args:
+            path (str): The file.
+            sha256 (str, optional): Its hash if already known (e.g. verified FILEHASH).
+        """
+        stat = os.stat(path)
+        name = os.path.basename(path)
+        entry = {"sha256": sha256 or sha256_file(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        with self._lock:
+            self.entries[name] = entry
+            self.by_hash[entry["sha256"]] = name
+        self.save()
+
+    def lookup(self, sha256: str, size: int):
+        """
+        Finds a downloaded file with this content.
+
+        Returns:
+            str | None: Its path, if it is still there with the same size and mtime.
+        """
+        with self._lock:
+            name = self.by_hash.get(sha256)
+            entry = self.entries.get(name) if name else None
+        if entry is None or entry["size"] != size:
+            return None
+        path = os.path.join(self.directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size != size or stat.st_mtime_ns != entry["mtime_ns"]:
+            return None
+        return path
+
+    def materialize(self, source: str, target: str) -> str:
+        """
+        Makes target a copy of an indexed file: a hard link where possible,
+        otherwise a byte copy.
+
+        Returns:
+            str: target
+        """
+        if os.path.exists(target) and os.path.samefile(source, target):
+            return target
+        tmp = target + ".tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        try:
+            os.link(source, tmp)
+        except OSError:
+            shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+        with self._lock:
+            entry = self.entries.get(os.path.basename(source))
+        self.add(target, entry["sha256"] if entry else None)
+        return target
+
+
+content_index = ContentIndex()
+
+
+def start_content_index():
+    """
+    Loads the saved index now and refreshes it from disk in the background.
+    """
+    content_index.load()
+    threading.Thread(target=content_index.rebuild, daemon=True).start()
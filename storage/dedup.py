@@ -0,0 +1,165 @@
+import hashlib
+import math
+import threading
+import time
+import config
+from config import DEDUP_BLOOM_CAPACITY, DEDUP_BLOOM_FP_RATE, DEDUP_GENERATIONS, DEDUP_MODE, DEDUP_WINDOW
+
+
+def dedup_window() -> float:
+    """
+    DEDUP_WINDOW, stretched to the longest token TTL currently configured;
+    config.token_ttl_post can be raised at runtime.
+    """
+    return max(DEDUP_WINDOW, config.token_ttl_post, config.TOKEN_TTL_CHAT, config.TOKEN_TTL_BROADCAST)
+
+
+class GenerationalDedup:
+    """
+    Remembers keys (normally MESSAGE_IDs) for a sliding time window.
+
+    Keys go into the newest of a fixed number of sets; every
+    window / (generations - 1) seconds the oldest set is dropped and a new one
+    started. A key is therefore remembered for at least window seconds and
+    at most window * generations / (generations - 1), and memory is bounded
+    by the message rate times the window rather than by uptime. window may be
+    a function (e.g. dedup_window), read again at every rotation.
+    """
+    def __init__(self, window=DEDUP_WINDOW, generations=DEDUP_GENERATIONS, clock=time.monotonic):
+        self._window = window
+        self._spans = max(generations - 1, 1)
+        self.clock = clock
+        self._generations = [set() for _ in range(generations)]  # newest first
+        self._rotated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def window(self) -> float:
+        return self._window() if callable(self._window) else self._window
+
+    @property
+    def span(self) -> float:
+        return self.window / self._spans
+
+    def _rotate(self):
+        elapsed = self.clock() - self._rotated
+        span = self.span
+        if elapsed < span:
+            return
+        steps = min(int(elapsed // span), len(self._generations))
+        for _ in range(steps):
+            self._generations.pop()
+            self._generations.insert(0, set())
+        self._rotated += (elapsed // span) * span
+
+    def add(self, key) -> bool:
+        """
+        Records a key.
+
+        Returns:
+            bool: False if it was already seen within the window.
+        """
+        with self._lock:
+            self._rotate()
+            if any(key in generation for generation in self._generations):
+                return False
+            self._generations[0].add(key)
+            return True
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            self._rotate()
+            return any(key in generation for generation in self._generations)
+
+    def __len__(self) -> int:
+        return sum(len(generation) for generation in self._generations)
+
+
+class BloomDedup:
+    """
+    A rotating pair of Bloom filters: the same window semantics as
+    GenerationalDedup in a fixed number of bytes, at the price of a
+    false-positive rate (a new key reported as seen).
+
+    Each filter is sized for capacity keys at fp_rate. The current filter is
+    retired when its span is up or when it has taken capacity keys, whichever
+    comes first, so a burst shortens the window instead of raising the
+    false-positive rate. window may be a function, as for GenerationalDedup.
+    """
+    def __init__(self, window=DEDUP_WINDOW, capacity=DEDUP_BLOOM_CAPACITY, fp_rate=DEDUP_BLOOM_FP_RATE,
+                 clock=time.monotonic):
+        self._window = window
+        self.capacity = capacity
+        self.clock = clock
+        self.bits = max(8, int(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._current = bytearray((self.bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._count = 0
+        self._rotated = clock()
+        self._lock = threading.Lock()
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode() if isinstance(key, str) else key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    @staticmethod
+    def _test(bits: bytearray, positions) -> bool:
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    @property
+    def window(self) -> float:
+        return self._window() if callable(self._window) else self._window
+
+    def _rotate(self):
+        elapsed = self.clock() - self._rotated
+        window = self.window
+        if elapsed < window and self._count < self.capacity:
+            return
+        if elapsed >= 2 * window:
+            self._previous = bytearray(len(self._current))
+        else:
+            self._previous = self._current
+        self._current = bytearray(len(self._previous))
+        self._count = 0
+        self._rotated = self.clock()
+
+    def add(self, key) -> bool:
+        positions = self._positions(key)
+        with self._lock:
+            self._rotate()
+            if self._test(self._current, positions) or self._test(self._previous, positions):
+                return False
+            for p in positions:
+                self._current[p >> 3] |= 1 << (p & 7)
+            self._count += 1
+            return True
+
+    def __contains__(self, key) -> bool:
+        positions = self._positions(key)
+        with self._lock:
+            self._rotate()
+            return self._test(self._current, positions) or self._test(self._previous, positions)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def new_dedup(window=dedup_window):
+    """
+    A dedup window of the kind selected by DEDUP_MODE ("sets" or "bloom"),
+    by default as long as dedup_window() at each rotation.
+    """
+    if DEDUP_MODE == "bloom":
+        return BloomDedup(window)
+    return GenerationalDedup(window)
+
+
+def content_key(*fields) -> str:
+    """
+    A dedup key for messages that carry no MESSAGE_ID, derived from the fields
+    that identify them.
+    """
+    return hashlib.blake2b("\x1f".join(str(field) for field in fields).encode(), digest_size=16).hexdigest()
@@ -1,20 +1,101 @@
+import bisect
+import itertools
+import threading
+from config import STORAGE_CACHE_SIZE
+from models.message import DirectMessage
+from storage.backend import get_backend
+from storage.dedup import new_dedup
+
+# Every DM, as (TIMESTAMP, seq, DirectMessage) in timestamp order; seq keeps ties in arrival order
 dms = []
-seen_dm_ids = set()
+# Conversation key (sorted pair of user ids) -> that conversation's entries, same ordering
+conversations = {}
+# With a persistent backend only the newest STORAGE_CACHE_SIZE entries of each list are
+# kept. A list is read back from the backend once, the first time it is asked for; after
+# that reads are served from memory, and only go to the backend for entries trimmed away.
+seen_dm_ids = new_dedup()
+_hydrated = set()   # conversation keys read back from the backend; None stands for dms
+_complete = set()   # of those, the ones whose list still holds their whole history
+
+_seq = itertools.count()
+_lock = threading.Lock()
+
+def conversation_key(user_a: str, user_b: str) -> tuple:
+    """
+    The same key for both directions of a conversation.
+    """
+    return (user_a, user_b) if user_a <= user_b else (user_b, user_a)
 
-def save_dm(dm: dict):
-    message_id = dm.get("MESSAGE_ID")
-    if not message_id or message_id in seen_dm_ids:
+def _insert(entries: list, entry: tuple, key=None):
+    # DMs nearly always arrive in order, so appending is the common case
+    if not entries or entry >= entries[-1]:
+        entries.append(entry)
+    else:
+        bisect.insort(entries, entry)
+    # Trim in batches so the cost of shifting the list is spread over many inserts
+    if len(entries) > 2 * STORAGE_CACHE_SIZE and get_backend().persistent:
+        del entries[:-STORAGE_CACHE_SIZE]
+        _complete.discard(key)
+
+def _hydrate(entries: list, key, load):
+    # Caller holds _lock. Merges what the backend has into a list the first time it is read;
+    # DMs saved since startup are both in memory and in the backend.
+    _hydrated.add(key)
+    backend = get_backend()
+    if not backend.persistent:
+        _complete.add(key)
+        return
+    loaded = load(backend)  # oldest first
+    known = {dm.message_id for _, _, dm in entries}
+    # Negative seqs sort them before live entries with the same TIMESTAMP
+    for seq, dm in enumerate(loaded, -len(loaded)):
+        if dm.message_id not in known:
+            _insert(entries, (dm.timestamp, seq, dm), key)
+    if len(loaded) < STORAGE_CACHE_SIZE:
+        _complete.add(key)
+
+def save_dm(msg) -> bool:
+    """
+    Stores a DM message as a DirectMessage record; its token is not kept.
+    """
+    if not msg.get("MESSAGE_ID"):
         return False
-    
-    seen_dm_ids.add(message_id)
-    dms.append(dm)
+    dm = DirectMessage.from_message(msg)
+    entry = (dm.timestamp, next(_seq), dm)
+
+    with _lock:
+        if not seen_dm_ids.add(dm.message_id):
+            return False
+        _insert(dms, entry)
+        key = conversation_key(dm.from_user, dm.to_user)
+        _insert(conversations.setdefault(key, []), entry, key)
+    get_backend().save_dm(dm)
     return True
 
 def get_recent_dms(limit=50):
-    return sorted(dms, key=lambda d: int(d.get("TIMESTAMP")), reverse=True)[:limit]
+    """
+    Newest DMs across all conversations, newest first.
+    """
+    with _lock:
+        if None not in _hydrated:
+            _hydrate(dms, None, lambda backend: backend.load_recent_dms(STORAGE_CACHE_SIZE)[::-1])
+        recent = [dm for _, _, dm in reversed(dms[-limit:])]
+        complete = None in _complete
+    if len(recent) < limit and not complete:
+        return get_backend().load_recent_dms(limit)
+    return recent
 
 def get_thread(with_user_id: str, profile_user_id: str, limit=50):
-    thread = [dm for dm in dms if
-              (dm.get("FROM") == with_user_id and dm.get("TO") == profile_user_id) or
-              (dm.get("FROM") == profile_user_id and dm.get("TO") == with_user_id)]
-    return sorted(thread, key=lambda d: int(d.get("TIMESTAMP")))[-limit:]
+    """
+    The last limit DMs between two users, oldest first.
+    """
+    key = conversation_key(with_user_id, profile_user_id)
+    with _lock:
+        entries = conversations.setdefault(key, [])
+        if key not in _hydrated:
+            _hydrate(entries, key, lambda backend: backend.load_thread(with_user_id, profile_user_id, STORAGE_CACHE_SIZE))
+        thread = [dm for _, _, dm in entries[-limit:]]
+        complete = key in _complete
+    if len(thread) < limit and not complete:
+        return get_backend().load_thread(with_user_id, profile_user_id, limit)
+    return thread
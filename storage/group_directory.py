@@ -1,23 +1,56 @@
 # storage/group_directory.py
+import threading
 from typing import Dict, List
+from config import GROUP_HISTORY_SIZE, GROUP_PAGE_SIZE
+from models.message import GroupMessage
+from storage.backend import get_backend
+from storage.dedup import new_dedup
+from storage.ring_buffer import RingBuffer
 
 # group_table: { group_id: { "name": str, "members": set(user_id) } }
 group_table: Dict[str, Dict] = {}
 
-# group_messages: { group_id: [ { "sender": str, "content": str, "timestamp": str } ] }
-group_messages: Dict[str, List[Dict]] = {}
+# group_messages: { group_id: RingBuffer of GroupMessage }
+# Only the newest GROUP_HISTORY_SIZE messages per group are held in memory; a persistent
+# storage backend keeps the rest. GroupMessage.seq numbers a group's messages from 0 and is the paging cursor.
+group_messages: Dict[str, RingBuffer] = {}
+_lock = threading.Lock()
+
+# MESSAGE_IDs stored within DEDUP_WINDOW, so retransmitted group messages are not shown twice
+seen_group_message_ids = new_dedup()
 
 
 def create_group(group_id: str, group_name: str, members: List[str]):
     """
     Create a group entry with given ID, name, and members.
-    Also initializes an empty message list for the group.
+    Also initializes an empty message history for the group, unless it already has one.
     """
     group_table[group_id] = {
         "name": group_name,
         "members": set(members)
     }
-    group_messages[group_id] = []  # Initialize empty chat history
+    with _lock:
+        _history(group_id)
+    get_backend().save_group(group_id, group_name, members)
+
+
+def _history(group_id: str) -> RingBuffer:
+    # Caller holds _lock. A group's history, read back from the storage backend the
+    # first time, so seqs carry on from the ones it already stored instead of restarting at 0.
+    history = group_messages.get(group_id)
+    if history is None:
+        history = group_messages[group_id] = _hydrate(group_id)
+    return history
+
+
+def _hydrate(group_id: str) -> RingBuffer:
+    backend = get_backend()
+    next_seq = backend.next_group_seq(group_id)
+    start = max(0, next_seq - GROUP_HISTORY_SIZE)
+    history = RingBuffer(GROUP_HISTORY_SIZE, start)
+    for message in backend.load_group_messages(group_id, start, next_seq):
+        history.append(message)
+    return history
 
 
 def update_group_members(group_id: str, add=None, remove=None):
@@ -30,6 +63,7 @@ def update_group_members(group_id: str, add=None, remove=None):
         group_table[group_id]["members"].update(add)
     if remove:
         group_table[group_id]["members"].difference_update(remove)
+    get_backend().save_group_members(group_id, add=add, remove=remove)
 
 
 def get_group_members(group_id: str) -> List[str]:
@@ -50,25 +84,73 @@ def get_group_name(group_id: str) -> str:
     return group_id
 
 
-def store_group_message(group_id: str, sender: str, content: str, timestamp: str):
+def store_group_message(group_id: str, sender: str, content: str, timestamp: str, message_id: str = None):
     """
     Store a group message for later retrieval.
-    Creates message list for group if it doesn't exist yet.
+    Creates the group's history if it doesn't exist yet.
+
+    Args:
+        message_id (str, optional): MESSAGE_ID, or another key identifying the
+            message (see storage.dedup.content_key), checked against DEDUP_WINDOW.
+
+    Returns:
+        bool: False if a message with the same key was already stored.
     """
-    if group_id not in group_messages:
-        group_messages[group_id] = []
+    if message_id:
+        if not seen_group_message_ids.add(message_id):
+            return False
 
-    group_messages[group_id].append({
-        "sender": sender,
-        "content": content,
-        "timestamp": timestamp
-    })
+    with _lock:
+        history = _history(group_id)
+        message = GroupMessage(history.next_seq, sender, content, timestamp)
+        history.append(message)
+        get_backend().save_group_message(group_id, message, message_id)
+    return True
 
 
-def get_group_messages(group_id: str) -> List[Dict]:
+def get_group_messages(group_id: str, before: int = None, after: int = None, limit: int = GROUP_PAGE_SIZE) -> List[GroupMessage]:
     """
-    Retrieve all stored messages for a group.
+    Retrieve one page of a group's messages, oldest first.
+
+    Without a cursor this is the newest limit messages. With before, the
+    limit messages just older than that seq; with after, the limit messages
+    just newer. Messages that have left the in-memory history are read from
+    the storage backend, if it keeps them.
     Returns an empty list if no messages are found.
     """
-
-    return group_messages.get(group_id, [])
+    backend = get_backend()
+    with _lock:
+        history = group_messages.get(group_id)
+        if history is None:
+            return []
+        low = 0 if after is None else after + 1
+        if not backend.persistent:
+            low = max(low, history.first_seq)  # nothing older survives
+        high = history.next_seq if before is None else min(before, history.next_seq)
+        if after is not None:
+            high = min(high, low + limit)
+        else:
+            low = max(low, high - limit)
+        if low >= high:
+            return []
+        held = history.range(low, high)
+        first_held = history.first_seq
+
+    if low < first_held and backend.persistent:
+        return backend.load_group_messages(group_id, low, min(high, first_held)) + held
+    return held
+
+
+def load_groups():
+    """
+    Reloads groups, their members and their newest messages from the storage backend.
+    """
+    backend = get_backend()
+    for group_id, name, members in backend.load_groups():
+        group_table[group_id] = {
+            "name": name,
+            "members": set(members)
+        }
+        history = _hydrate(group_id)
+        with _lock:
+            group_messages[group_id] = history
@@ -1,3 +1,5 @@
+from storage.backend import get_backend
+
 likes = {}
 
 def key(poster_user_id: str, post_ts: int):
@@ -11,14 +13,17 @@ def add_like(poster_user_id: str, post_ts: int, from_user_id: str):
         s = set()
         likes[k] = s
     
-    s.add(from_user_id)
+    if from_user_id not in s:
+        s.add(from_user_id)
+        get_backend().save_like(poster_user_id, int(post_ts), from_user_id)
 
 def remove_like(poster_user_id: str, post_ts: int, from_user_id: str):
     k = key(poster_user_id, post_ts)
     s = likes.get(k)
 
-    if s:
+    if s and from_user_id in s:
         s.discard(from_user_id)
+        get_backend().delete_like(poster_user_id, int(post_ts), from_user_id)
         if not s:
             likes.pop(k, None)
 
@@ -31,3 +36,6 @@ def get_likers(poster_user_id: str, post_ts: int):
 def has_liked(poster_user_id: str, post_ts: int, liker_user_id: str):
     return liker_user_id in likes.get((poster_user_id, int(post_ts)), set())
 
+def load_likes():
+    for poster_user_id, post_ts, liker_user_id in get_backend().load_likes():
+        likes.setdefault(key(poster_user_id, post_ts), set()).add(liker_user_id)
@@ -0,0 +1,149 @@
+import os
+from storage.content_index import sha256_file
+
+
+class ChunkBitmap:
+    """
+    One bit per chunk, set once the chunk has been written.
+
+    Indexing returns 0 or 1, so it can stand in for the per-chunk bytearray
+    that encode_sack_bitmap reads.
+    """
+    __slots__ = ("total", "bits", "count")
+
+    def __init__(self, total: int, bits: bytes = None):
+        self.total = total
+        self.bits = bytearray((total + 7) // 8) if bits is None else bytearray(bits)
+        self.count = sum(1 for i in range(total) if self[i]) if bits is not None else 0
+
+    def __getitem__(self, index: int) -> int:
+        return (self.bits[index >> 3] >> (index & 7)) & 1
+
+    def __len__(self) -> int:
+        return self.total
+
+    def set(self, index: int) -> bool:
+        """
+        Marks a chunk as received.
+
+        Returns:
+            bool: False if it was already set.
+        """
+        mask = 1 << (index & 7)
+        if self.bits[index >> 3] & mask:
+            return False
+        self.bits[index >> 3] |= mask
+        self.count += 1
+        return True
+
+    def first_missing(self, start: int = 0) -> int:
+        """
+        Returns the first unset index at or after start, or total if none.
+        """
+        index = start
+        while index < self.total:
+            byte = self.bits[index >> 3]
+            if byte == 0xFF and not index & 7:
+                index += 8  # skip full bytes
+                continue
+            if not (byte >> (index & 7)) & 1:
+                return index
+            index += 1
+        return self.total
+
+    @property
+    def complete(self) -> bool:
+        return self.count >= self.total
+
+
+class PartialFile:
+    """
+    A download written chunk by chunk into a preallocated "<name>.part" file
+    and renamed into place once every chunk has arrived. Only one chunk is
+    ever held in memory.
+    """
+    def __init__(self, path: str, filesize: int, total_chunks: int, received: bytes = None, chunk_size: int = None):
+        """
+        Args:
+            path (str): Final location of the file.
+            filesize (int): FILESIZE from the FILE_OFFER.
+            total_chunks (int): TOTAL_CHUNKS from the first FILE_CHUNK.
+            received (bytes, optional): Bitmap of chunks already in an existing
+                .part file, to resume it instead of starting over.
+            chunk_size (int, optional): Chunk size the existing .part was written with.
+        """
+        self.path = path
+        self.part_path = path + ".part"
+        self.filesize = filesize
+        self.chunk_size = chunk_size  # learned from the first chunk that is not the last
+        self.received = ChunkBitmap(total_chunks, received)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(self.part_path, "r+b" if received is not None else "wb")
+        self._file.truncate(filesize)
+
+    @property
+    def total_chunks(self) -> int:
+        return self.received.total
+
+    @property
+    def complete(self) -> bool:
+        return self.received.complete
+
+    def write_chunk(self, index: int, data: bytes) -> bool:
+        """
+        Writes one chunk at its offset. Every chunk but the last has the
+        sender's full chunk size, so the offset follows from index and length;
+        the last chunk ends at filesize.
+
+        Returns:
+            bool: False if the chunk was a duplicate or does not fit the file.
+        """
+        if not 0 <= index < self.total_chunks or self.received[index]:
+            return False
+        if index == self.total_chunks - 1:
+            offset = self.filesize - len(data)
+        else:
+            if self.chunk_size is None:
+                self.chunk_size = len(data)
+            elif len(data) != self.chunk_size:
+                return False
+            offset = index * len(data)
+        if offset < 0 or offset + len(data) > self.filesize:
+            return False
+
+        self._file.seek(offset)
+        self._file.write(data)
+        self.received.set(index)
+        return True
+
+    def flush(self):
+        """
+        Pushes written chunks to the OS, so a journal saved afterwards never
+        lists a chunk that is not in the file.
+        """
+        self._file.flush()
+
+    def sha256(self) -> str:
+        self._file.flush()
+        return sha256_file(self.part_path)
+
+    def discard(self):
+        self.close()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+    def finalize(self) -> str:
+        """
+        Closes the temp file and atomically moves it to its final path.
+
+        Returns:
+            str: The final path.
+        """
+        self.close()
+        os.replace(self.part_path, self.path)
+        return self.path
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
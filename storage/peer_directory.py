@@ -1,8 +1,88 @@
+import threading
 import time
-from typing import Dict
+from collections import OrderedDict
+from config import PEER_ACTIVE_WINDOW, PEER_EXPIRY, PEER_SWEEP_INTERVAL
+from core.task_scheduler import task_scheduler
 from models.peer import Profile
+from utils.printer import verbose_log
+
+
+class PeerIndex:
+    """
+    Known peers, ordered by when they were last heard from.
+
+    Every PROFILE or PING moves the peer to the end of an OrderedDict, so the
+    active peers are always its tail: listing them walks back from the end
+    and stops at the first stale entry, and evicting stale peers pops from
+    the front. Lookups by user id are a dict access.
+    """
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._peers = OrderedDict()  # user_id -> (Profile, last_seen), oldest first
+        self.evict_listeners = []    # called with the user ids of evicted peers
+        self._lock = threading.Lock()
+
+    def update(self, user_id: str, profile: Profile):
+        with self._lock:
+            self._peers[user_id] = (profile, self.clock())
+            self._peers.move_to_end(user_id)
+
+    def touch(self, user_id: str):
+        with self._lock:
+            entry = self._peers.get(user_id)
+            if entry:
+                self._peers[user_id] = (entry[0], self.clock())
+                self._peers.move_to_end(user_id)
+
+    def active(self, active_within: float) -> list:
+        """
+        Returns the profiles heard from within active_within seconds, most recent first.
+        """
+        cutoff = self.clock() - active_within
+        result = []
+        with self._lock:
+            for profile, last_seen in reversed(self._peers.values()):
+                if last_seen < cutoff:
+                    break
+                result.append(profile)
+        return result
+
+    def get(self, user_id: str, active_within: float = None):
+        with self._lock:
+            entry = self._peers.get(user_id)
+        if entry is None:
+            return None
+        if active_within is not None and entry[1] < self.clock() - active_within:
+            return None
+        return entry[0]
+
+    def evict(self, older_than: float) -> int:
+        """
+        Forgets peers not heard from for older_than seconds.
+
+        Returns:
+            int: Number of peers evicted.
+        """
+        cutoff = self.clock() - older_than
+        removed = []
+        with self._lock:
+            while self._peers:
+                user_id, (_, last_seen) = next(iter(self._peers.items()))
+                if last_seen >= cutoff:
+                    break
+                del self._peers[user_id]
+                removed.append(user_id)
+        if removed:
+            for listener in self.evict_listeners:
+                listener(removed)
+        return len(removed)
+
+    def __len__(self) -> int:
+        return len(self._peers)
+
+
+peer_index = PeerIndex()
 
-peer_table: Dict[str, tuple[Profile, float]] = {}
 
 def update_peer(user_id: str, profile: Profile):
     """
@@ -12,36 +92,40 @@ def update_peer(user_id: str, profile: Profile):
         user_id (str): The peer's unique identifier
         profile (Profile): The peer's profile data.
     """
-    peer_table[user_id] = (profile, time.time())
+    peer_index.update(user_id, profile)
 
 def update_peer_last_seen(user_id: str):
-    if user_id in peer_table:
-        profile, _ = peer_table[user_id]
-        peer_table[user_id] = (profile, time.time())
+    peer_index.touch(user_id)
 
-def get_peers(active_within=300):
+def get_peers(active_within=PEER_ACTIVE_WINDOW):
     """
-    Looks up and returns all known peer Profile objects.
+    Looks up and returns the peers heard from within active_within seconds.
 
     Returns:
-        list[Profile]: A list of all known peer Profile objects.
+        list[Profile]: Their Profile objects, most recently seen first.
     """
-    now = time.time()
-    return [
-        profile
-        for profile, last_seen in peer_table.values()
-        if now - last_seen <= active_within
-    ]
+    return peer_index.active(active_within)
 
-def get_peer(user_id: str) -> Profile | None:
+def get_peer(user_id: str, active_within: float = None) -> Profile | None:
     """
     Looks up and returns a specific peer's Profile.
 
     Args:
         user_id (str): The peer's unique identifier.
+        active_within (float, optional): Only return the peer if heard from within this many seconds.
 
     Returns:
         Profile | None: The profile if found; else, none.
     """
-    entry = peer_table.get(user_id)
-    return entry[0] if entry else None
\ No newline at end of file
+    return peer_index.get(user_id, active_within)
+
+def start_peer_sweeper(interval=PEER_SWEEP_INTERVAL, horizon=PEER_EXPIRY):
+    """
+    Schedules eviction of peers silent for more than horizon seconds every interval seconds.
+    """
+    def sweep():
+        removed = peer_index.evict(horizon)
+        if removed:
+            verbose_log("INFO", f"Evicted {removed} peer(s) silent for over {horizon}s")
+
+    return task_scheduler.every("peer-expiry", interval, sweep)
@@ -1,40 +1,163 @@
-from core.token_validator import validate_token
+import bisect
+import heapq
+import itertools
+import threading
+import time
+from core.token_validator import parse_token, revoked_tokens
+from models.message import Post
+from storage.backend import get_backend
+from storage.dedup import new_dedup
 
-posts = []
-seen_post_ids = set()
 
-def save_post(post: dict):
-    post_id = post.get("MESSAGE_ID")
+class PostIndex:
+    """
+    Received posts as Post records, indexed by MESSAGE_ID and by
+    (USER_ID, TIMESTAMP), with a TIMESTAMP-ordered timeline for the feed.
 
-    if post_id in seen_post_ids:
-        return False
-    else:
-        seen_post_ids.add(post_id)
-        posts.append(post)
+    A post's expiry is read from its broadcast token once, when the record is
+    built; expired posts are popped off a min-heap and dropped from every
+    index, so rendering the feed does not re-validate tokens. Posts without a
+    valid broadcast token can still be looked up but never appear in the
+    feed, and only feed posts are written to the storage backend.
+    """
+    def __init__(self):
+        self.by_id = {}          # MESSAGE_ID -> Post
+        self.by_author_ts = {}   # (USER_ID, TIMESTAMP) -> Post
+        self.timeline = []       # sorted (TIMESTAMP, seq, MESSAGE_ID)
+        self._timeline_keys = {} # MESSAGE_ID -> its timeline entry
+        self._expiry_heap = []   # (expiry, MESSAGE_ID)
+        self.seen_ids = new_dedup()  # MESSAGE_IDs saved within DEDUP_WINDOW, so expired posts are not re-added
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
 
-    return True
+    def add(self, post: Post, persist=True) -> bool:
+        """
+        Indexes a post.
 
-def get_recent_posts(limit=20):
-    valid_posts = []
+        Args:
+            post (Post): The post; it goes into the feed if it has an expiry.
+            persist (bool): Whether to write it to the storage backend; False when reloading from it.
+
+        Returns:
+            bool: False if a post with the same MESSAGE_ID was already saved.
+        """
+        post_id = post.message_id
+        expiry = post.expiry
+
+        with self._lock:
+            if not self.seen_ids.add(post_id):
+                return False
+            # Still indexed after the dedup window forgot it (a TTL longer than the window): replace it
+            self._unlink(post_id)
+            self.by_id[post_id] = post
+            self.by_author_ts[(post.user_id, post.timestamp)] = post
+
+            if expiry:
+                entry = (post.timestamp, next(self._seq), post_id)
+                if not self.timeline or entry > self.timeline[-1]:
+                    self.timeline.append(entry)  # the usual case: posts arrive in order
+                else:
+                    bisect.insort(self.timeline, entry)
+                self._timeline_keys[post_id] = entry
+                heapq.heappush(self._expiry_heap, (expiry, post_id))
+        if persist and expiry:
+            get_backend().save_post(post)
+        return True
+
+    def purge_expired(self, now=None) -> int:
+        """
+        Drops posts whose token has expired.
+
+        Returns:
+            int: Number of posts removed.
+        """
+        now = int(time.time()) if now is None else now
+        removed = 0
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] < now:
+                expiry, post_id = heapq.heappop(self._expiry_heap)
+                post = self.by_id.get(post_id)
+                if post is None or post.expiry != expiry:
+                    continue  # already gone, or replaced by a copy with another expiry
+                self._unlink(post_id)
+                removed += 1
+        if removed:
+            get_backend().delete_expired_posts(now)
+        return removed
+
+    def _unlink(self, post_id: str):
+        # Caller holds _lock. Drops a post from every index; its expiry heap
+        # entry is skipped by purge_expired once it comes up.
+        post = self.by_id.pop(post_id, None)
+        if post is None:
+            return
+        key = (post.user_id, post.timestamp)
+        if self.by_author_ts.get(key) is post:
+            del self.by_author_ts[key]
+        entry = self._timeline_keys.pop(post_id, None)
+        if entry is not None:
+            position = bisect.bisect_left(self.timeline, entry)
+            if position < len(self.timeline) and self.timeline[position] == entry:
+                del self.timeline[position]
+
+    def recent(self, limit: int) -> list:
+        """
+        Returns up to limit unexpired posts, newest first. Posts whose token
+        was revoked are skipped.
+        """
+        self.purge_expired()
+        result = []
+        with self._lock:
+            for _, _, post_id in reversed(self.timeline):
+                post = self.by_id.get(post_id)
+                if post is None or post.token in revoked_tokens:
+                    continue
+                result.append(post)
+                if len(result) >= limit:
+                    break
+        return result
 
-    for post in reversed(posts):
-        token = post.get("TOKEN")
-        if token and validate_token(token, "broadcast"):
-            valid_posts.append(post)
+    def get(self, message_id: str):
+        return self.by_id.get(message_id)
 
-        if (len(valid_posts) >= limit):
-            break
+    def find(self, user_id: str, timestamp: int):
+        return self.by_author_ts.get((user_id, int(timestamp)))
+
+
+post_index = PostIndex()
+
+
+def load_posts() -> int:
+    """
+    Reloads the unexpired posts kept by the storage backend.
+
+    Returns:
+        int: Number of posts loaded.
+    """
+    now = int(time.time())
+    backend = get_backend()
+    backend.delete_expired_posts(now)
+    return sum(post_index.add(post, persist=False) for post in backend.load_posts(now))
+
+def save_post(post) -> bool:
+    """
+    Stores a POST message as a Post record. Its token is reduced to the
+    expiry, and only if it is a broadcast token.
+    """
+    _, expiry, scope = parse_token(post.get("TOKEN") or "")
+    return post_index.add(Post.from_message(post, expiry if scope == "broadcast" else None))
+
+def get_recent_posts(limit=20):
+    return post_index.recent(limit)
 
-    return valid_posts
+def get_post(message_id: str):
+    return post_index.get(message_id)
 
 def find_post(poster_user_id: str, post_ts: int):
-    for p in posts:
-        try:
-            if p.get("USER_ID" == poster_user_id and int(p.get("TIMESTAMP", 0)) == int(post_ts)):
-                return p
-        except Exception:
-            pass
-    return None
+    try:
+        return post_index.find(poster_user_id, post_ts)
+    except (TypeError, ValueError):
+        return None
 
 def has_post(poster_user_id: str, post_ts: int):
-    return find_post(poster_user_id, post_ts) is not None
\ No newline at end of file
+    return find_post(poster_user_id, post_ts) is not None
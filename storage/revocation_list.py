@@ -0,0 +1,68 @@
+import heapq
+import threading
+import time
+
+
+class RevocationList:
+    """
+    Revoked tokens with O(1) membership checks and heap-ordered expiry.
+
+    Each token is kept until its own expiry time; purging only pops tokens
+    from the top of the min-heap that have actually expired instead of
+    scanning the whole table.
+    """
+    def __init__(self):
+        self._expiry = {}  # token -> expiry UNIX timestamp
+        self._heap = []    # (expiry, token)
+        self._lock = threading.Lock()
+
+    def add(self, token: str, expiry: int):
+        """
+        Revokes a token until its expiry time.
+
+        Args:
+            token (str): The token string to revoke.
+            expiry (int): UNIX timestamp after which the token is invalid anyway.
+        """
+        with self._lock:
+            if self._expiry.get(token, -1) >= expiry:
+                return
+            self._expiry[token] = expiry
+            heapq.heappush(self._heap, (expiry, token))
+
+    def __contains__(self, token) -> bool:
+        return token in self._expiry
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def next_expiry(self):
+        """
+        Returns the earliest expiry time still held, or None if empty.
+        """
+        with self._lock:
+            # Drop stale entries left behind when a token's expiry was extended
+            while self._heap and self._expiry.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def purge_expired(self, now=None) -> int:
+        """
+        Removes tokens whose expiry time has passed.
+
+        Args:
+            now (int, optional): Current UNIX time; defaults to time.time().
+
+        Returns:
+            int: Number of tokens removed.
+        """
+        now = int(time.time()) if now is None else now
+        removed = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] < now:
+                expiry, token = heapq.heappop(self._heap)
+                # Skip stale heap entries left behind when a token's expiry was extended
+                if self._expiry.get(token) == expiry:
+                    del self._expiry[token]
+                    removed += 1
+        return removed
@@ -0,0 +1,30 @@
+class RingBuffer:
+    """
+    The newest capacity items of an append-only sequence.
+
+    Every appended item gets the next sequence number, which callers use as
+    a cursor. Items older than first_seq have been overwritten.
+    """
+    def __init__(self, capacity: int, start: int = 0):
+        self.capacity = capacity
+        self._items = [None] * capacity
+        self.first_seq = start  # oldest sequence number still held
+        self.next_seq = start   # sequence number of the next append
+
+    def append(self, item) -> int:
+        seq = self.next_seq
+        self._items[seq % self.capacity] = item
+        self.next_seq += 1
+        self.first_seq = max(self.first_seq, self.next_seq - self.capacity)
+        return seq
+
+    def range(self, start: int, end: int) -> list:
+        """
+        Returns the held items with start <= seq < end, oldest first.
+        """
+        start = max(start, self.first_seq)
+        end = min(end, self.next_seq)
+        return [self._items[seq % self.capacity] for seq in range(start, end)]
+
+    def __len__(self) -> int:
+        return self.next_seq - self.first_seq
@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+from storage.partial_file import PartialFile
+
+# FILEID of an offer -> journal of the partial download it will resume
+resumable_offers = {}
+_lock = threading.Lock()
+
+
+def journal_path(path: str) -> str:
+    return path + ".journal"
+
+
+def save_journal(partial: PartialFile, file_id: str, filehash: str, from_user: str):
+    """
+    Records which chunks of a download are on disk, next to its .part file.
+
+    Written to a temp file and renamed, so a crash leaves either the old
+    journal or the new one.
+
+    Args:
+        partial (PartialFile): The download in progress.
+        file_id (str): FILEID of the current offer.
+        filehash (str): FILEHASH (SHA-256 hex) from the offer.
+        from_user (str): Sender's user ID.
+    """
+    partial.flush()
+    journal = {
+        "file_id": file_id,
+        "path": partial.path,
+        "filesize": partial.filesize,
+        "filehash": filehash,
+        "from_user": from_user,
+        "total_chunks": partial.total_chunks,
+        "chunk_size": partial.chunk_size,
+        "received": partial.received.bits.hex(),
+    }
+    target = journal_path(partial.path)
+    with open(target + ".tmp", "w") as f:
+        json.dump(journal, f)
+    os.replace(target + ".tmp", target)
+
+
+def remove_journal(path: str):
+    try:
+        os.remove(journal_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def find_journal(downloads_dir: str, filehash: str, filesize: int):
+    """
+    Looks for an unfinished download of the same content.
+
+    Args:
+        downloads_dir (str): Directory holding .part and .journal files.
+        filehash (str): FILEHASH from the new offer.
+        filesize (int): FILESIZE from the new offer.
+
+    Returns:
+        dict | None: The journal, if its .part file still exists.
+    """
+    if not filehash or not os.path.isdir(downloads_dir):
+        return None
+    for name in os.listdir(downloads_dir):
+        if not name.endswith(".journal"):
+            continue
+        try:
+            with open(os.path.join(downloads_dir, name)) as f:
+                journal = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if (journal.get("filehash") == filehash and journal.get("filesize") == filesize
+                and os.path.exists(journal["path"] + ".part")):
+            return journal
+    return None
+
+
+def open_journal(journal: dict, total_chunks: int):
+    """
+    Reopens the .part file a journal describes.
+
+    Returns:
+        PartialFile | None: None if the chunk layout no longer matches.
+    """
+    received = bytes.fromhex(journal["received"])
+    if journal["total_chunks"] != total_chunks or len(received) != (total_chunks + 7) // 8:
+        return None
+    return PartialFile(journal["path"], journal["filesize"], total_chunks,
+                       received=received, chunk_size=journal["chunk_size"])
+
+
+def offer_resume(file_id: str, journal: dict):
+    with _lock:
+        resumable_offers[file_id] = journal
+
+
+def take_resume(file_id: str):
+    with _lock:
+        return resumable_offers.pop(file_id, None)
+
+
+def get_resume_fields(file_id: str) -> dict:
+    """
+    ACK fields telling the sender which chunks it can skip, if the offer
+    matches an unfinished download.
+
+    Returns:
+        dict: { RESUME, CHUNK_SIZE } or empty.
+    """
+    with _lock:
+        journal = resumable_offers.get(file_id)
+    if journal is None or not journal.get("chunk_size"):
+        return {}
+    return {"RESUME": journal["received"], "CHUNK_SIZE": str(journal["chunk_size"])}
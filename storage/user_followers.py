@@ -1,20 +1,30 @@
+from storage.backend import get_backend
+
 user_followers = set()
 user_following = set()
 
 def add_follower(user_id: str):
-    user_followers.add(user_id)
+    if user_id not in user_followers:
+        user_followers.add(user_id)
+        get_backend().save_follow("follower", user_id)
 
 def remove_follower(user_id: str):
-    user_followers.discard(user_id)
+    if user_id in user_followers:
+        user_followers.discard(user_id)
+        get_backend().delete_follow("follower", user_id)
 
 def is_follower(user_id: str):
     return user_id in user_followers
 
 def add_following(user_id: str):
-    user_following.add(user_id)
+    if user_id not in user_following:
+        user_following.add(user_id)
+        get_backend().save_follow("following", user_id)
 
 def remove_following(user_id: str):
-    user_following.discard(user_id)
+    if user_id in user_following:
+        user_following.discard(user_id)
+        get_backend().delete_follow("following", user_id)
 
 def is_following(user_id: str):
     return user_id in user_following
@@ -23,4 +33,8 @@ def get_followers():
     return list(user_followers)
 
 def get_following():
-    return list(user_following)
\ No newline at end of file
+    return list(user_following)
+
+def load_follows():
+    for kind, user_id in get_backend().load_follows():
+        (user_followers if kind == "follower" else user_following).add(user_id)
\ No newline at end of file
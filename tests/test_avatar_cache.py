@@ -0,0 +1,62 @@
+import base64
+import os
+from storage.avatar_cache import AvatarCache
+from utils.base64_utils import avatar_digest
+
+
+def avatar(size=1000):
+    return base64.b64encode(os.urandom(size)).decode()
+
+
+def test_avatar_is_written_only_when_viewed(tmp_path):
+    cache = AvatarCache(directory=str(tmp_path / "avatars"))
+    data = avatar()
+    cache.remember("a", avatar_digest(data))
+    assert cache.store("image/png", data, avatar_digest(data))
+    assert not (tmp_path / "avatars").exists()
+    path = cache.path_for("a")
+    assert path.endswith(".png")
+    with open(path, "rb") as f:
+        assert f.read() == base64.b64decode(data)
+
+
+def test_mismatched_digest_is_rejected(tmp_path):
+    cache = AvatarCache(directory=str(tmp_path))
+    assert not cache.store("image/png", avatar(), "0" * 64)
+
+
+def test_unviewed_avatars_past_the_memory_budget_go_to_disk(tmp_path):
+    cache = AvatarCache(directory=str(tmp_path), memory_budget=3000)
+    avatars = [avatar() for _ in range(5)]
+    for i, data in enumerate(avatars):
+        cache.remember(f"u{i}", avatar_digest(data))
+        cache.store("image/png", data, avatar_digest(data))
+    assert cache._encoded_bytes <= 3000
+    assert len(os.listdir(tmp_path)) == 3
+    assert all(cache.has(avatar_digest(data)) for data in avatars)
+    assert cache.path_for("u0") is not None  # spilled to disk
+    assert cache.path_for("u4") is not None  # still in memory
+
+
+def test_disk_budget_evicts_least_recently_viewed(tmp_path):
+    cache = AvatarCache(directory=str(tmp_path), budget=2500)
+    for i in range(3):
+        data = avatar()
+        cache.remember(f"u{i}", avatar_digest(data))
+        cache.store("image/png", data, avatar_digest(data))
+        cache.path_for(f"u{i}")
+    assert len(os.listdir(tmp_path)) == 2
+    assert cache.path_for("u0") is None
+
+
+def test_forget_drops_peers_and_avatars_nobody_uses(tmp_path):
+    cache = AvatarCache(directory=str(tmp_path))
+    shared, own = avatar(), avatar()
+    for user_id, data in (("a", shared), ("b", shared), ("c", own)):
+        cache.remember(user_id, avatar_digest(data))
+        cache.store("image/png", data, avatar_digest(data))
+    cache.forget(["a", "c"])
+    assert "a" not in cache.by_user and "c" not in cache.by_user
+    assert cache.has(avatar_digest(shared))
+    assert not cache.has(avatar_digest(own))
+    assert cache._encoded_bytes == len(shared)
@@ -0,0 +1,57 @@
+import os
+from core.chunk_frame import CHUNK_FRAME_HEADER_SIZE, can_frame, is_chunk_frame, pack_chunk, unpack_chunk
+from core.dispatcher import parse_datagram
+
+FILE_ID = "0123456789abcdef" * 2
+
+
+def test_round_trip_keeps_every_header_field():
+    data = os.urandom(1024)
+    frame = pack_chunk(FILE_ID, 7, 42, data)
+    assert len(frame) == CHUNK_FRAME_HEADER_SIZE + len(data)
+
+    msg = unpack_chunk(frame)
+    assert msg["TYPE"] == "FILE_CHUNK"
+    assert msg["FILEID"] == FILE_ID
+    assert (msg["CHUNK_INDEX"], msg["TOTAL_CHUNKS"], msg["CHUNK_SIZE"]) == ("7", "42", "1024")
+    assert bytes(msg["PAYLOAD"]) == data
+    assert "SACK_NOW" not in msg
+
+
+def test_sack_now_flag():
+    assert unpack_chunk(pack_chunk(FILE_ID, 0, 1, b"x", sack_now=True))["SACK_NOW"] == "1"
+
+
+def test_truncated_frames_are_rejected():
+    frame = pack_chunk(FILE_ID, 0, 1, b"payload")
+    assert unpack_chunk(frame[:CHUNK_FRAME_HEADER_SIZE - 1]) is None
+    assert unpack_chunk(frame[:-1]) is None
+    # Trailing bytes beyond CHUNK_SIZE are ignored
+    assert bytes(unpack_chunk(frame + b"junk")["PAYLOAD"]) == b"payload"
+
+
+def test_bad_magic_or_version_is_rejected():
+    frame = bytearray(pack_chunk(FILE_ID, 0, 1, b"payload"))
+    frame[3] = 99
+    assert unpack_chunk(bytes(frame)) is None
+    assert unpack_chunk(b"\xffLX" + bytes(frame[3:])) is None
+
+
+def test_only_32_hex_digit_file_ids_can_be_framed():
+    assert can_frame(FILE_ID)
+    assert not can_frame(FILE_ID[:-1])
+    assert not can_frame("g" * 32)
+
+
+def test_parse_datagram_tells_frames_from_text():
+    frame = pack_chunk(FILE_ID, 3, 4, b"payload")
+    assert is_chunk_frame(frame)
+    assert bytes(parse_datagram(frame)["PAYLOAD"]) == b"payload"
+
+    text = b"TYPE: FILE_CHUNK\nFILEID: " + FILE_ID.encode() + b"\nDATA: cGF5bG9hZA==\n\n"
+    assert not is_chunk_frame(text)
+    msg = parse_datagram(text)
+    assert msg["DATA"] == "cGF5bG9hZA==" and "PAYLOAD" not in msg
+
+    # A broken frame is dropped rather than parsed as text
+    assert parse_datagram(frame[:10]) is None
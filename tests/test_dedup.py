@@ -0,0 +1,41 @@
+import config
+from storage.dedup import BloomDedup, GenerationalDedup, content_key, dedup_window
+
+
+def test_generational_dedup_remembers_for_the_window():
+    clock = [0.0]
+    seen = GenerationalDedup(window=30, generations=4, clock=lambda: clock[0])
+    assert seen.add("a")
+    assert not seen.add("a")
+    clock[0] = 30.0
+    assert "a" in seen
+    clock[0] = 45.0
+    assert "a" not in seen
+    assert seen.add("a")
+
+
+def test_bloom_dedup_remembers_for_the_window():
+    clock = [0.0]
+    seen = BloomDedup(window=30, capacity=1000, fp_rate=1e-6, clock=lambda: clock[0])
+    assert seen.add("a")
+    assert not seen.add("a")
+    clock[0] = 30.0
+    assert "a" in seen  # moved to the previous filter
+    clock[0] = 61.0
+    assert "a" not in seen
+
+
+def test_window_follows_the_longest_token_ttl(monkeypatch):
+    monkeypatch.setattr(config, "token_ttl_post", config.DEDUP_WINDOW * 3)
+    assert dedup_window() == config.DEDUP_WINDOW * 3
+
+    clock = [0.0]
+    seen = GenerationalDedup(window=dedup_window, generations=4, clock=lambda: clock[0])
+    seen.add("a")
+    clock[0] = config.DEDUP_WINDOW * 2.0  # past DEDUP_WINDOW, within the post TTL
+    assert "a" in seen
+
+
+def test_content_key_depends_on_every_field():
+    assert content_key("g", "a", 1, "hi") == content_key("g", "a", 1, "hi")
+    assert content_key("g", "a", 1, "hi") != content_key("g", "a", 2, "hi")
@@ -0,0 +1,68 @@
+import threading
+import time
+import pytest
+from core.dispatch_pool import BLOCK, DROP_NEWEST, DROP_OLDEST, DispatchPool
+
+ADDR = ("10.0.0.2", 50999)
+
+
+def queued(pool):
+    return [item[0] for item in list(pool.queues[0].queue)]
+
+
+def test_drop_newest_keeps_what_is_queued():
+    pool = DispatchPool(lambda data, addr: None, workers=1, capacity=2, policy=DROP_NEWEST)
+    assert pool.submit(b"1", ADDR) and pool.submit(b"2", ADDR)
+    assert not pool.submit(b"3", ADDR)
+    assert queued(pool) == [b"1", b"2"]
+    stats = pool.get_stats()
+    assert (stats["received"], stats["dropped_newest"], stats["queued"]) == (3, 1, 2)
+
+
+def test_drop_oldest_makes_room_for_the_new_datagram():
+    pool = DispatchPool(lambda data, addr: None, workers=1, capacity=2, policy=DROP_OLDEST)
+    for data in (b"1", b"2", b"3", b"4"):
+        assert pool.submit(data, ADDR)
+    assert queued(pool) == [b"3", b"4"]
+    stats = pool.get_stats()
+    assert (stats["received"], stats["dropped_oldest"], stats["queued"]) == (4, 2, 2)
+
+
+def test_block_waits_for_room():
+    pool = DispatchPool(lambda data, addr: None, workers=1, capacity=1, policy=BLOCK)
+    pool.submit(b"1", ADDR)
+    blocked = threading.Thread(target=pool.submit, args=(b"2", ADDR))
+    blocked.start()
+    time.sleep(0.05)
+    assert blocked.is_alive()
+
+    pool.queues[0].get_nowait()
+    blocked.join(2.0)
+    assert not blocked.is_alive()
+    assert queued(pool) == [b"2"]
+    assert pool.get_stats()["blocked"] == 1
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        DispatchPool(lambda data, addr: None, policy="drop-everything")
+
+
+def test_one_sender_is_handled_in_order_and_errors_are_counted():
+    handled = []
+
+    def handler(data, addr):
+        if data == b"bad":
+            raise ValueError("bad datagram")
+        handled.append(data)
+
+    pool = DispatchPool(handler, workers=4, capacity=400, policy=DROP_NEWEST)
+    pool.start()
+    messages = [str(i).encode() for i in range(50)]
+    for data in messages[:25] + [b"bad"] + messages[25:]:
+        pool.submit(data, ADDR)
+    pool.stop()
+
+    assert handled == messages
+    stats = pool.get_stats()
+    assert (stats["dispatched"], stats["errors"], stats["queued"]) == (50, 1, 0)
@@ -0,0 +1,62 @@
+import importlib
+import pytest
+import storage.dm_store
+from storage.backend import open_backend
+
+
+@pytest.fixture
+def dm_store():
+    open_backend("memory")
+    yield importlib.reload(storage.dm_store)
+    open_backend("memory")
+
+
+def dm(message_id, from_user, to_user, timestamp):
+    return {"MESSAGE_ID": message_id, "FROM": from_user, "TO": to_user, "TIMESTAMP": timestamp, "CONTENT": message_id}
+
+
+def contents(dms):
+    return [d.content for d in dms]
+
+
+def test_thread_is_shared_by_both_directions_in_timestamp_order(dm_store):
+    dm_store.save_dm(dm("m2", "a", "b", 200))
+    dm_store.save_dm(dm("m3", "b", "a", 300))
+    dm_store.save_dm(dm("m1", "b", "a", 100))  # arrives late
+    dm_store.save_dm(dm("x1", "a", "c", 150))
+    assert contents(dm_store.get_thread("a", "b")) == ["m1", "m2", "m3"]
+    assert contents(dm_store.get_thread("b", "a", limit=2)) == ["m2", "m3"]
+    assert contents(dm_store.get_recent_dms(limit=3)) == ["m3", "m2", "x1"]
+
+
+def test_equal_timestamps_keep_arrival_order(dm_store):
+    for message_id in ("m1", "m2", "m3"):
+        dm_store.save_dm(dm(message_id, "a", "b", 100))
+    assert contents(dm_store.get_thread("a", "b")) == ["m1", "m2", "m3"]
+
+
+def test_duplicates_and_messages_without_id_are_dropped(dm_store):
+    assert dm_store.save_dm(dm("m1", "a", "b", 100))
+    assert not dm_store.save_dm(dm("m1", "a", "b", 100))
+    assert not dm_store.save_dm(dm(None, "a", "b", 100))
+    assert len(dm_store.get_thread("a", "b")) == 1
+
+
+def test_history_is_read_back_once_then_served_from_memory(dm_store, tmp_path):
+    path = str(tmp_path / "dms.db")
+    open_backend("sqlite", path)
+    for i in range(3):
+        dm_store.save_dm(dm(f"m{i}", "a", "b", 100 + i))
+
+    # Restart: fresh stores over the same database
+    backend = open_backend("sqlite", path)
+    dm_store = importlib.reload(dm_store)
+    dm_store.save_dm(dm("m3", "a", "b", 103))
+
+    queries = []
+    query = backend._query
+    backend._query = lambda *args: queries.append(args) or query(*args)
+    assert contents(dm_store.get_thread("b", "a")) == ["m0", "m1", "m2", "m3"]
+    assert contents(dm_store.get_thread("a", "b")) == ["m0", "m1", "m2", "m3"]
+    assert contents(dm_store.get_thread("a", "b", limit=2)) == ["m2", "m3"]
+    assert len(queries) == 1
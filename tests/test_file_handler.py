@@ -0,0 +1,162 @@
+import base64
+import hashlib
+import os
+import threading
+import handlers.file_handler as file_handler
+from core.chunk_frame import pack_chunk, unpack_chunk
+from models.peer import Profile
+
+SENDER = "alice@10.0.0.2"
+ADDR = ("10.0.0.2", 50999)
+LOCAL = Profile("bob@10.0.0.3", "10.0.0.3")
+
+
+class Listener:
+    def __init__(self):
+        self.sent = []
+
+    def send_unicast(self, message, ip):
+        self.sent.append(message)
+
+
+def offer(file_id, data, filehash=None):
+    return {
+        "TYPE": "FILE_OFFER", "FROM": SENDER, "TO": LOCAL.user_id, "FILEID": file_id,
+        "FILENAME": f"{file_id}.bin", "FILESIZE": str(len(data)), "TRANSFER_MODE": "WINDOW",
+        "FILEHASH": filehash or hashlib.sha256(data).hexdigest(),
+    }
+
+
+def chunks(file_id, data, size=1024):
+    total = (len(data) + size - 1) // size
+    return [
+        {"TYPE": "FILE_CHUNK", "FROM": SENDER, "TO": LOCAL.user_id, "FILEID": file_id,
+         "CHUNK_INDEX": str(i), "TOTAL_CHUNKS": str(total), "CHUNK_SIZE": str(size),
+         "DATA": base64.b64encode(data[i * size:(i + 1) * size]).decode()}
+        for i in range(total)
+    ]
+
+
+def run_concurrently(messages, listener):
+    threads = [threading.Thread(target=file_handler.handle_file, args=(msg, ADDR, listener, LOCAL)) for msg in messages]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_offers_and_chunks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = os.urandom(64 * 1024)
+    listener = Listener()
+
+    # Retransmitted offers handled at once are queued for the user only once
+    queued = file_handler.pending_file_offers.qsize()
+    run_concurrently([offer("f-concurrent", data) for _ in range(8)], listener)
+    assert file_handler.pending_file_offers.qsize() == queued + 1
+    file_handler.accepted_offers.add("f-concurrent")
+
+    # First chunks handled at once open a single .part file and lose nothing
+    run_concurrently(chunks("f-concurrent", data), listener)
+    entry = file_handler.file_buffer["f-concurrent"]
+    assert entry["complete"]
+    assert entry["next_missing"] == entry["total_chunks"] == 64
+    with open(tmp_path / "downloads" / "received_f-concurrent.bin", "rb") as f:
+        assert f.read() == data
+
+
+def test_filehash_mismatch_is_reported_and_forgotten(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = os.urandom(4 * 1024)
+    listener = Listener()
+    file_handler.handle_file(offer("f-corrupt", data, filehash=hashlib.sha256(b"other").hexdigest()), ADDR, listener, LOCAL)
+    file_handler.accepted_offers.add("f-corrupt")
+    for chunk in chunks("f-corrupt", data):
+        file_handler.handle_file(chunk, ADDR, listener, LOCAL)
+
+    assert "f-corrupt" not in file_handler.file_buffer
+    assert "f-corrupt" not in file_handler.accepted_offers
+    received = [m for m in listener.sent if m.startswith("TYPE: FILE_RECEIVED")]
+    assert len(received) == 1 and "STATUS: FAILED" in received[0]
+    # No SACK claims the last chunks arrived
+    assert not any(m.startswith("TYPE: FILE_SACK") and "CUMULATIVE: 4" in m for m in listener.sent)
+    assert os.listdir(tmp_path / "downloads") == []
+
+
+def test_chunks_before_accept_or_after_decline_are_dropped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = os.urandom(2 * 1024)
+    listener = Listener()
+    file_handler.handle_file(offer("f-declined", data), ADDR, listener, LOCAL)
+    file_handler.handle_file(chunks("f-declined", data)[0], ADDR, listener, LOCAL)
+    assert file_handler.file_buffer["f-declined"]["file"] is None
+    assert not (tmp_path / "downloads").exists()
+
+    file_handler.discard_offer("f-declined")
+    assert "f-declined" not in file_handler.file_buffer
+    for chunk in chunks("f-declined", data):
+        file_handler.handle_file(chunk, ADDR, listener, LOCAL)
+    assert not (tmp_path / "downloads").exists()
+    assert listener.sent == []
+
+
+def test_binary_frames_need_an_accepted_offer_from_the_same_ip(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    file_id = "ab" * 16
+    data = os.urandom(1024)
+    listener = Listener()
+    file_handler.handle_file(offer(file_id, data), ADDR, listener, LOCAL)
+    frame = unpack_chunk(pack_chunk(file_id, 0, 1, data))
+
+    file_handler.handle_file(frame, ADDR, listener, LOCAL)
+    assert file_handler.file_buffer[file_id]["file"] is None
+
+    file_handler.accepted_offers.add(file_id)
+    file_handler.handle_file(frame, ("10.0.0.9", 50999), listener, LOCAL)
+    assert file_handler.file_buffer[file_id]["file"] is None
+
+    file_handler.handle_file(frame, ADDR, listener, LOCAL)
+    assert file_handler.file_buffer[file_id]["complete"]
+    with open(tmp_path / "downloads" / f"received_{file_id}.bin", "rb") as f:
+        assert f.read() == data
+
+
+def group_offer(file_id, data):
+    return dict(offer(file_id, data), TYPE="GROUP_FILE_OFFER", GROUP_ID="g", MESSAGE_ID=f"{file_id}-bob")
+
+
+def test_group_offers_are_queued_unless_auto_accept_is_on(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(file_handler, "group_offer_allowed", lambda msg, local_profile: True)
+    data = os.urandom(1024)
+    listener = Listener()
+
+    queued = file_handler.pending_file_offers.qsize()
+    file_handler.handle_file(group_offer("g-asked", data), ADDR, listener, LOCAL)
+    assert file_handler.pending_file_offers.qsize() == queued + 1
+    assert "g-asked" not in file_handler.accepted_offers
+    assert listener.sent == []
+
+    monkeypatch.setattr(file_handler, "GROUP_FILE_AUTO_ACCEPT", True)
+    file_handler.handle_file(group_offer("g-auto", data), ADDR, listener, LOCAL)
+    assert file_handler.pending_file_offers.qsize() == queued + 1
+    assert "g-auto" in file_handler.accepted_offers
+    assert listener.sent[0].startswith("TYPE: ACK\nMESSAGE_ID: g-auto-bob\nSTATUS: ACCEPTED")
+
+
+def test_declined_offers_are_not_asked_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(file_handler, "group_offer_allowed", lambda msg, local_profile: True)
+    data = os.urandom(1024)
+    listener = Listener()
+    for msg in (offer("f-no", data), group_offer("g-no", data)):
+        file_handler.handle_file(msg, ADDR, listener, LOCAL)
+        file_handler.discard_offer(msg["FILEID"])
+
+    queued = file_handler.pending_file_offers.qsize()
+    file_handler.handle_file(offer("f-no", data), ADDR, listener, LOCAL)
+    file_handler.handle_file(group_offer("g-no", data), ADDR, listener, LOCAL)
+    assert file_handler.pending_file_offers.qsize() == queued
+    # A retransmitted group offer means our DECLINED ACK was lost; answer it again
+    assert len(listener.sent) == 1
+    assert listener.sent[0].startswith("TYPE: ACK\nMESSAGE_ID: g-no-bob\nSTATUS: DECLINED")
@@ -0,0 +1,53 @@
+from core.ack_registry import pending_acks, resolve_ack
+from core.reliable_delivery import reliable_sender
+from handlers.revoke_handler import handle_revoke
+from models.file_transfer import FileTransfer, offered_transfers, outgoing_transfers
+from models.peer import Profile
+
+
+def test_dedup_accept_finishes_the_transfer(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"x" * 4096)
+    transfer = FileTransfer(Profile("a@10.0.0.1", "10.0.0.1"), Profile("b@10.0.0.2", "10.0.0.2"), str(path), "", listener=None)
+    outgoing_transfers[transfer.file_id] = transfer
+
+    transfer.file_transmit({"TYPE": "ACK", "STATUS": "ACCEPTED", "DEDUP": "1"})
+    assert transfer.state == "delivered"
+    assert transfer.file_id not in outgoing_transfers
+    assert transfer.file is None  # nothing was opened or scheduled
+
+
+class Listener:
+    def __init__(self):
+        self.sent = []
+
+    def send_unicast(self, message, ip):
+        self.sent.append(message)
+
+
+def offered(tmp_path, to_ip):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"x" * 4096)
+    transfer = FileTransfer(Profile("a@10.0.0.1", "10.0.0.1"), Profile(f"b@{to_ip}", to_ip), str(path), "", Listener())
+    transfer.file_offer()
+    assert transfer.file_id in reliable_sender.pending
+    return transfer
+
+
+def test_declined_offer_is_no_longer_retransmitted(tmp_path):
+    transfer = offered(tmp_path, "10.0.0.20")
+    handle_revoke({"TYPE": "REVOKE", "TOKEN": transfer.offer_token}, ("10.0.0.99", 50999))
+    assert transfer.file_id in reliable_sender.pending  # only the receiver may decline
+
+    handle_revoke({"TYPE": "REVOKE", "TOKEN": transfer.offer_token}, ("10.0.0.20", 50999))
+    assert transfer.state == "declined"
+    assert transfer.file_id not in reliable_sender.pending
+    assert transfer.file_id not in pending_acks
+
+
+def test_accepting_an_offer_is_not_an_rtt_sample(tmp_path):
+    transfer = offered(tmp_path, "10.0.0.21")
+    assert resolve_ack(transfer.file_id, {"TYPE": "ACK", "STATUS": "ACCEPTED", "DEDUP": "1"})
+    assert transfer.state == "delivered"
+    assert reliable_sender.get_estimator("10.0.0.21").srtt is None
+    assert transfer.offer_token not in offered_transfers
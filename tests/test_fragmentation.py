@@ -0,0 +1,92 @@
+import os
+from types import SimpleNamespace
+import core.fragmentation as fragmentation
+from core.fragmentation import Reassembler, build_fragment_header, fragment_message, parse_fragment
+
+ADDR = ("10.0.0.2", 50999)
+
+
+def test_small_message_is_not_fragmented():
+    assert fragment_message(b"TYPE: PING\n\n", mtu=200) == [b"TYPE: PING\n\n"]
+    assert Reassembler().feed(b"TYPE: PING\n\n", ADDR) == b"TYPE: PING\n\n"
+
+
+def test_fragments_fit_the_mtu_and_reassemble_out_of_order():
+    data = os.urandom(2000)
+    fragments = fragment_message(data, mtu=200)
+    assert len(fragments) > 1 and all(len(f) <= 200 for f in fragments)
+
+    reassembler = Reassembler()
+    results = [reassembler.feed(bytes(f), ADDR) for f in reversed(fragments)]
+    assert results[:-1] == [None] * (len(fragments) - 1)
+    assert results[-1] == data
+    assert reassembler.partial == {} and reassembler.buffered == 0
+
+
+def test_duplicate_fragments_are_ignored():
+    data = os.urandom(500)
+    first, *rest = fragment_message(data, mtu=200)
+    reassembler = Reassembler()
+    assert reassembler.feed(bytes(first), ADDR) is None
+    buffered = reassembler.buffered
+    assert reassembler.feed(bytes(first), ADDR) is None
+    assert reassembler.buffered == buffered
+    assert [reassembler.feed(bytes(f), ADDR) for f in rest][-1] == data
+
+
+def test_same_frag_id_from_two_senders_is_kept_apart():
+    reassembler = Reassembler()
+    a = build_fragment_header("00" * 8, 0, 2) + b"a0"
+    b = build_fragment_header("00" * 8, 1, 2) + b"b1"
+    assert reassembler.feed(a, ("10.0.0.2", 50999)) is None
+    assert reassembler.feed(b, ("10.0.0.3", 50999)) is None
+    assert len(reassembler.partial) == 2
+
+
+def test_incomplete_messages_expire(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(fragmentation, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    reassembler = Reassembler(timeout=5)
+    first, second = fragment_message(os.urandom(201), mtu=200)
+    reassembler.feed(bytes(first), ADDR)
+
+    clock[0] = 6.0
+    assert reassembler.feed(build_fragment_header("11" * 8, 0, 2) + b"x", ADDR) is None
+    assert reassembler.expired == 1
+    assert reassembler.feed(bytes(second), ADDR) is None  # its first half is gone
+    assert reassembler.buffered == 1 + len(parse_fragment(bytes(second))[3])
+
+
+def test_byte_cap_evicts_the_oldest_partial_message():
+    reassembler = Reassembler(max_bytes=150)  # room for one 104-byte fragment
+    old = fragment_message(os.urandom(300), mtu=200)
+    new = fragment_message(os.urandom(300), mtu=200)
+    reassembler.feed(bytes(old[0]), ADDR)
+    reassembler.feed(bytes(new[0]), ADDR)
+    assert reassembler.evicted == 1
+    assert len(reassembler.partial) == 1
+    assert reassembler.buffered <= 150
+
+    too_big = build_fragment_header("22" * 8, 0, 2) + os.urandom(151)
+    assert reassembler.feed(too_big, ADDR) is None
+    assert ("10.0.0.2", "22" * 8) not in reassembler.partial
+
+
+def test_bogus_headers_are_dropped():
+    reassembler = Reassembler()
+    bogus = [
+        b"TYPE: FRAGMENT\nFRAG_ID: abc\nFRAG_INDEX: 0\nFRAG_TOTAL: 2\npayload without a blank line",
+        b"TYPE: FRAGMENT\nFRAG_ID: abc\nFRAG_INDEX: 2\nFRAG_TOTAL: 2\n\nx",
+        b"TYPE: FRAGMENT\nFRAG_ID: abc\nFRAG_INDEX: -1\nFRAG_TOTAL: 2\n\nx",
+        b"TYPE: FRAGMENT\nFRAG_ID: abc\nFRAG_INDEX: 0\nFRAG_TOTAL: 0\n\nx",
+        b"TYPE: FRAGMENT\nFRAG_ID: abc\nFRAG_INDEX: one\nFRAG_TOTAL: 2\n\nx",
+        b"TYPE: FRAGMENT\nFRAG_INDEX: 0\nFRAG_TOTAL: 2\n\nx",
+        b"TYPE: FRAGMENT\nFRAG_ID: \xff\xfe\nFRAG_INDEX: 0\nFRAG_TOTAL: 2\n\nx",
+    ]
+    assert all(reassembler.feed(data, ADDR) is None for data in bogus)
+    assert reassembler.partial == {}
+
+    # A fragment that disagrees on FRAG_TOTAL with the rest of its message is ignored
+    reassembler.feed(build_fragment_header("33" * 8, 0, 2) + b"a", ADDR)
+    assert reassembler.feed(build_fragment_header("33" * 8, 1, 3) + b"b", ADDR) is None
+    assert reassembler.feed(build_fragment_header("33" * 8, 1, 2) + b"b", ADDR) == b"ab"
@@ -0,0 +1,141 @@
+import models.file_transfer as file_transfer
+from config import FILE_MAX_TIMEOUTS
+from core.chunk_frame import unpack_chunk
+from models.file_transfer import GroupFileTransfer
+from models.peer import Profile
+from models.send_window import encode_sack_bitmap
+
+MEMBERS = [Profile(f"{name}@10.0.0.{i}", f"10.0.0.{i}") for i, name in ((2, "a"), (3, "b"), (4, "c"))]
+
+
+class Listener:
+    def __init__(self):
+        self.sent = []  # (chunk index or message TYPE, ip or "broadcast")
+
+    def send_broadcast(self, data):
+        self.sent.append((int(unpack_chunk(data)["CHUNK_INDEX"]), "broadcast"))
+
+    def send_unicast(self, data, ip):
+        if isinstance(data, bytes):
+            self.sent.append((int(unpack_chunk(data)["CHUNK_INDEX"]), ip))
+        else:
+            self.sent.append((data.split("\n", 1)[0][len("TYPE: "):], ip))
+
+
+class Scheduler:
+    def add(self, transfer):
+        pass
+
+    def wake(self):
+        pass
+
+
+def sending(tmp_path, monkeypatch, chunks=4):
+    monkeypatch.setattr(file_transfer, "transfer_scheduler", Scheduler())
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"x" * 1024 * chunks)
+    listener = Listener()
+    transfer = GroupFileTransfer(Profile("me@10.0.0.1", "10.0.0.1"), "g", MEMBERS, str(path), "", listener,
+                                 poll_interval=1.0, rate=10 ** 12)
+    transfer.total_chunks = chunks
+    for member in MEMBERS:
+        transfer.offer_answered(member.user_id, {"TYPE": "ACK", "STATUS": "ACCEPTED"})
+    return transfer, listener
+
+
+def run(transfer, now):
+    # Sends what the transfer has ready over the next half second, as the TransferScheduler would
+    until = now + 0.5
+    while now <= until and not transfer.finished:
+        chunk = transfer.next_chunk(now)
+        if chunk is None:
+            now += max(transfer.wait_time(now), 1e-6)
+        else:
+            transfer.transmit_chunk(*chunk)
+
+
+def nak(transfer, user_id, received):
+    cumulative = received.index(False)
+    transfer.on_nak(user_id, {
+        "CUMULATIVE": str(cumulative),
+        "BITMAP": encode_sack_bitmap(received, cumulative, len(received), len(received) - cumulative),
+    })
+
+
+def test_chunks_are_broadcast_once_then_members_are_polled(tmp_path, monkeypatch):
+    transfer, listener = sending(tmp_path, monkeypatch)
+    run(transfer, now=0.0)
+    assert listener.sent == [(i, "broadcast") for i in range(4)] + [("GROUP_FILE_END", m.ip) for m in MEMBERS]
+    transfer.file.close()
+
+
+def test_repair_is_unicast_to_one_member_and_rebroadcast_for_several(tmp_path, monkeypatch):
+    transfer, listener = sending(tmp_path, monkeypatch)
+    run(transfer, now=0.0)
+    listener.sent.clear()
+
+    nak(transfer, "a@10.0.0.2", [True, False, True, True])   # only a misses chunk 1
+    nak(transfer, "b@10.0.0.3", [True, True, False, True])   # b and c miss chunk 2
+    nak(transfer, "c@10.0.0.4", [True, True, False, True])
+    run(transfer, now=0.1)
+    assert listener.sent[:2] == [(1, "10.0.0.2"), (2, "broadcast")]
+    # The members are polled again straight after the repairs
+    assert listener.sent[2:] == [("GROUP_FILE_END", m.ip) for m in MEMBERS]
+
+    for member in MEMBERS:
+        transfer.on_received(member.user_id)
+    assert transfer.finished
+    transfer.finish()
+    assert transfer.state == "delivered"
+
+
+def test_repair_skips_members_that_already_finished(tmp_path, monkeypatch):
+    transfer, listener = sending(tmp_path, monkeypatch)
+    run(transfer, now=0.0)
+    listener.sent.clear()
+
+    nak(transfer, "a@10.0.0.2", [True, False, True, True])
+    nak(transfer, "b@10.0.0.3", [True, False, True, True])
+    transfer.on_received("b@10.0.0.3")  # b got chunk 1 after all
+    run(transfer, now=0.1)
+    assert listener.sent[0] == (1, "10.0.0.2")
+    transfer.file.close()
+
+
+def test_silent_members_are_given_up_after_max_timeouts(tmp_path, monkeypatch):
+    transfer, listener = sending(tmp_path, monkeypatch)
+    transfer.on_received("a@10.0.0.2")
+    transfer.on_received("b@10.0.0.3")
+    for poll in range(FILE_MAX_TIMEOUTS + 1):
+        run(transfer, now=float(poll))
+    polls = [ip for msg_type, ip in listener.sent if msg_type == "GROUP_FILE_END"]
+    assert polls == ["10.0.0.4"] * FILE_MAX_TIMEOUTS
+    assert transfer.finished
+    transfer.finish()
+    assert transfer.state == "failed"
+    assert transfer.incomplete == {"c@10.0.0.4"}
+
+
+def test_an_answer_resets_the_poll_count(tmp_path, monkeypatch):
+    transfer, listener = sending(tmp_path, monkeypatch)
+    for poll in range(FILE_MAX_TIMEOUTS - 1):
+        run(transfer, now=float(poll))
+    nak(transfer, "a@10.0.0.2", [True, False, True, True])
+    for poll in range(FILE_MAX_TIMEOUTS - 1, 2 * FILE_MAX_TIMEOUTS - 1):
+        run(transfer, now=float(poll))
+    assert not transfer.finished
+    transfer.file.close()
+
+
+def test_members_that_decline_are_left_out(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_transfer, "transfer_scheduler", Scheduler())
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"x" * 1024)
+    transfer = GroupFileTransfer(Profile("me@10.0.0.1", "10.0.0.1"), "g", MEMBERS, str(path), "", Listener())
+    transfer.total_chunks = 1
+    transfer.offer_answered("a@10.0.0.2", {"TYPE": "ACK", "STATUS": "DECLINED"})
+    transfer.offer_answered("b@10.0.0.3", {"TYPE": "ACK", "STATUS": "ACCEPTED"})
+    transfer.offer_answered("c@10.0.0.4", None)  # never answered
+    assert transfer.incomplete == {"b@10.0.0.3"}
+    assert transfer.state == "sending"
+    transfer.file.close()
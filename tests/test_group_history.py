@@ -0,0 +1,74 @@
+import importlib
+import pytest
+import storage.group_directory
+from storage.backend import open_backend
+from storage.ring_buffer import RingBuffer
+
+
+def test_ring_buffer_keeps_the_newest_items():
+    ring = RingBuffer(3)
+    seqs = [ring.append(item) for item in "abcde"]
+    assert seqs == [0, 1, 2, 3, 4]
+    assert (ring.first_seq, ring.next_seq, len(ring)) == (2, 5, 3)
+    assert ring.range(0, 10) == ["c", "d", "e"]
+    assert ring.range(3, 4) == ["d"]
+
+
+def test_ring_buffer_wraps_around_from_a_start_seq():
+    ring = RingBuffer(4, start=10)
+    for item in range(10):
+        ring.append(item)
+    assert ring.first_seq == 16
+    assert ring.range(16, 20) == [6, 7, 8, 9]
+    assert ring.range(0, 16) == []
+
+
+@pytest.fixture
+def groups(monkeypatch):
+    open_backend("memory")
+    module = importlib.reload(storage.group_directory)
+    monkeypatch.setattr(module, "GROUP_HISTORY_SIZE", 5)
+    yield module
+    open_backend("memory")
+
+
+def contents(messages):
+    return [message.content for message in messages]
+
+
+def test_paging_by_cursor(groups):
+    for i in range(5):
+        groups.store_group_message("g", "a", f"m{i}", 100 + i, f"id{i}")
+    newest = groups.get_group_messages("g", limit=2)
+    assert contents(newest) == ["m3", "m4"]
+    older = groups.get_group_messages("g", before=newest[0].seq, limit=2)
+    assert contents(older) == ["m1", "m2"]
+    assert contents(groups.get_group_messages("g", before=older[0].seq, limit=2)) == ["m0"]
+    assert contents(groups.get_group_messages("g", after=older[-1].seq, limit=2)) == ["m3", "m4"]
+
+
+def test_memory_backend_pages_only_what_the_ring_holds(groups):
+    for i in range(8):
+        groups.store_group_message("g", "a", f"m{i}", 100 + i, f"id{i}")
+    assert contents(groups.get_group_messages("g", limit=10)) == ["m3", "m4", "m5", "m6", "m7"]
+    # A cursor that has already left the ring resumes at its oldest message
+    assert contents(groups.get_group_messages("g", after=0, limit=2)) == ["m3", "m4"]
+
+
+def test_sqlite_backend_pages_past_the_ring(groups, tmp_path):
+    open_backend("sqlite", str(tmp_path / "groups.db"))
+    for i in range(8):
+        groups.store_group_message("g", "a", f"m{i}", 100 + i, f"id{i}")
+    assert contents(groups.get_group_messages("g", before=5, limit=4)) == ["m1", "m2", "m3", "m4"]
+
+
+def test_seqs_continue_after_restart_for_groups_not_reloaded(groups, tmp_path):
+    path = str(tmp_path / "groups.db")
+    open_backend("sqlite", path)
+    for i in range(3):
+        groups.store_group_message("g", "a", f"m{i}", 100 + i, f"id{i}")
+
+    open_backend("sqlite", path)
+    groups.group_messages.clear()  # restart without load_groups; "g" is not in group_table
+    groups.store_group_message("g", "a", "m3", 103, "id3")
+    assert [(m.seq, m.content) for m in groups.get_group_messages("g")] == [(0, "m0"), (1, "m1"), (2, "m2"), (3, "m3")]
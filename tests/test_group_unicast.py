@@ -0,0 +1,35 @@
+import senders.group_unicast as group_unicast
+from core.dispatcher import parse_message
+from models.peer import Profile
+from senders.profile_broadcast import build_profile_message
+
+
+class Listener:
+    def __init__(self):
+        self.sent = []
+
+    def send_unicast(self, message, ip):
+        self.sent.append(ip)
+
+
+def test_profile_advertises_group_ack():
+    msg = parse_message(build_profile_message(Profile("a@10.0.0.1", "10.0.0.1")))
+    assert Profile.from_message(msg, ("10.0.0.1", 50999)).group_ack
+    assert not Profile.from_message({"USER_ID": "old@10.0.0.2"}, ("10.0.0.2", 50999)).group_ack
+
+
+def test_only_peers_that_ack_get_reliable_delivery(monkeypatch):
+    peers = {
+        "new@10.0.0.2": Profile("new@10.0.0.2", "10.0.0.2", group_ack=True),
+        "old@10.0.0.3": Profile("old@10.0.0.3", "10.0.0.3"),
+    }
+    reliable = []
+    monkeypatch.setattr(group_unicast, "get_peer", peers.get)
+    monkeypatch.setattr(group_unicast, "get_group_members", lambda group_id: ["me@10.0.0.1", *peers])
+    monkeypatch.setattr(group_unicast, "store_group_message", lambda *args: True)
+    monkeypatch.setattr(group_unicast, "send_reliable", lambda listener, message, ip, message_id, **kwargs: reliable.append(ip))
+
+    listener = Listener()
+    assert group_unicast.send_group_message(Profile("me@10.0.0.1", "10.0.0.1"), "g", "hi", listener)
+    assert reliable == ["10.0.0.2"]
+    assert listener.sent == ["10.0.0.3"]
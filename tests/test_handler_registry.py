@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+from core.handler_registry import HandlerRegistry
+from handlers.ping_handler import handle_ping
+
+
+def routed(registry, context=None):
+    return registry.bind(context or SimpleNamespace())
+
+
+def test_extra_args_are_bound_from_the_dispatcher():
+    registry = HandlerRegistry()
+    calls = []
+    registry.register(("A", "B"), lambda msg, addr, listener: calls.append((msg["TYPE"], listener)),
+                      extra_args=("listener",))
+    routes = routed(registry, SimpleNamespace(listener="udp"))
+    assert registry.dispatch(routes, {"TYPE": "A"}, ("10.0.0.1", 50999))
+    assert registry.dispatch(routes, {"TYPE": "B"}, ("10.0.0.1", 50999))
+    assert calls == [("A", "udp"), ("B", "udp")]
+
+
+def test_unknown_type_is_dropped():
+    registry = HandlerRegistry()
+    assert not registry.dispatch(routed(registry), {"TYPE": "NOPE"}, ("10.0.0.1", 50999))
+    assert registry.get_stats()["NOPE"]["received"] == 1
+    assert registry.get_stats()["NOPE"]["dropped"] == 1
+
+
+def test_handlers_report_drops_and_errors():
+    registry = HandlerRegistry()
+    registry.register("KEEP", lambda msg, addr: None)
+    registry.register("DISCARD", lambda msg, addr: False)
+    registry.register("BROKEN", lambda msg, addr: 1 / 0)
+    routes = routed(registry)
+    for msg_type in ("KEEP", "DISCARD", "DISCARD", "BROKEN"):
+        registry.dispatch(routes, {"TYPE": msg_type}, ("10.0.0.1", 50999))
+
+    stats = registry.get_stats()
+    assert (stats["KEEP"]["received"], stats["KEEP"]["dropped"]) == (1, 0)
+    assert (stats["DISCARD"]["received"], stats["DISCARD"]["dropped"]) == (2, 2)
+    assert (stats["BROKEN"]["errors"], stats["BROKEN"]["dropped"]) == (1, 0)
+    assert abs(stats["DISCARD"]["avg_time"] - stats["DISCARD"]["total_time"] / 2) < 1e-12
+
+    registry.reset_stats()
+    assert registry.get_stats() == {}
+
+
+def test_real_handler_drop_is_counted():
+    registry = HandlerRegistry()
+    registry.register("PING", handle_ping)
+    registry.dispatch(routed(registry), {"TYPE": "PING", "USER_ID": "a@10.0.0.1", "TOKEN": "bogus"}, ("10.0.0.1", 50999))
+    assert registry.get_stats()["PING"]["dropped"] == 1
+
+
+def test_stats_are_busiest_first():
+    registry = HandlerRegistry()
+    registry.register("FAST", lambda msg, addr: None)
+    registry.register("SLOW", lambda msg, addr: sum(range(100000)))
+    routes = routed(registry)
+    registry.dispatch(routes, {"TYPE": "FAST"}, ("10.0.0.1", 50999))
+    registry.dispatch(routes, {"TYPE": "SLOW"}, ("10.0.0.1", 50999))
+    assert list(registry.get_stats()) == ["SLOW", "FAST"]
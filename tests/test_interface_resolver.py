@@ -0,0 +1,36 @@
+import utils.network_utils as network_utils
+from utils.network_utils import InterfaceResolver
+
+INTERFACES = {
+    "docker0": ("172.17.0.1", "255.255.0.0", "172.17.255.255"),
+    "eth0": ("192.168.1.20", "255.255.255.0", "192.168.1.255"),
+}
+
+
+def resolver_with(monkeypatch, interfaces, local_ip, probed=None):
+    monkeypatch.setattr(network_utils, "psutil", None)
+    monkeypatch.setattr(network_utils, "fcntl", None)
+    monkeypatch.setattr(network_utils, "get_local_ip", lambda: local_ip)
+    calls = iter([interfaces, probed or {}])
+    monkeypatch.setattr(network_utils, "_probe_interfaces", lambda: next(calls))
+    resolver = InterfaceResolver()
+    resolver.refresh()
+    return resolver
+
+
+def test_primary_is_the_interface_holding_the_local_ip(monkeypatch):
+    resolver = resolver_with(monkeypatch, INTERFACES, "192.168.1.20")
+    assert resolver.get_broadcast_addresses() == ["192.168.1.255"]
+    assert resolver.get_broadcast_addresses("all") == ["172.17.255.255", "192.168.1.255"]
+    assert resolver.get_broadcast_addresses("docker0") == ["172.17.255.255"]
+
+
+def test_primary_falls_back_to_the_probe_not_the_first_interface(monkeypatch):
+    probed = {"default": ("10.0.0.5", "255.255.255.0", "10.0.0.255")}
+    resolver = resolver_with(monkeypatch, INTERFACES, "10.0.0.5", probed)
+    assert resolver.get_broadcast_addresses() == ["10.0.0.255"]
+
+
+def test_no_interfaces_means_limited_broadcast(monkeypatch):
+    resolver = resolver_with(monkeypatch, {}, "10.0.0.5")
+    assert resolver.get_broadcast_addresses() == ["255.255.255.255"]
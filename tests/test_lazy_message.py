@@ -0,0 +1,47 @@
+import pytest
+from core.dispatcher import parse_datagram, parse_message
+from core.lazy_message import LazyMessage
+
+SAMPLES = [
+    b"TYPE: POST\nUSER_ID: a@10.0.0.1\nCONTENT: hello world\n\n",
+    b"TYPE: DM\r\nCONTENT:  \t padded \t \r\n\r\n",
+    b"TYPE: DM\nCONTENT: \x0bvertical tab and form feed\x0c\n",
+    b"TYPE: DM\nCONTENT: \xc2\xa0no-break spaces\xc2\xa0\n",
+    b"TYPE: DM\nCONTENT: \xe2\x80\x83em space\xe2\x80\x83\n",
+    b"  \x0bTYPE : DM\nCONTENT: a: b: c\nno colon here\n",
+    b"TYPE: DM\nCONTENT: first\nCONTENT: second\n",
+    b"TYPE: DM\nCONTENT: bad \xff\xfe bytes \xc3\n\xffKEY\xfe: v\n",
+    b": empty key\nTYPE:\n",
+]
+
+
+@pytest.mark.parametrize("data", SAMPLES)
+def test_lazy_message_matches_parse_message(data):
+    lazy = LazyMessage(data)
+    eager = parse_message(data.decode("utf-8", errors="ignore"))
+    assert dict(lazy) == eager
+    assert list(lazy) == list(eager)
+
+
+def test_missing_keys_behave_like_a_dict():
+    lazy = LazyMessage(SAMPLES[0])
+    assert lazy.get("TOKEN") is None
+    assert lazy.get("TOKEN", "none") == "none"
+    assert "TOKEN" not in lazy
+    with pytest.raises(KeyError):
+        lazy["TOKEN"]
+
+
+def test_raw_returns_the_value_bytes_without_copying():
+    data = b"TYPE: FILE_CHUNK\nDATA: \t aGVsbG8= \r\n"
+    raw = LazyMessage(data).raw("DATA")
+    assert isinstance(raw, memoryview)
+    assert bytes(raw) == b"aGVsbG8="
+
+
+def test_parse_datagram_is_lazy_only_for_large_datagrams():
+    small = b"TYPE: PING\nUSER_ID: a@10.0.0.1\n\n"
+    large = b"TYPE: AVATAR\nAVATAR_DATA: " + b"A" * 4096 + b"\n\n"
+    assert isinstance(parse_datagram(small), dict)
+    assert isinstance(parse_datagram(large), LazyMessage)
+    assert parse_datagram(large)["AVATAR_DATA"] == "A" * 4096
@@ -0,0 +1,61 @@
+import hashlib
+import os
+from storage.partial_file import ChunkBitmap, PartialFile
+
+
+def test_bitmap_set_and_count():
+    bitmap = ChunkBitmap(10)
+    assert bitmap.set(3)
+    assert not bitmap.set(3)
+    assert bitmap.count == 1
+    assert [bitmap[i] for i in range(5)] == [0, 0, 0, 1, 0]
+    assert len(bitmap) == 10
+
+
+def test_first_missing_skips_full_bytes():
+    bitmap = ChunkBitmap(20)
+    for i in range(17):
+        bitmap.set(i)
+    assert bitmap.first_missing() == 17
+    bitmap.set(18)
+    assert bitmap.first_missing(17) == 17
+    bitmap.set(17)
+    assert bitmap.first_missing(10) == 19
+    bitmap.set(19)
+    assert bitmap.first_missing() == 20
+    assert bitmap.complete
+
+
+def test_bitmap_restored_from_bytes():
+    bitmap = ChunkBitmap(12)
+    for i in (0, 5, 11):
+        bitmap.set(i)
+    restored = ChunkBitmap(12, bytes(bitmap.bits))
+    assert restored.count == 3
+    assert [i for i in range(12) if restored[i]] == [0, 5, 11]
+
+
+def test_chunks_written_out_of_order(tmp_path):
+    data = os.urandom(2500)
+    chunks = [data[0:1000], data[1000:2000], data[2000:]]
+    path = str(tmp_path / "file.bin")
+    partial = PartialFile(path, len(data), 3)
+    assert partial.write_chunk(2, chunks[2])
+    assert partial.write_chunk(0, chunks[0])
+    assert not partial.write_chunk(0, chunks[0])  # duplicate
+    assert not partial.complete
+    assert partial.write_chunk(1, chunks[1])
+    assert partial.complete
+    assert partial.sha256() == hashlib.sha256(data).hexdigest()
+    assert partial.finalize() == path
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+
+def test_chunk_that_does_not_fit_is_rejected(tmp_path):
+    partial = PartialFile(str(tmp_path / "file.bin"), 2500, 3)
+    assert partial.write_chunk(0, b"x" * 1000)
+    assert not partial.write_chunk(1, b"x" * 999)  # not the sender's chunk size
+    assert not partial.write_chunk(3, b"x")         # past the last chunk
+    partial.discard()
+    assert not os.path.exists(partial.part_path)
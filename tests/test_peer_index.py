@@ -0,0 +1,51 @@
+from models.peer import Profile
+from storage.peer_directory import PeerIndex
+
+
+def make_index():
+    clock = [0.0]
+    return PeerIndex(clock=lambda: clock[0]), clock
+
+
+def add(index, user_id):
+    index.update(user_id, Profile(user_id, "10.0.0.1"))
+
+
+def test_active_is_most_recent_first_and_stops_at_the_window():
+    index, clock = make_index()
+    add(index, "a")
+    clock[0] = 100
+    add(index, "b")
+    clock[0] = 200
+    add(index, "c")
+    assert [p.user_id for p in index.active(150)] == ["c", "b"]
+    assert [p.user_id for p in index.active(1000)] == ["c", "b", "a"]
+
+
+def test_touch_moves_a_peer_to_the_front():
+    index, clock = make_index()
+    add(index, "a")
+    add(index, "b")
+    clock[0] = 100
+    index.touch("a")
+    index.touch("unknown")  # ignored
+    assert [p.user_id for p in index.active(50)] == ["a"]
+    assert index.get("b", active_within=50) is None
+    assert index.get("b").user_id == "b"
+
+
+def test_evict_drops_silent_peers_and_notifies_listeners():
+    index, clock = make_index()
+    evicted = []
+    index.evict_listeners.append(evicted.extend)
+    add(index, "a")
+    add(index, "b")
+    clock[0] = 100
+    add(index, "c")
+    clock[0] = 150
+    assert index.evict(100) == 2
+    assert evicted == ["a", "b"]
+    assert index.get("a") is None
+    assert len(index) == 1
+    assert index.evict(100) == 0
+    assert evicted == ["a", "b"]
@@ -0,0 +1,61 @@
+import time
+from models.message import Post
+from storage.dedup import GenerationalDedup
+from storage.post_store import PostIndex
+
+FAR = int(time.time()) + 10 ** 6  # an expiry recent() will not purge
+
+
+def ids(posts):
+    return [post.message_id for post in posts]
+
+
+def test_recent_is_newest_first_whatever_the_arrival_order():
+    index = PostIndex()
+    for message_id, timestamp in (("b", 200), ("c", 300), ("a", 100)):
+        index.add(Post(message_id, "u", timestamp, FAR, "text"), persist=False)
+    assert ids(index.recent(10)) == ["c", "b", "a"]
+    assert ids(index.recent(2)) == ["c", "b"]
+
+
+def test_duplicate_message_id_is_rejected():
+    index = PostIndex()
+    assert index.add(Post("a", "u", 100, FAR, "text"), persist=False)
+    assert not index.add(Post("a", "u", 100, FAR, "text"), persist=False)
+    assert len(index.timeline) == 1
+
+
+def test_expired_posts_leave_every_index():
+    index = PostIndex()
+    index.add(Post("old", "u", 100, 1000, "text"), persist=False)
+    index.add(Post("new", "u", 200, 2000, "text"), persist=False)
+    assert index.purge_expired(now=1500) == 1
+    assert index.get("old") is None
+    assert index.find("u", 100) is None
+    assert [entry[2] for entry in index.timeline] == ["new"]
+    assert index.purge_expired(now=1500) == 0
+
+
+def test_posts_without_expiry_stay_out_of_the_feed():
+    index = PostIndex()
+    index.add(Post("a", "u", 100, None, "text"), persist=False)
+    assert index.get("a") is not None
+    assert index.find("u", 100) is not None
+    assert index.recent(10) == []
+
+
+def test_readded_after_dedup_window_replaces_the_post():
+    clock = [0.0]
+    index = PostIndex()
+    index.seen_ids = GenerationalDedup(window=10, generations=2, clock=lambda: clock[0])
+    index.add(Post("a", "u", 100, 1000, "text"), persist=False)
+    clock[0] = 100.0  # the dedup window has forgotten "a"
+    assert index.add(Post("a", "u", 100, 2000, "text"), persist=False)
+    assert len(index.timeline) == 1
+
+    # The first copy's expiry no longer applies; the second one's does
+    assert index.purge_expired(now=1500) == 0
+    assert index.get("a").expiry == 2000
+    assert index.purge_expired(now=2500) == 1
+    assert index.timeline == []
+    assert index.recent(10) == []
@@ -0,0 +1,105 @@
+import base64
+import os
+from types import SimpleNamespace
+import handlers.avatar_handler as avatar_handler
+import handlers.profile_handler as profile_handler
+import senders.avatar_unicast as avatar_unicast
+from core.dispatcher import parse_message
+from models.peer import Profile
+from senders.profile_broadcast import build_profile_message
+from storage.avatar_cache import AvatarCache
+
+ALICE = Profile("alice@10.0.3.2", "10.0.3.2", avatar_type="image/png",
+                avatar_data=base64.b64encode(os.urandom(2000)).decode())
+BOB = Profile("bob@10.0.3.3", "10.0.3.3")
+
+
+class Listener:
+    def __init__(self):
+        self.sent = []  # (parsed message, ip)
+
+    def send_unicast(self, message, ip):
+        self.sent.append((parse_message(message), ip))
+
+
+def avatar_caches(tmp_path, monkeypatch):
+    cache = AvatarCache(directory=str(tmp_path / "avatars"))
+    monkeypatch.setattr(profile_handler, "avatar_cache", cache)
+    monkeypatch.setattr(avatar_handler, "avatar_cache", cache)
+    monkeypatch.setattr(avatar_unicast, "_last_reply", {})
+    return cache
+
+
+def test_unchanged_profile_version_only_refreshes_last_seen(tmp_path, monkeypatch):
+    avatar_caches(tmp_path, monkeypatch)
+    updates = []
+    update_peer = profile_handler.update_peer
+    monkeypatch.setattr(profile_handler, "update_peer", lambda user_id, profile: (updates.append(user_id), update_peer(user_id, profile)))
+    carol = Profile("carol@10.0.3.4", "10.0.3.4", status="here")
+    msg = parse_message(build_profile_message(carol))
+
+    profile_handler.handle_profile(msg, ("10.0.3.4", 50999), Listener(), BOB)
+    profile_handler.handle_profile(msg, ("10.0.3.4", 50999), Listener(), BOB)
+    assert updates == ["carol@10.0.3.4"]
+
+    carol.status = "away"
+    profile_handler.handle_profile(parse_message(build_profile_message(carol)), ("10.0.3.4", 50999), Listener(), BOB)
+    assert updates == ["carol@10.0.3.4"] * 2
+    assert profile_handler.get_peer("carol@10.0.3.4").status == "away"
+
+
+def test_avatar_is_requested_and_sent_by_unicast(tmp_path, monkeypatch):
+    cache = avatar_caches(tmp_path, monkeypatch)
+    profile = parse_message(build_profile_message(ALICE))
+    assert "AVATAR_DATA" not in profile
+
+    # Bob sees Alice's PROFILE and asks for the avatar it advertises
+    bob_side = Listener()
+    profile_handler.handle_profile(profile, ("10.0.3.2", 50999), bob_side, BOB)
+    (request, ip), = bob_side.sent
+    assert ip == "10.0.3.2"
+    assert request["TYPE"] == "AVATAR_REQUEST" and request["AVATAR_HASH"] == ALICE.avatar_hash
+
+    # Alice answers; Bob keeps the avatar and stops asking
+    alice_side = Listener()
+    avatar_handler.handle_avatar_request(request, ("10.0.3.3", 50999), alice_side, ALICE)
+    (reply, ip), = alice_side.sent
+    assert ip == "10.0.3.3" and reply["TYPE"] == "AVATAR"
+    avatar_handler.handle_avatar(reply, ("10.0.3.2", 50999))
+    assert cache.has(ALICE.avatar_hash)
+
+    profile_handler.handle_profile(profile, ("10.0.3.2", 50999), bob_side, BOB)
+    assert len(bob_side.sent) == 1
+
+
+def test_avatar_replies_are_rate_limited_per_peer(tmp_path, monkeypatch):
+    avatar_caches(tmp_path, monkeypatch)
+    clock = [100.0]
+    monkeypatch.setattr(avatar_unicast, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    request = {"TYPE": "AVATAR_REQUEST", "FROM": BOB.user_id, "TO": ALICE.user_id, "AVATAR_HASH": ALICE.avatar_hash}
+    listener = Listener()
+
+    for _ in range(3):
+        avatar_handler.handle_avatar_request(request, ("10.0.3.3", 50999), listener, ALICE)
+    avatar_handler.handle_avatar_request(request, ("10.0.3.9", 50999), listener, ALICE)
+    assert [ip for _, ip in listener.sent] == ["10.0.3.3", "10.0.3.9"]
+
+    clock[0] += avatar_unicast.AVATAR_REPLY_INTERVAL
+    avatar_handler.handle_avatar_request(request, ("10.0.3.3", 50999), listener, ALICE)
+    assert len(listener.sent) == 3
+
+
+def test_requests_for_another_avatar_are_dropped(tmp_path, monkeypatch):
+    avatar_caches(tmp_path, monkeypatch)
+    listener = Listener()
+    stale = {"TYPE": "AVATAR_REQUEST", "FROM": BOB.user_id, "TO": ALICE.user_id, "AVATAR_HASH": "0" * 64}
+    assert avatar_handler.handle_avatar_request(stale, ("10.0.3.3", 50999), listener, ALICE) is False
+    assert listener.sent == []
+
+
+def test_avatar_not_matching_its_hash_is_rejected(tmp_path, monkeypatch):
+    cache = avatar_caches(tmp_path, monkeypatch)
+    forged = {"TYPE": "AVATAR", "USER_ID": ALICE.user_id, "AVATAR_TYPE": "image/png",
+              "AVATAR_HASH": ALICE.avatar_hash, "AVATAR_DATA": base64.b64encode(b"something else").decode()}
+    assert avatar_handler.handle_avatar(forged, ("10.0.3.2", 50999)) is False
+    assert not cache.has(ALICE.avatar_hash)
@@ -0,0 +1,64 @@
+import pytest
+from core.dispatcher import parse_message
+from core.token_validator import parse_token
+from models.message import DirectMessage, GroupMessage, Post
+from models.peer import Profile
+from senders.profile_broadcast import build_profile_message
+from utils.token_utils import generate_token
+
+
+def fields(record):
+    return {name: getattr(record, name) for name in record.__slots__}
+
+
+def test_records_have_no_instance_dict():
+    for record in (Post("m", "a", 1, None, "x"), DirectMessage("m", "a", "b", 1, "x"),
+                   GroupMessage(0, "a", "x", 1), Profile("a@10.0.0.1", "10.0.0.1")):
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.extra = 1
+
+
+def test_post_round_trips_through_dict():
+    post = Post("m1", "alice@10.0.0.2", "1700000000", 1700003600, "hello")
+    assert post.timestamp == 1700000000
+    copy = Post.from_dict(post.to_dict())
+    assert fields(copy) == fields(post)
+
+
+def test_post_rebuilds_its_broadcast_token():
+    token = generate_token("alice@10.0.0.2", 3600, "broadcast")
+    msg = {"TYPE": "POST", "MESSAGE_ID": "m1", "USER_ID": "alice@10.0.0.2", "TIMESTAMP": "1700000000",
+           "CONTENT": "hello", "TOKEN": token}
+    _, expiry, _ = parse_token(token)
+    assert Post.from_message(msg, expiry).token == token
+    assert Post.from_message(msg).token is None
+
+
+def test_direct_message_round_trips_through_dict():
+    dm = DirectMessage("m2", "alice@10.0.0.2", "bob@10.0.0.3", 1700000000, "hi")
+    copy = DirectMessage.from_dict(dm.to_dict())
+    assert fields(copy) == fields(dm)
+    assert fields(DirectMessage.from_message({"MESSAGE_ID": "m2", "FROM": "alice@10.0.0.2", "TO": "bob@10.0.0.3",
+                                              "TIMESTAMP": "1700000000", "CONTENT": "hi"})) == fields(dm)
+
+
+def test_bad_timestamps_and_missing_content_are_tolerated():
+    post = Post.from_message({"USER_ID": "a", "TIMESTAMP": "soon"})
+    assert (post.timestamp, post.content) == (0, "")
+    assert GroupMessage(0, "a", "x", None).timestamp == 0
+
+
+def test_user_ids_are_shared_between_records():
+    sender = "".join(["alice", "@10.0.0.2"])  # a distinct str object, as parsing produces
+    assert Post("m", sender, 1, None, "x").user_id is DirectMessage("m", "alice@10.0.0.2", "b", 1, "x").from_user
+
+
+def test_profile_round_trips_through_its_message():
+    profile = Profile("alice@10.0.0.2", "10.0.0.2", display_name="Alice", status="here",
+                      avatar_type="image/png", avatar_data="aGVsbG8=")
+    copy = Profile.from_message(parse_message(build_profile_message(profile)), ("10.0.0.2", 50999))
+    for name in ("user_id", "ip", "display_name", "status", "avatar_type", "avatar_hash"):
+        assert getattr(copy, name) == getattr(profile, name)
+    assert copy.version and copy.group_ack
+    assert profile.to_dict()["avatar_data"] == "aGVsbG8="
@@ -0,0 +1,126 @@
+import core.reliable_delivery as reliable_delivery
+from core.ack_registry import pending_acks, resolve_ack
+from core.reliable_delivery import ReliableSender
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Scheduler:
+    """
+    Stands in for the TaskScheduler: remembers when the "retransmit" task is
+    due, and run() fires it on the fake clock.
+    """
+    def __init__(self, clock):
+        self.clock = clock
+        self.due = None
+        self.callback = None
+
+    def once(self, name, delay, callback):
+        self.due = self.clock.now + delay
+        self.callback = callback
+        return name
+
+    def reschedule(self, task, delay, earlier_only=False):
+        due = self.clock.now + delay
+        if self.due is None or not earlier_only or due < self.due:
+            self.due = due
+
+    def run(self, until):
+        while self.due is not None and self.due <= until:
+            self.clock.now, self.due = self.due, None
+            self.callback()
+        self.clock.now = until
+
+
+class Udp:
+    def __init__(self, clock):
+        self.clock = clock
+        self.sent = []
+
+    def send_unicast(self, message, ip):
+        self.sent.append(self.clock.now)
+
+
+def sender(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(reliable_delivery, "time", clock)
+    monkeypatch.setattr(reliable_delivery, "RTO_MAX", 8.0)
+    scheduler = Scheduler(clock)
+    return ReliableSender(scheduler=scheduler), scheduler, Udp(clock)
+
+
+def test_retransmits_with_exponential_backoff_then_gives_up(monkeypatch):
+    reliable, scheduler, udp = sender(monkeypatch)
+    failed = []
+    reliable.send(udp, "msg", "10.0.1.1", "m-backoff", on_failure=lambda: failed.append(scheduler.clock.now),
+                  max_retries=4)
+
+    scheduler.run(until=100)
+    # RTO_INITIAL of 1s, doubled per retry and capped at RTO_MAX
+    assert udp.sent == [0.0, 1.0, 3.0, 7.0, 15.0]
+    assert failed == [23.0]
+    assert "m-backoff" not in reliable.pending
+    assert "m-backoff" not in pending_acks
+
+
+def test_ack_stops_retransmission_and_runs_on_ack(monkeypatch):
+    reliable, scheduler, udp = sender(monkeypatch)
+    acks, failed = [], []
+    reliable.send(udp, "msg", "10.0.1.2", "m-acked", on_ack=acks.append, on_failure=lambda: failed.append(1))
+
+    scheduler.run(until=1.5)
+    assert resolve_ack("m-acked", {"STATUS": "RECEIVED"})
+    scheduler.run(until=100)
+    assert udp.sent == [0.0, 1.0]
+    assert acks == [{"STATUS": "RECEIVED"}]
+    assert failed == []
+
+
+def test_only_messages_sent_once_are_rtt_samples(monkeypatch):
+    reliable, scheduler, udp = sender(monkeypatch)
+
+    # Karn's rule: an ACK after a retransmission could answer either copy
+    reliable.send(udp, "msg", "10.0.1.3", "m-retried")
+    scheduler.run(until=1.5)
+    resolve_ack("m-retried")
+    assert reliable.get_estimator("10.0.1.3").srtt is None
+
+    reliable.send(udp, "msg", "10.0.1.3", "m-once")
+    scheduler.run(until=1.8)
+    resolve_ack("m-once")
+    estimator = reliable.get_estimator("10.0.1.3")
+    assert abs(estimator.srtt - 0.3) < 1e-9
+    assert abs(estimator.rto - 0.9) < 1e-9  # srtt + 4 * rttvar
+
+    reliable.send(udp, "msg", "10.0.1.3", "m-human", sample_rtt=False)
+    scheduler.run(until=2.5)
+    resolve_ack("m-human")
+    assert abs(estimator.srtt - 0.3) < 1e-9
+
+
+def test_give_up_after_keeps_probing_at_rto_max(monkeypatch):
+    reliable, scheduler, udp = sender(monkeypatch)
+    failed = []
+    reliable.send(udp, "msg", "10.0.1.4", "m-offer", on_failure=lambda: failed.append(scheduler.clock.now),
+                  max_retries=1, give_up_after=20)
+
+    scheduler.run(until=100)
+    assert udp.sent == [0.0, 1.0, 9.0, 17.0]
+    assert failed == [20.0]
+
+
+def test_cancel_is_silent(monkeypatch):
+    reliable, scheduler, udp = sender(monkeypatch)
+    failed = []
+    reliable.send(udp, "msg", "10.0.1.5", "m-cancel", on_failure=lambda: failed.append(1))
+    reliable.cancel("m-cancel")
+    scheduler.run(until=100)
+    assert udp.sent == [0.0]
+    assert failed == []
+    assert not resolve_ack("m-cancel")
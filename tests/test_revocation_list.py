@@ -0,0 +1,46 @@
+import time
+from core.task_scheduler import task_scheduler
+from core.token_validator import revoked_tokens, start_revocation_cleanup
+from storage.revocation_list import RevocationList
+
+
+def test_purge_removes_only_expired_tokens_in_expiry_order():
+    revoked = RevocationList()
+    for token, expiry in (("c", 300), ("a", 100), ("b", 200)):
+        revoked.add(token, expiry)
+    assert revoked.next_expiry() == 100
+
+    assert revoked.purge_expired(now=100) == 0  # still valid at its expiry second
+    assert revoked.purge_expired(now=201) == 2
+    assert "a" not in revoked and "b" not in revoked and "c" in revoked
+    assert revoked.next_expiry() == 300
+    assert revoked.purge_expired(now=1000) == 1
+    assert len(revoked) == 0 and revoked.next_expiry() is None
+
+
+def test_re_revoking_keeps_the_later_expiry():
+    revoked = RevocationList()
+    revoked.add("t", 100)
+    revoked.add("t", 500)
+    revoked.add("t", 200)  # an earlier expiry never shortens the revocation
+    assert len(revoked) == 1
+    assert revoked.next_expiry() == 500
+
+    assert revoked.purge_expired(now=300) == 0
+    assert "t" in revoked
+    assert revoked.purge_expired(now=501) == 1
+
+
+def test_cleanup_task_purges_the_shared_list():
+    now = int(time.time())
+    revoked_tokens.add("expired-token", now - 10)
+    revoked_tokens.add("live-token", now + 3600)
+    task = start_revocation_cleanup(interval=0.01)
+    try:
+        deadline = time.monotonic() + 2
+        while "expired-token" in revoked_tokens and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert "expired-token" not in revoked_tokens
+        assert "live-token" in revoked_tokens
+    finally:
+        task_scheduler.cancel(task)
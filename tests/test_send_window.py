@@ -0,0 +1,101 @@
+from models.send_window import SendWindow, decode_sack_bitmap, encode_sack_bitmap
+
+
+def send_all(window, now=0.0):
+    sent = []
+    while True:
+        index = window.next_chunk()
+        if index is None:
+            return sent
+        window.on_sent(index, now)
+        sent.append(index)
+
+
+def test_bitmap_round_trip():
+    received = [1, 0, 1, 1, 0, 0, 0, 0, 0, 1]
+    bitmap = decode_sack_bitmap(encode_sack_bitmap(received, 1, len(received), 256))
+    offsets = [i for i in range(9) if bitmap[i >> 3] & (1 << (i & 7))]
+    assert [1 + offset for offset in offsets] == [2, 3, 9]
+
+
+def test_window_limits_chunks_in_flight():
+    window = SendWindow(100, initial=4, max_window=64)
+    assert send_all(window) == [0, 1, 2, 3]
+    assert not window.can_send()
+
+
+def test_slow_start_grows_by_one_per_acked_chunk():
+    window = SendWindow(100, initial=4, max_window=64)
+    send_all(window)
+    window.on_sack(4, b"", 1.0)
+    assert window.cwnd == 8
+    assert window.acked_count == 4
+    assert send_all(window) == [4, 5, 6, 7, 8, 9, 10, 11]
+
+
+def test_congestion_avoidance_grows_by_one_per_window():
+    window = SendWindow(100, initial=4, max_window=64)
+    window.ssthresh = 4.0
+    send_all(window)
+    window.on_sack(4, b"", 1.0)
+    assert window.cwnd == 5.0
+
+
+def test_window_never_exceeds_max():
+    window = SendWindow(100, initial=4, max_window=6)
+    send_all(window)
+    window.on_sack(4, b"", 1.0)
+    assert window.cwnd == 6
+
+
+def test_selective_ack_marks_loss_and_halves_window_once():
+    window = SendWindow(100, initial=8, max_window=64)
+    send_all(window)
+    # Chunk 0 missing; 1..4 arrived, which is FILE_DUPTHRESH chunks past it
+    window.on_sack(0, bytes([0b00011110]), 1.0)
+    assert list(window.lost) == [0]
+    assert window.cwnd == 4.0
+    # A further SACK from the same round trip does not halve it again
+    window.on_sack(0, bytes([0b00111110]), 1.1)
+    assert window.cwnd >= 4.0
+    assert window.next_chunk() == 0  # lost chunks go first
+
+
+def test_late_arrival_of_presumed_lost_chunk_is_acked():
+    window = SendWindow(10, initial=8, max_window=64)
+    send_all(window)
+    window.on_sack(0, bytes([0b00011110]), 1.0)
+    window.on_sack(8, b"", 1.1)
+    assert window.acked_count == 8
+    assert window.next_chunk() == 8
+
+
+def test_rtt_sample_skips_retransmitted_chunks():
+    window = SendWindow(10, initial=1, max_window=64)
+    window.on_sent(window.next_chunk(), 0.0)
+    assert window.on_sack(1, b"", 0.25) == 0.25
+    index = window.next_chunk()
+    window.on_sent(index, 1.0)
+    window.on_sent(index, 2.0)  # retransmission
+    assert window.on_sack(2, b"", 2.5) is None
+
+
+def test_timeout_collapses_window_and_requeues_in_flight():
+    window = SendWindow(10, initial=4, max_window=64)
+    window.last_progress = 0.0
+    send_all(window)
+    assert not window.check_timeout(0.5, rto=1.0)
+    assert window.check_timeout(1.0, rto=1.0)
+    assert window.cwnd == 1.0
+    assert sorted(window.lost) == [0, 1, 2, 3]
+    # The next timeout waits twice as long
+    window.on_sent(window.next_chunk(), 1.0)
+    assert window.time_to_timeout(1.0, rto=1.0) == 2.0
+
+
+def test_resume_skips_chunks_already_received():
+    window = SendWindow(6, initial=8, max_window=64, already_received=[0, 2, 5])
+    assert window.acked_count == 3
+    assert send_all(window) == [1, 3, 4]
+    window.on_sack(6, b"", 1.0)
+    assert window.done
@@ -0,0 +1,46 @@
+import threading
+import time
+from core.task_scheduler import task_scheduler
+from models.message import DirectMessage, GroupMessage, Post
+from storage.backend import SQLiteBackend
+
+
+def test_writes_are_committed_in_batches_and_survive_reopening(tmp_path):
+    path = str(tmp_path / "store.db")
+    backend = SQLiteBackend(path, flush_interval=60, flush_max=1000)
+    backend.save_dm(DirectMessage("m1", "a", "b", 100, "hi"))
+    backend.save_group_message("g", GroupMessage(0, "a", "hello", 100), "id0")
+    assert len(backend._pending) == 2
+    backend.close()
+
+    backend = SQLiteBackend(path)
+    assert [dm.content for dm in backend.load_thread("b", "a", 10)] == ["hi"]
+    assert [m.content for m in backend.load_group_messages("g", 0, 1)] == ["hello"]
+    assert backend.next_group_seq("g") == 1
+    backend.close()
+
+
+def test_full_queue_is_flushed_without_waiting_for_the_interval(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "store.db"), flush_interval=60, flush_max=3)
+    for i in range(3):
+        backend.save_post(Post(f"p{i}", "a", 100 + i, 10 ** 10, "text"))
+    deadline = time.monotonic() + 2
+    while backend._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert backend._pending == []
+    backend.close()
+
+
+def test_slow_commit_does_not_hold_up_the_scheduler(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "store.db"), flush_interval=0.01)
+    commit = backend.flush
+    backend.flush = lambda: (time.sleep(0.5), commit())
+    time.sleep(0.05)  # the flush task has fired and the writer is committing
+
+    ran = threading.Event()
+    started = time.monotonic()
+    task_scheduler.once("test-after-flush", 0, ran.set)
+    assert ran.wait(2.0)
+    assert time.monotonic() - started < 0.25
+    assert task_scheduler.tasks["storage-flush"].last_duration < 0.05
+    backend.close()
@@ -0,0 +1,124 @@
+import threading
+import time
+from core.task_scheduler import TaskScheduler
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_periodic_task_repeats_and_records_runs():
+    scheduler = TaskScheduler()
+    runs = []
+    task = scheduler.every("tick", 0.02, lambda: runs.append(time.monotonic()), delay=0)
+    assert wait_until(lambda: len(runs) >= 3)
+    scheduler.cancel(task)
+    assert task.runs >= 3
+    assert task.last_duration is not None
+
+
+def test_once_runs_once_and_leaves_the_registry():
+    scheduler = TaskScheduler()
+    ran = threading.Event()
+    task = scheduler.once("one-shot", 0.01, ran.set)
+    assert ran.wait(2.0)
+    assert wait_until(lambda: scheduler.get_tasks() == [])
+    assert task.runs == 1
+
+
+def test_cancelled_task_does_not_run():
+    scheduler = TaskScheduler()
+    ran = []
+    task = scheduler.once("cancelled", 0.05, lambda: ran.append(1))
+    scheduler.cancel(task)
+    scheduler.once("marker", 0.1, lambda: ran.append(2))
+    assert wait_until(lambda: ran == [2])
+    assert scheduler.get_tasks() == []
+
+
+def test_reschedule_earlier_only_never_delays():
+    scheduler = TaskScheduler()
+    ran = threading.Event()
+    task = scheduler.once("flush", 60, ran.set)
+    scheduler.reschedule(task, 120, earlier_only=True)
+    assert scheduler.get_tasks()[0]["next_in"] < 61
+    scheduler.reschedule(task, 0, earlier_only=True)
+    assert ran.wait(2.0)
+
+
+def test_same_name_replaces_the_task():
+    scheduler = TaskScheduler()
+    ran = []
+    scheduler.once("job", 0.05, lambda: ran.append("old"))
+    scheduler.once("job", 0.05, lambda: ran.append("new"))
+    assert wait_until(lambda: ran == ["new"])
+    time.sleep(0.1)
+    assert ran == ["new"]
+
+
+def test_failing_callback_is_counted_and_task_keeps_running():
+    scheduler = TaskScheduler()
+    task = scheduler.every("broken", 0.01, lambda: 1 / 0, delay=0)
+    assert wait_until(lambda: task.errors >= 2)
+    scheduler.cancel(task)
+
+
+def test_registry_is_soonest_first():
+    scheduler = TaskScheduler()
+    scheduler.every("later", 60, lambda: None)
+    scheduler.every("sooner", 30, lambda: None)
+    names = [row["name"] for row in scheduler.get_tasks()]
+    assert names == ["sooner", "later"]
+    assert all(row["runs"] == 0 and row["last_duration"] is None for row in scheduler.get_tasks())
+
+
+def test_one_thread_for_any_number_of_tasks():
+    scheduler = TaskScheduler()
+    before = threading.active_count()
+    for i in range(20):
+        scheduler.every(f"task-{i}", 60, lambda: None)
+    assert threading.active_count() == before + 1
+
+
+class GappyCondition:
+    """
+    A Condition that, while armed, pauses the scheduler thread before each
+    time it takes the lock, widening any window in which the thread holds
+    neither the lock nor a wait().
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.armed = False
+
+    def __enter__(self):
+        if self.armed and threading.current_thread().name == "lsnp-timers":
+            time.sleep(0.1)
+        return self._cond.__enter__()
+
+    def __exit__(self, *exc):
+        return self._cond.__exit__(*exc)
+
+    def wait(self, timeout=None):
+        return self._cond.wait(timeout)
+
+    def notify(self):
+        self._cond.notify()
+
+
+def test_earlier_task_pushed_while_waiting_on_a_later_one_runs_on_time():
+    scheduler = TaskScheduler()
+    scheduler._cond = GappyCondition()
+    scheduler.once("later", 60, lambda: None)
+    time.sleep(0.05)  # the thread is now waiting on "later"
+
+    scheduler._cond.armed = True
+    scheduler.once("sooner", 30, lambda: None)  # wakes the thread
+    time.sleep(0.15)  # ...which is now between computing its wait and waiting
+    ran = threading.Event()
+    scheduler.once("now", 0, ran.set)
+    assert ran.wait(2.0)
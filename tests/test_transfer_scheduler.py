@@ -0,0 +1,81 @@
+import threading
+import time
+from core.transfer_scheduler import TransferScheduler
+
+
+class Transfer:
+    """
+    A transfer of `chunks` chunks of `size` bytes that holds back until `ready` is set.
+    """
+    def __init__(self, name, chunks, weight=1, size=1024, ready=None, log=None):
+        self.name = name
+        self.weight = weight
+        self.size = size
+        self.unsent = list(range(chunks))
+        self.ready = ready or threading.Event()
+        self.log = log if log is not None else []
+        self.done = threading.Event()
+
+    def next_chunk(self, now):
+        if not self.ready.is_set() or not self.unsent:
+            return None
+        return self.unsent.pop(0), None
+
+    def wait_time(self, now):
+        return 0.01
+
+    def transmit_chunk(self, index, hint):
+        self.log.append((self.name, time.monotonic()))
+        return self.size
+
+    @property
+    def finished(self):
+        return not self.unsent
+
+    def finish(self):
+        self.done.set()
+
+    def progress(self):
+        return {"name": self.name}
+
+
+def test_transfers_take_turns_by_weight():
+    scheduler = TransferScheduler(rate_limit=0)
+    ready, log = threading.Event(), []
+    heavy = Transfer("A", 6, weight=2, ready=ready, log=log)
+    light = Transfer("B", 6, weight=1, ready=ready, log=log)
+    scheduler.add(heavy)
+    scheduler.add(light)
+    assert [p["name"] for p in scheduler.get_progress()] == ["A", "B"]
+
+    ready.set()
+    scheduler.wake()
+    assert heavy.done.wait(2.0) and light.done.wait(2.0)
+    assert "".join(name for name, _ in log) == "AABAABAABBBB"
+
+
+def test_rate_limit_caps_the_combined_rate():
+    rate = 1_000_000
+    scheduler = TransferScheduler(rate_limit=rate)
+    ready, log = threading.Event(), []
+    transfers = [Transfer(name, 5, size=50_000, ready=ready, log=log) for name in "AB"]
+    for transfer in transfers:
+        scheduler.add(transfer)
+    ready.set()
+    scheduler.wake()
+    assert all(transfer.done.wait(5.0) for transfer in transfers)
+
+    # The bucket starts empty and goes into debt by one chunk at a time
+    elapsed = log[-1][1] - log[0][1]
+    assert elapsed >= 9 * 50_000 / rate * 0.9
+    assert len(log) * 50_000 <= rate * elapsed + max(rate / 10, 4096) + 50_000
+
+
+def test_unlimited_rate_does_not_pace():
+    scheduler = TransferScheduler(rate_limit=0)
+    transfer = Transfer("A", 10, size=50_000)
+    transfer.ready.set()
+    started = time.monotonic()
+    scheduler.add(transfer)
+    assert transfer.done.wait(2.0)
+    assert time.monotonic() - started < 0.3
@@ -8,10 +8,11 @@ from queue import Queue
 
 import config
 from models.peer import Profile
-from senders.group_unicast import build_group_update, build_group_create, build_group_message, send_group_message
+from senders.group_unicast import build_group_update, build_group_create, build_group_message, send_group_message, send_group_file
 from senders.revoke_sender import send_revoke
 from storage.group_directory import create_group, get_group_messages, group_table, get_group_members, get_group_name, update_group_members
-from utils.base64_utils import encode_image_to_base64
+from utils.base64_utils import encode_image_to_base64, preview_image
+from storage.avatar_cache import avatar_cache
 from utils.network_utils import get_local_ip
 from storage.peer_directory import get_peers
 from utils.printer import clear_screen, VERBOSE_LOGS, NOTIFICATIONS
@@ -29,6 +30,9 @@ from storage.group_directory import get_group_messages
 from senders.group_unicast import send_group_message
 from senders.follow_unicast import follow_user, unfollow_user
 from storage.user_followers import is_following, is_follower, get_followers, get_following
+from core.handler_registry import get_type_stats
+from core.transfer_scheduler import transfer_scheduler
+from core.task_scheduler import task_scheduler
 
 
 # ===============================
@@ -96,29 +100,43 @@ def flush_pending_logs():
 
 def process_file_offer(msg, addr, udp, local_profile):
     """
-    Handles a pending file offer from the queue.
+    Handles a pending file offer from the queue, either a FILE_OFFER or a
+    GROUP_FILE_OFFER (see config.GROUP_FILE_AUTO_ACCEPT).
     """
     from_user_id = msg.get("FROM")
     to_user_id = msg.get("TO")
     file_name = msg.get("FILENAME")
     file_size = msg.get("FILESIZE")
     sender_ip = addr[0]
+    group = msg.get("TYPE") == "GROUP_FILE_OFFER"
+    recipient = f"the group {get_group_name(msg.get('GROUP_ID'))}" if group else "you"
 
-    print(f"\n📥 User {from_user_id} is sending you a file. "
+    print(f"\n📥 User {from_user_id} is sending {recipient} a file. "
           f"Do you accept? {file_name} ({file_size} bytes)")
 
     clear_screen()
-    questionary.print(f"\n📥 User {from_user_id} is sending you a file do you accept? {file_name} ({file_size} bytes)")
+    questionary.print(f"\n📥 User {from_user_id} is sending {recipient} a file do you accept? {file_name} ({file_size} bytes)")
     accept = questionary.confirm("Accept file?").ask()
-    if accept:
-        from models.file_transfer import FileTransferResponder
-        responder = FileTransferResponder(udp)
+    responder = FileTransferResponder(udp)
+    if accept and group:
+        # Group files always use binary frames; the ACK answers this member's MESSAGE_ID
+        responder.accept_file_offer(to_ip=sender_ip, file_id=msg["FILEID"], message_id=msg.get("MESSAGE_ID"))
+    elif accept:
         responder.accept_file_offer(
             to_ip=sender_ip,
-            file_id=msg["FILEID"]
+            file_id=msg["FILEID"],
+            sack=msg.get("TRANSFER_MODE") == "WINDOW",
+            binary=msg.get("FRAMING") == "BINARY"
         )
+    elif group:
+        questionary.print("❌ File offer declined.")
+        from handlers.file_handler import discard_offer
+        discard_offer(msg["FILEID"])
+        responder.decline_file_offer(sender_ip, msg.get("MESSAGE_ID"))
     else:
         questionary.print("❌ File offer declined.")
+        from handlers.file_handler import discard_offer
+        discard_offer(msg["FILEID"])
         # Receiver sends REVOKE to sender
         send_revoke(
             udp_listener=udp,
@@ -131,11 +149,7 @@ def process_file_offer(msg, addr, udp, local_profile):
     flush_pending_logs()
 
 def find_peer_by_user_id(user_id: str):
-    peers = get_peers(active_within=300)
-    for p in peers:
-        if getattr(p, "user_id", None) == user_id:
-            return p
-    return None
+    return get_peer(user_id, active_within=config.PEER_ACTIVE_WINDOW)
 
 def display_dm_thread(profile, peer_id: str, udp):
     thread = get_thread(peer_id, profile.user_id, limit=50)
@@ -147,9 +161,8 @@ def display_dm_thread(profile, peer_id: str, udp):
     
     questionary.print(f"💬 Conversation with {peer_id}\n", style="bold")
     for msg in thread:
-        timestamp = msg.get("TIMESTAMP")
-        who = "You" if msg.get("FROM") == profile.user_id else peer_id
-        questionary.print(f"[{timestamp}] {who}: {msg.get('CONTENT')}")
+        who = "You" if msg.from_user == profile.user_id else peer_id
+        questionary.print(f"[{msg.timestamp}] {who}: {msg.content}")
 
     action = questionary.select(
             "Choose an action:",
@@ -182,6 +195,7 @@ def group_menu(local_profile, udp_listener):
                 "Update Group",
                 "View My Groups",
                 "Send Message to Group",
+                "Send File to Group",
                 "View Messages in Group",
                 "↩ Return to menu"
             ]
@@ -199,6 +213,9 @@ def group_menu(local_profile, udp_listener):
         elif choice == "Send Message to Group":
             send_group_message_cli(local_profile, udp_listener)
 
+        elif choice == "Send File to Group":
+            send_group_file_cli(local_profile, udp_listener)
+
         elif choice == "View Messages in Group":
             view_group_messages_cli()
 
@@ -213,7 +230,7 @@ def create_group_cli(local_profile, udp_listener):
     group_name = questionary.text("Enter a group name:").ask()
 
     # Get active peers (excluding yourself)
-    peers = [p for p in get_peers(active_within=300) if p.user_id != local_profile.user_id]
+    peers = [p for p in get_peers(active_within=config.PEER_ACTIVE_WINDOW) if p.user_id != local_profile.user_id]
 
     if not peers:
         questionary.print("⚠ No active peers to add right now.")
@@ -276,7 +293,7 @@ def update_group_cli(local_profile, udp_listener):
     current_members = get_group_members(selected_group_id)
 
     # Active peers (excluding yourself)
-    peers = [p for p in get_peers(active_within=300) if p.user_id != local_profile.user_id]
+    peers = [p for p in get_peers(active_within=config.PEER_ACTIVE_WINDOW) if p.user_id != local_profile.user_id]
 
     # ADD
     add_ids = []
@@ -342,6 +359,34 @@ def send_group_message_cli(local_profile, udp_listener):
     if send:
         NOTIFICATIONS.append(f"📤 Message sent to group '{get_group_name(gid)}'.")
     
+def send_group_file_cli(local_profile, udp_listener):
+    """
+    Shares a file with all online members of a group.
+    """
+    if not group_table:
+        print("No groups to send files to.")
+        return
+
+    groups = [(gid, get_group_name(gid)) for gid in group_table.keys()]
+    gid = questionary.select(
+        "Select a group:",
+        choices=[questionary.Choice(title=f"{name} ({gid})", value=gid) for gid, name in groups]
+    ).ask()
+
+    if not gid:
+        print("❌ No group selected.")
+        return
+
+    file_result = file_form()
+    if not file_result:
+        return
+    transfer = send_group_file(local_profile, gid, file_result["file_location"], file_result["description"],
+                               udp_listener, file_result["file_name"])
+    if transfer:
+        NOTIFICATIONS.append(f"📤 Sharing {file_result['file_location']} with group '{get_group_name(gid)}'.")
+    else:
+        questionary.print("❌ No other group member is online.", style="fg:red")
+
 def view_group_messages_cli():
     """
     Allows the user to view stored messages for a group.
@@ -364,12 +409,34 @@ def view_group_messages_cli():
     messages = get_group_messages(gid)
     if not messages:
         print("📭 No messages in this group yet.")
-    else:
+        input("\n🔙 Press Enter to return to the main menu...")
+        return
+
+    # Page through the history by seq cursor; only one page is materialized at a time
+    while True:
         questionary.print(f"=== Messages in '{get_group_name(gid)}' ===")
         for m in messages:
-            questionary.print(f"[{m['timestamp']}] {m['sender']}: {m['content']}")
+            questionary.print(f"[{m.timestamp}] {m.sender}: {m.content}")
+
+        older = get_group_messages(gid, before=messages[0].seq, limit=1)
+        newer = get_group_messages(gid, after=messages[-1].seq, limit=1)
+        choices = []
+        if older:
+            choices.append(questionary.Choice(title="⬆️ Older messages", value="older"))
+        if newer:
+            choices.append(questionary.Choice(title="⬇️ Newer messages", value="newer"))
+        if not choices:
+            input("\n🔙 Press Enter to return to the main menu...")
+            return
+        choices.append(questionary.Choice(title="🔙 Back", value="back"))
 
-    input("\n🔙 Press Enter to return to the main menu...")
+        action = questionary.select("Navigate:", choices=choices).ask()
+        if action == "older":
+            messages = get_group_messages(gid, before=messages[0].seq)
+        elif action == "newer":
+            messages = get_group_messages(gid, after=messages[-1].seq)
+        else:
+            return
 
 
 def launch_main_menu(profile: Profile, udp):
@@ -397,7 +464,10 @@ def launch_main_menu(profile: Profile, udp):
                     "Peer",
                     "Groups",
                     "Notifications",
+                    "File Transfers",
                     "Verbose Console",
+                    "Message Stats",
+                    "Scheduled Tasks",
                     "Settings: Change Post TTL",
                     "Revoke Token",
                     "Refresh",
@@ -414,6 +484,7 @@ def launch_main_menu(profile: Profile, udp):
                     "Peer",
                     "Groups",
                     "Notifications",
+                    "File Transfers",
                     "Settings: Change Post TTL",
                     "Refresh",
                     "Terminate"
@@ -465,6 +536,14 @@ def launch_main_menu(profile: Profile, udp):
                 elif choice == "View Relationship":
                     show_peer_relationship(selected)
 
+                elif choice == "View Avatar":
+                    path = avatar_cache.path_for(selected.user_id)
+                    if path:
+                        preview_image(path)
+                    else:
+                        questionary.print("ℹ️ This peer has no avatar.", style="fg:yellow")
+                        wait_for_enter()
+
         elif choice == "Settings: Change Post TTL":
             new_post_ttl = questionary.text(f"Enter new Post TTL in seconds (current {config.token_ttl_post}): ").ask()
 
@@ -487,6 +566,15 @@ def launch_main_menu(profile: Profile, udp):
         elif choice == "Verbose Console":
             print_verbose()
 
+        elif choice == "Message Stats":
+            print_message_stats()
+
+        elif choice == "Scheduled Tasks":
+            print_scheduled_tasks()
+
+        elif choice == "File Transfers":
+            print_transfers()
+
         elif choice == "Revoke Token":
             revoke_cli(profile, udp)
 
@@ -506,7 +594,7 @@ def select_peer(local_profile):
         while True:
             clear_screen()
             questionary.print("📡 Live Peer View (auto-refreshes every 3s)", style="bold")
-            peers = get_peers(active_within=300)
+            peers = get_peers(active_within=config.PEER_ACTIVE_WINDOW)
             peers = [p for p in peers if local_profile.user_id != p.user_id]
 
             if not peers:
@@ -549,6 +637,7 @@ def peer_menu():
                 "Follow",
                 "Unfollow",
                 "View Relationship",
+                "View Avatar",
                 "Send File",
                 "↩ Return to menu"
             ]
@@ -567,9 +656,9 @@ def display_feed(profile=None, udp=None):
     
     choices = []
     for post in posts:
-        user_id = post.get("USER_ID", "?")
-        timestamp  = int(post.get("TIMESTAMP", 0))
-        content = (post.get("CONTENT") or "").strip().replace("\n", " ")
+        user_id = post.user_id or "?"
+        timestamp = post.timestamp
+        content = post.content.strip().replace("\n", " ")
         if len(content) > 70:
             content = content[:67] + "..."
         count = get_like_count(user_id, timestamp)
@@ -582,8 +671,8 @@ def display_feed(profile=None, udp=None):
     if selected == "↩ Back" or selected is None:
         return
     
-    post_author = selected.get("USER_ID")
-    post_ts = int(selected.get("TIMESTAMP", 0))
+    post_author = selected.user_id
+    post_ts = selected.timestamp
     
     action = questionary.select("Choose an action:", choices=["Like", "Unlike", "↩ Back"]).ask()
     if action in ("Like", "Unlike"):
@@ -650,6 +739,67 @@ def print_verbose():
 
         time.sleep(10)
 
+def print_transfers():
+    """
+    Shows progress and throughput of outgoing file transfers.
+    """
+    clear_screen()
+    transfers = transfer_scheduler.get_progress()
+    if not transfers:
+        questionary.print("No outgoing file transfers.", style="fg:yellow")
+        wait_for_enter()
+        return
+
+    print("=== File Transfers ===\n")
+    print(f"{'FILE':<24}{'TO':<24}{'state':<10}{'chunks':>13}{'%':>7}{'KB/s':>9}{'window':>8}")
+    for t in transfers:
+        chunks = f"{t['done_chunks']}/{t['total_chunks']}"
+        window = t['window'] if t['window'] is not None else "-"
+        print(f"{t['filename'][:23]:<24}{t['to'][:23]:<24}{t['state']:<10}{chunks:>13}"
+              f"{t['percent']:>7.1f}{t['throughput'] / 1024:>9.1f}{window:>8}")
+    wait_for_enter()
+    clear_screen()
+
+def print_message_stats():
+    """
+    Shows per-TYPE dispatcher counters, busiest TYPE first.
+    """
+    clear_screen()
+    stats = get_type_stats()
+    if not stats:
+        questionary.print("No messages handled yet.", style="fg:yellow")
+        wait_for_enter()
+        return
+
+    print("=== Message Stats ===\n")
+    print(f"{'TYPE':<16}{'recv':>8}{'drop':>8}{'err':>6}{'total ms':>12}{'avg ms':>10}{'max ms':>10}")
+    for msg_type, s in stats.items():
+        print(f"{str(msg_type):<16}{s['received']:>8}{s['dropped']:>8}{s['errors']:>6}"
+              f"{s['total_time'] * 1000:>12.1f}{s['avg_time'] * 1000:>10.2f}{s['max_time'] * 1000:>10.2f}")
+    wait_for_enter()
+    clear_screen()
+
+def print_scheduled_tasks():
+    """
+    Shows the timers run by the task scheduler, next due first.
+    """
+    clear_screen()
+    tasks = task_scheduler.get_tasks()
+    if not tasks:
+        questionary.print("No scheduled tasks.", style="fg:yellow")
+        wait_for_enter()
+        return
+
+    print("=== Scheduled Tasks ===\n")
+    print(f"{'TASK':<20}{'every s':>10}{'next in s':>12}{'last ms':>10}{'runs':>8}{'err':>6}")
+    for t in tasks:
+        every = "once" if t["interval"] is None else f"{t['interval']:.1f}"
+        next_in = "-" if t["next_in"] is None else f"{max(t['next_in'], 0):.1f}"
+        last = "-" if t["last_duration"] is None else f"{t['last_duration'] * 1000:.2f}"
+        print(f"{t['name']:<20}{every:>10}{next_in:>12}{last:>10}{t['runs']:>8}{t['errors']:>6}")
+    wait_for_enter()
+    clear_screen()
+
 def print_notifs():
     while True:
         os.system("cls" if os.name == "nt" else "clear")
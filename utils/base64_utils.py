@@ -1,5 +1,6 @@
 import os
 import base64
+import hashlib
 import mimetypes
 import subprocess
 import sys
@@ -36,6 +37,14 @@ def encode_image_to_base64(filepath: str) -> tuple[str, str] | None:
         return None
 
 
+def avatar_digest(avatar_data: str) -> str:
+    """
+    Content hash of an avatar: SHA-256 of its base64 text, so an avatar can be
+    recognized without decoding it.
+    """
+    return hashlib.sha256(avatar_data.encode("ascii", errors="ignore")).hexdigest()
+
+
 def decode_base64_to_image(base64_str: str, output_path: str):
     """
     Decodes base64 string and writes it as an image file.
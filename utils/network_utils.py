@@ -1,5 +1,28 @@
+import ipaddress
 import socket
+import struct
 import sys
+import threading
+import time
+from config import INTERFACE_REFRESH_INTERVAL
+from utils.printer import verbose_log
+
+try:
+    import psutil  # Optional; gives real netmasks on macOS and Windows
+except ImportError:
+    psutil = None
+
+try:
+    import fcntl  # Linux fallback for interface enumeration
+except ImportError:
+    fcntl = None
+
+# Linux ioctl request numbers (see <linux/sockios.h>)
+SIOCGIFFLAGS = 0x8913
+SIOCGIFADDR = 0x8915
+SIOCGIFNETMASK = 0x891b
+IFF_UP = 0x1
+IFF_LOOPBACK = 0x8
 
 def get_local_ip():
     """Return the IP from args if provided, otherwise detect automatically."""
@@ -16,25 +39,159 @@ def get_local_ip():
         s.close()
     return ip
 
-def get_broadcast_ip() -> str:
-    """
-    Attempts to compute the local subnet's senders IP based on the current IP.
+def _compute_broadcast(ip: str, netmask: str) -> str:
+    return str(ipaddress.IPv4Network(f"{ip}/{netmask}", strict=False).broadcast_address)
 
-    Returns:
-        str: A senders IP address like '192.168.1.255'
-    """
+
+def _psutil_interfaces() -> dict:
+    interfaces = {}
+    stats = psutil.net_if_stats()
+    for name, addrs in psutil.net_if_addrs().items():
+        if name in stats and not stats[name].isup:
+            continue
+        for addr in addrs:
+            if addr.family != socket.AF_INET or not addr.netmask or addr.address.startswith("127."):
+                continue
+            broadcast = addr.broadcast or _compute_broadcast(addr.address, addr.netmask)
+            interfaces[name] = (addr.address, addr.netmask, broadcast)
+            break
+    return interfaces
+
+
+def _ioctl_interfaces() -> dict:
+    interfaces = {}
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
+        for _, name in socket.if_nameindex():
+            packed = struct.pack("256s", name[:15].encode("utf-8"))
+            try:
+                flags = struct.unpack("H", fcntl.ioctl(s.fileno(), SIOCGIFFLAGS, packed)[16:18])[0]
+                if not flags & IFF_UP or flags & IFF_LOOPBACK:
+                    continue
+                ip = socket.inet_ntoa(fcntl.ioctl(s.fileno(), SIOCGIFADDR, packed)[20:24])
+                netmask = socket.inet_ntoa(fcntl.ioctl(s.fileno(), SIOCGIFNETMASK, packed)[20:24])
+            except OSError:
+                continue  # no IPv4 address on this interface
+            interfaces[name] = (ip, netmask, _compute_broadcast(ip, netmask))
+    finally:
         s.close()
+    return interfaces
+
 
-        ip_parts = local_ip.split('.')
-        ip_parts[-1] = '255'
-        return '.'.join(ip_parts)
+def _probe_interfaces() -> dict:
+    # Last resort: one outbound probe, assuming a /24 like the original lookup did
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.connect(("8.8.8.8", 80))
+            local_ip = s.getsockname()[0]
+        finally:
+            s.close()
+        return {"default": (local_ip, "255.255.255.0", _compute_broadcast(local_ip, "255.255.255.0"))}
+    except OSError:
+        return {}
+
+
+class InterfaceResolver:
+    """
+    Enumerates local IPv4 interfaces once and caches their broadcast addresses.
 
-    except Exception:
-        return '255.255.255.255'
+    The table is refreshed at most every refresh_interval seconds, so sending a
+    broadcast costs a dictionary lookup instead of a socket probe.
+    """
+    def __init__(self, refresh_interval=INTERFACE_REFRESH_INTERVAL):
+        """
+        Args:
+            refresh_interval (float): Seconds before the interface table is re-read.
+        """
+        self.refresh_interval = refresh_interval
+        self.interfaces = {}  # name -> (ip, netmask, broadcast)
+        self.primary = None   # broadcast address of the interface holding get_local_ip()
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """
+        Re-reads the interface table.
+
+        Returns:
+            bool: True if the set of interfaces or their addresses changed.
+        """
+        if psutil is not None:
+            interfaces = _psutil_interfaces()
+        elif fcntl is not None and hasattr(socket, "if_nameindex"):
+            interfaces = _ioctl_interfaces()
+        else:
+            interfaces = _probe_interfaces()
+        primary = self._primary(interfaces)
+
+        with self._lock:
+            changed = interfaces != self.interfaces or primary != self.primary
+            self.interfaces = interfaces
+            self.primary = primary
+            self._refreshed_at = time.monotonic()
+        if changed:
+            verbose_log("INFO", f"Network interfaces: {interfaces}")
+        return changed
+
+    def get_interfaces(self) -> dict:
+        """
+        Returns the cached interface table, refreshing it if it is stale.
+
+        Returns:
+            dict: { interface name: (ip, netmask, broadcast) }
+        """
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.refresh_interval:
+            self.refresh()
+        return self.interfaces
+
+    def get_broadcast_addresses(self, interface=None) -> list[str]:
+        """
+        Resolves where a broadcast should be sent.
+
+        Args:
+            interface (str, optional): None for the primary interface, "all" for
+                every interface, or an interface name such as 'en0'.
+
+        Returns:
+            list[str]: Broadcast addresses; ['255.255.255.255'] if none are known.
+        """
+        interfaces = self.get_interfaces()
+        if interface == "all":
+            addresses = sorted({bcast for _, _, bcast in interfaces.values()})
+        elif interface is not None:
+            addresses = [interfaces[interface][2]] if interface in interfaces else []
+        else:
+            addresses = [self.primary] if self.primary else []
+        return addresses or ['255.255.255.255']
+
+    def _primary(self, interfaces: dict):
+        # The interface holding our own IP (the command-line one, else the one routing
+        # outbound traffic); loopback and down interfaces never make it into the table.
+        # Whatever psutil happens to list first is often lo or a docker bridge, so if
+        # none matches, fall back to the probe rather than guessing.
+        try:
+            local_ip = get_local_ip()
+        except OSError:
+            local_ip = None
+        for ip, _, broadcast in interfaces.values():
+            if ip == local_ip and not ip.startswith("127."):
+                return broadcast
+        probed = _probe_interfaces()
+        return probed["default"][2] if probed else None
+
+
+interface_resolver = InterfaceResolver()
+
+
+def get_broadcast_ip() -> str:
+    """
+    Returns the cached broadcast address of the primary interface.
+
+    Returns:
+        str: A broadcast IP address like '192.168.1.255'
+    """
+    return interface_resolver.get_broadcast_addresses()[0]
 
 
 def verify_sender_ip(msg: dict, addr: tuple) -> bool: